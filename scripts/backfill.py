@@ -0,0 +1,124 @@
+"""
+Backfill histórico del tracker de BTC DCA
+Simula todas las compras faltantes de un rango de fechas de una sola vez (vectorizado)
+"""
+
+from datetime import datetime, time, timezone
+
+import numpy as np
+import pandas as pd
+
+import indice
+
+# Nombres de columna aceptados en archivos de precios históricos
+COLUMNAS_FECHA = ('fecha', 'date', 'timestamp')
+COLUMNAS_PRECIO = ('precio_btc_usd', 'precio', 'price', 'close')
+
+COINGECKO_RANGE_URL = "https://api.coingecko.com/api/v3/coins/{asset}/market_chart/range"
+
+
+def _buscar_columna(df, candidatos, descripcion):
+    """Devuelve la primera columna del DataFrame que coincide con los candidatos"""
+    for columna in df.columns:
+        if columna.strip().lower() in candidatos:
+            return columna
+    raise ValueError(f"El archivo de precios no tiene columna de {descripcion} ({', '.join(candidatos)})")
+
+
+def _serie_diaria(fechas, precios):
+    """Arma una serie de precios indexada por día (último precio de cada día)"""
+    serie = pd.Series(np.asarray(precios, dtype='float64'), index=pd.to_datetime(fechas, format='mixed'))
+    serie = serie[serie > 0].sort_index()
+    serie.index = serie.index.normalize()
+    return serie.groupby(level=0).last()
+
+
+def cargar_precios_historicos(path):
+    """Lee un CSV local de precios históricos (fecha + precio) como serie diaria"""
+    df = pd.read_csv(path)
+    columna_fecha = _buscar_columna(df, COLUMNAS_FECHA, 'fecha')
+    columna_precio = _buscar_columna(df, COLUMNAS_PRECIO, 'precio')
+    return _serie_diaria(df[columna_fecha], df[columna_precio])
+
+
+def descargar_precios_historicos(desde, hasta, asset="bitcoin", timeout=30):
+    """Descarga el rango completo de precios de CoinGecko en una sola consulta"""
+    import requests
+
+    inicio = datetime.combine(desde, time.min, tzinfo=timezone.utc)
+    fin = datetime.combine(hasta, time.max, tzinfo=timezone.utc)
+    response = requests.get(
+        COINGECKO_RANGE_URL.format(asset=asset),
+        params={"vs_currency": "usd", "from": int(inicio.timestamp()), "to": int(fin.timestamp())},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    precios = np.asarray(response.json()["prices"], dtype='float64').reshape(-1, 2)
+    fechas = pd.to_datetime(precios[:, 0], unit='ms')
+    return _serie_diaria(fechas, precios[:, 1])
+
+
+def simular_compras(precios, usd_invertidos, comision_porcentaje):
+    """Calcula las compras de cada día de la serie de precios (sin acumulados)"""
+    precio = precios.to_numpy(dtype='float64')
+    usd = np.full(len(precio), usd_invertidos, dtype='float64')
+    comision = usd * comision_porcentaje
+    return pd.DataFrame({
+        'fecha': precios.index.date,
+        'precio_btc_usd': precio,
+        'usd_invertidos': usd,
+        'btc_comprados': (usd - comision) / precio,
+        'comision_usd': comision,
+    })
+
+
+def recalcular_acumulados(df):
+    """Recalcula btc_acumulado y valor_actual_usd de todo el ledger con cumsum vectorizado
+
+    Ordena por fecha y descarta fechas repetidas con la regla de verificacion.corregir (queda la
+    primera aparición). La suma arranca desde el saldo previo a la primera compra del ledger
+    existente (las filas nuevas no traen acumulado), así se conserva un saldo inicial.
+    """
+    df = df.iloc[indice.reparar(pd.to_datetime(df['fecha']).to_numpy())].reset_index(drop=True)
+    comprados = df['btc_comprados'].to_numpy(dtype='float64')
+    existentes = np.flatnonzero(df['btc_acumulado'].notna().to_numpy()) if 'btc_acumulado' in df else []
+    primera = existentes[0] if len(existentes) else None
+    if primera == 0:
+        # Mismo orden de suma que el append y verificacion: un ledger sano da los mismos floats
+        semilla = df['btc_acumulado'].to_numpy(dtype='float64')[:1]
+    else:
+        saldo = 0.0 if primera is None else float(df['btc_acumulado'].iloc[primera]) - comprados[primera]
+        semilla = saldo + comprados[:1]
+    btc_acumulado = np.cumsum(np.concatenate((semilla, comprados[1:])))
+    df['btc_acumulado'] = btc_acumulado
+    df['valor_actual_usd'] = btc_acumulado * df['precio_btc_usd'].to_numpy(dtype='float64')
+    return df
+
+
+def backfill(df, precios, desde, hasta, usd_invertidos, comision_porcentaje, columnas):
+    """Completa los días faltantes entre desde y hasta y recalcula los acumulados
+
+    Devuelve (ledger completo, cantidad de compras agregadas, días sin precio disponible)
+    """
+    if df is not None and not df.empty:
+        # Huecos del índice ordenado por bisección, sin comparar el rango contra todo el historial
+        existentes = indice.crear(pd.to_datetime(df['fecha']))
+        if not indice.es_valido(existentes):
+            existentes = existentes[indice.reparar(existentes)]
+        faltantes = pd.DatetimeIndex(indice.expandir(indice.huecos(existentes, desde, hasta)).astype('datetime64[ns]'))
+    else:
+        faltantes = pd.date_range(desde, hasta, freq='D')
+
+    con_precio = faltantes.intersection(precios.index)
+    sin_precio = faltantes.difference(precios.index)
+    nuevos = simular_compras(precios.loc[con_precio], usd_invertidos, comision_porcentaje)
+
+    if df is not None and not df.empty:
+        existente = df.copy()
+        existente['fecha'] = pd.to_datetime(existente['fecha']).dt.date
+        combinado = pd.concat([existente, nuevos], ignore_index=True)
+    else:
+        combinado = nuevos
+
+    combinado = recalcular_acumulados(combinado)
+    return combinado[columnas], len(nuevos), [d.date() for d in sin_precio]
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del tracker de BTC DCA
+Genera historiales sintéticos, mide cada etapa de la actualización y del dashboard
+(tiempo y pico de memoria) y compara contra una línea base guardada en JSON
+
+Uso:
+    python3 scripts/benchmark.py                                  # todos los escenarios
+    python3 scripts/benchmark.py --escenarios 1y 10y --repeticiones 5
+    python3 scripts/benchmark.py --guardar-baseline               # fija la línea base
+    python3 scripts/benchmark.py --tolerancia 0.3                 # falla si algo empeora >30%
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import daily_update
+import diario
+import intervalos
+import metrics
+import price_providers
+import registro
+import storage
+import telemetria
+
+BASE_DIR = Path(__file__).parent.parent
+BENCHMARK_DIR = BASE_DIR / "benchmarks"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+RESULTADO_FILE = BENCHMARK_DIR / "resultado.json"
+
+# Formato del JSON de resultados: una línea base de otra versión no se compara
+VERSION = 2
+
+# nombre -> (filas, intervalo de compra)
+ESCENARIOS = {
+    '1y': (365, '1d'),
+    '10y': (3650, '1d'),
+    '1m': (1_000_000, '5m'),
+}
+
+# Corridas medidas: los mismos argumentos de la línea de comandos de daily_update.py, con el
+# bloqueo, la escritura atómica y el backend CSV reales. Sin subcomando es la actualización del
+# período (con intervalo diario, el camino con pandas que reescribe el CSV)
+CORRIDAS = {
+    'update': [],
+    'append': ['--append'],
+    'verify': ['verify'],
+}
+
+# Diferencias menores a esto no cuentan como regresión (ruido del reloj / del allocator)
+MINIMO_SEGUNDOS = 0.005
+MINIMO_MB = 1.0
+
+
+def generar_historial(filas, segundos, hasta, semilla=42):
+    """Ledger sintético con el formato de btc_purchases.csv (precio con random walk geométrico)
+
+    Termina en el período `hasta`; con intervalos menores a 1d las claves son instantes UTC con
+    sufijo Z, como las escribe intervalos.formatear.
+    """
+    rng = np.random.default_rng(semilla)
+    diario = intervalos.es_diario(segundos)
+    fechas = pd.date_range(end=intervalos.como_instante(hasta), periods=filas, freq=pd.Timedelta(seconds=segundos))
+    precio = np.round(30000 * np.exp(np.cumsum(rng.normal(0, 0.03 if diario else 0.002, filas))), 2)
+    usd = np.full(filas, daily_update.USD_POR_COMPRA / intervalos.compras_por_dia(segundos))
+    comision = usd * daily_update.COMISION_PORCENTAJE
+    btc = (usd - comision) / precio
+    acumulado = np.cumsum(btc)
+    return pd.DataFrame({
+        'fecha': fechas.strftime('%Y-%m-%d' if diario else intervalos.FORMATO_INSTANTE),
+        'precio_btc_usd': precio,
+        'usd_invertidos': usd,
+        'btc_comprados': btc,
+        'btc_acumulado': acumulado,
+        'valor_actual_usd': acumulado * precio,
+        'comision_usd': comision,
+    }, columns=storage.COLUMNAS)
+
+
+def _reubicar(directorio):
+    """Apunta todas las rutas de daily_update (ledger, métricas, dashboard, logs, caché) a directorio"""
+    base = BASE_DIR
+    for nombre, valor in vars(daily_update).copy().items():
+        if nombre.isupper() and isinstance(valor, Path) and base in valor.parents:
+            setattr(daily_update, nombre, directorio / valor.relative_to(base))
+    daily_update.BASE_DIR = directorio
+
+
+def _precio_fijo(precio):
+    """Proveedor sin red: la corrida paga la caché de precios pero no la latencia de la API"""
+    def obtener_precio(proveedores, quorum=1, presupuesto=None):
+        return {'precio': precio, 'cotizaciones': {'benchmark': precio}, 'errores': {}, 'parcial': False, 'segundos': 0.0}
+    return obtener_precio
+
+
+def preparar(directorio, filas, segundos):
+    """Escribe el ledger (hasta el período anterior al actual) y su estado de métricas / resumen diario
+
+    Devuelve el directorio de datos listo para copiar antes de cada corrida.
+    """
+    anterior = intervalos.como_instante(daily_update.periodo_actual()) - timedelta(seconds=segundos)
+    hasta = anterior.date() if intervalos.es_diario(segundos) else anterior
+    historial = generar_historial(filas, segundos, hasta)
+    daily_update.CSV_FILE.parent.mkdir(parents=True, exist_ok=True)
+    historial.to_csv(daily_update.CSV_FILE, index=False)
+
+    # Estado incremental al día, como lo deja la corrida anterior (ninguna medición paga un recálculo)
+    if intervalos.es_diario(segundos):
+        estado = metrics.recalcular(storage.cargar_csv(daily_update.CSV_FILE), daily_update.COMISION_PORCENTAJE)
+        metrics.guardar_estado(daily_update.METRICS_FILE, estado)
+    else:
+        diario.reconstruir(daily_update.DIARIO_FILE, storage.CSVStorage(daily_update.CSV_FILE))
+    price_providers.obtener_precio = _precio_fijo(float(historial['precio_btc_usd'].iloc[-1]))
+
+    preparado = directorio / 'preparado'
+    shutil.copytree(daily_update.CSV_FILE.parent, preparado)
+    return preparado
+
+
+def correr_una(nombre, preparado):
+    """Corre un comando de daily_update sobre una copia de los datos preparados; devuelve sus spans"""
+    datos = daily_update.CSV_FILE.parent
+    shutil.rmtree(datos)
+    shutil.copytree(preparado, datos)
+    daily_update.DASHBOARD_FILE.unlink(missing_ok=True)
+    daily_update.RUN_METRICS_FILE.unlink(missing_ok=True)
+
+    telemetria.iniciar(daily_update.RUN_METRICS_FILE, nombre)
+    try:
+        daily_update.ejecutar(daily_update.parse_args(CORRIDAS[nombre]))
+    except SystemExit as e:
+        raise RuntimeError(f"La corrida {nombre} terminó con código {e.code}") from e
+    finally:
+        resumen = telemetria.finalizar()
+
+    etapas = {}
+    with open(daily_update.RUN_METRICS_FILE, encoding='utf-8') as f:
+        for linea in f:
+            span = json.loads(linea)
+            if span['tipo'] == 'etapa':
+                clave = f"{span['padre']}/{span['etapa']}" if 'padre' in span else span['etapa']
+                etapas[clave] = etapas.get(clave, 0.0) + span['segundos']
+    return resumen['segundos'], etapas
+
+
+def correr_escenario(nombre, repeticiones=3):
+    """Mide un escenario: mediana del tiempo total y de cada etapa por corrida, y pico de memoria
+
+    Las etapas son los spans de telemetría de daily_update; el pico de memoria (tracemalloc) sale
+    de una pasada aparte, para que su overhead no contamine los tiempos.
+    """
+    filas, intervalo = ESCENARIOS[nombre]
+    segundos = intervalos.intervalo_compra(intervalo)
+    daily_update.INTERVALO_COMPRA = segundos
+    with tempfile.TemporaryDirectory(prefix=f"btc-dca-bench-{nombre}-") as tmp:
+        directorio = Path(tmp)
+        _reubicar(directorio)
+        preparado = preparar(directorio, filas, segundos)
+
+        corridas = {}
+        for corrida in CORRIDAS:
+            totales, etapas = [], {}
+            for _ in range(repeticiones):
+                total, spans = correr_una(corrida, preparado)
+                totales.append(total)
+                for etapa, valor in spans.items():
+                    etapas.setdefault(etapa, []).append(valor)
+            bytes_html = telemetria.bytes_archivo(daily_update.DASHBOARD_FILE)
+
+            tracemalloc.start()
+            correr_una(corrida, preparado)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            corridas[corrida] = {
+                'segundos': statistics.median(totales),
+                'pico_mb': pico / 1024 / 1024,
+                'bytes_html': bytes_html,
+                'etapas': {etapa: {'segundos': statistics.median(v)} for etapa, v in etapas.items()},
+            }
+
+        resultado = {
+            'filas': filas,
+            'intervalo': intervalo,
+            'bytes_csv': (preparado / daily_update.CSV_FILE.name).stat().st_size,
+            'corridas': corridas,
+        }
+        registro.detener()  # cierra el log mensual del directorio temporal
+        daily_update._logger = None
+    return resultado
+
+
+def correr(escenarios, repeticiones=3):
+    """Corre los escenarios y devuelve el documento de resultados"""
+    originales = {nombre: valor for nombre, valor in vars(daily_update).items() if nombre.isupper()}
+    obtener_precio = price_providers.obtener_precio
+    # Los mensajes de cada corrida no se imprimen: solo advertencias y errores
+    daily_update.LOG_NIVEL = 'WARNING'
+    try:
+        resultados = {nombre: correr_escenario(nombre, repeticiones) for nombre in escenarios}
+    finally:
+        for nombre, valor in originales.items():
+            setattr(daily_update, nombre, valor)
+        price_providers.obtener_precio = obtener_precio
+    return {
+        'version': VERSION,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'repeticiones': repeticiones,
+        'escenarios': resultados,
+    }
+
+
+def _medidas(corridas):
+    """(corrida o corrida/etapa, medida, valor) de cada número comparable de un escenario"""
+    for corrida, datos in corridas.items():
+        yield corrida, 'segundos', datos['segundos']
+        yield corrida, 'pico_mb', datos['pico_mb']
+        for etapa, medida in datos['etapas'].items():
+            yield f"{corrida}/{etapa}", 'segundos', medida['segundos']
+
+
+def comparar(resultado, baseline, tolerancia=0.25):
+    """Lista las regresiones (tiempo o memoria) de más de `tolerancia` respecto de la línea base"""
+    minimos = {'segundos': MINIMO_SEGUNDOS, 'pico_mb': MINIMO_MB}
+    regresiones = []
+    for escenario, actual in resultado['escenarios'].items():
+        base = baseline.get('escenarios', {}).get(escenario)
+        if base is None:
+            continue
+        referencias = {(etapa, clave): valor for etapa, clave, valor in _medidas(base['corridas'])}
+        for etapa, clave, ahora in _medidas(actual['corridas']):
+            antes = referencias.get((etapa, clave))
+            if antes is None:
+                continue
+            if ahora > antes * (1 + tolerancia) and ahora - antes > minimos[clave]:
+                regresiones.append({
+                    'escenario': escenario,
+                    'etapa': etapa,
+                    'medida': clave,
+                    'baseline': antes,
+                    'actual': ahora,
+                    'cambio_pct': (ahora / antes - 1) * 100 if antes else float('inf'),
+                })
+    return regresiones
+
+
+def tabla(resultado, baseline=None):
+    """Texto con segundos por corrida y por etapa, pico de memoria por corrida y el cambio vs la línea base"""
+    lineas = []
+    for escenario, datos in resultado['escenarios'].items():
+        base = (baseline or {}).get('escenarios', {}).get(escenario, {}).get('corridas', {})
+        referencias = {(etapa, clave): valor for etapa, clave, valor in _medidas(base)}
+        lineas.append(f"\n{escenario} · {datos['filas']:,} filas cada {datos['intervalo']} · CSV {datos['bytes_csv'] / 1024 / 1024:,.1f} MB")
+        lineas.append(f"  {'etapa':<34}{'ms':>10}{'pico MB':>10}{'vs base':>10}")
+        for corrida, medida in datos['corridas'].items():
+            filas = [(corrida, medida['segundos'], f"{medida['pico_mb']:.1f}")]
+            filas += [(f"  {etapa}", m['segundos'], '') for etapa, m in medida['etapas'].items()]
+            for etapa, segundos, pico in filas:
+                antes = referencias.get((etapa.strip(), 'segundos'))
+                cambio = f"{(segundos / antes - 1) * 100:+.0f}%" if antes else ''
+                lineas.append(f"  {etapa:<34}{segundos * 1000:>10.1f}{pico:>10}{cambio:>10}")
+    return "\n".join(lineas)
+
+
+def guardar(path, datos):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa con historiales sintéticos")
+    parser.add_argument('--escenarios', nargs='+', choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', type=Path, default=RESULTADO_FILE, help="JSON con los resultados de esta corrida")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help="JSON de la línea base a comparar")
+    parser.add_argument('--guardar-baseline', action='store_true', help="Guarda esta corrida como línea base")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Empeoramiento tolerado (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline.exists() and not args.guardar_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('version') != VERSION:
+            print(f"⚠ La línea base {args.baseline} es del formato v{baseline.get('version')} (este es v{VERSION}): esta corrida no se compara")
+            baseline = None
+    elif not args.guardar_baseline:
+        print(f"⚠ No existe la línea base {args.baseline}: esta corrida no se compara")
+
+    resultado = correr(args.escenarios, args.repeticiones)
+    print(tabla(resultado, baseline))
+    guardar(args.salida, resultado)
+    print(f"\n✓ Resultados guardados en {args.salida}")
+
+    if args.guardar_baseline:
+        guardar(args.baseline, resultado)
+        print(f"✓ Línea base guardada en {args.baseline}")
+    elif baseline is not None:
+        regresiones = comparar(resultado, baseline, args.tolerancia)
+        for r in regresiones:
+            print(f"✗ Regresión {r['escenario']}/{r['etapa']} ({r['medida']}): "
+                  f"{r['baseline']:.4f} → {r['actual']:.4f} ({r['cambio_pct']:+.0f}%)")
+        if regresiones:
+            sys.exit(1)
+        print(f"✓ Sin regresiones respecto de {args.baseline} (tolerancia {args.tolerancia:.0%})")
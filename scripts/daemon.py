@@ -0,0 +1,92 @@
+"""
+Modo daemon del tracker de BTC DCA
+Scheduler asyncio: corre un tick en cada múltiplo de la cadencia (alineado al reloj UTC) y
+re-renderiza con debounce, sin pagar el arranque del intérprete ni el parseo del ledger en cada tick
+"""
+
+import asyncio
+import signal
+import time
+
+# Espera desde el último pedido de render y tope desde el primero (ráfagas de ticks -> un render)
+DEBOUNCE_SEGUNDOS = 5.0
+DEBOUNCE_MAXIMO = 30.0
+
+
+def proximo_tick(ahora, intervalo, desfase=0.0):
+    """Próximo instante (epoch) que es múltiplo del intervalo más el desfase, estrictamente después de ahora
+
+    Con intervalo 1d y desfase 12h el tick cae todos los días a las 12:00 UTC (como el workflow).
+    """
+    return ((ahora - desfase) // intervalo + 1) * intervalo + desfase
+
+
+class Debounce:
+    """Agrupa pedidos: ejecuta la función `espera` segundos después del último pedido
+
+    Si los pedidos no paran, la ejecuta igual a los `maximo` segundos del primero pendiente.
+    """
+
+    def __init__(self, funcion, espera=DEBOUNCE_SEGUNDOS, maximo=DEBOUNCE_MAXIMO):
+        self.funcion = funcion
+        self.espera = espera
+        self.maximo = maximo
+        self._tarea = None
+        self._primero = None
+
+    def pedir(self):
+        ahora = time.monotonic()
+        if self._primero is None:
+            self._primero = ahora
+        if self._tarea is not None:
+            self._tarea.cancel()
+        demora = min(self.espera, max(0.0, self._primero + self.maximo - ahora))
+        self._tarea = asyncio.ensure_future(self._ejecutar_en(demora))
+
+    @property
+    def pendiente(self):
+        return self._primero is not None
+
+    async def _ejecutar_en(self, demora):
+        await asyncio.sleep(demora)
+        self._tarea = None
+        await self.vaciar()
+
+    async def vaciar(self):
+        """Ejecuta ya el pedido pendiente (si hay uno)"""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+        if self._primero is None:
+            return
+        self._primero = None
+        await self.funcion()
+
+
+async def correr(tick, intervalo, desfase=0.0, al_iniciar=True, log=print):
+    """Ejecuta `tick` (corrutina) en cada múltiplo del intervalo hasta recibir SIGINT / SIGTERM
+
+    Un tick que falla se registra y el daemon sigue con el próximo (un corte de red no lo detiene).
+    """
+    loop = asyncio.get_running_loop()
+    detener = asyncio.Event()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(senal, detener.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows o hilo secundario: se detiene con KeyboardInterrupt
+
+    async def ejecutar_tick():
+        try:
+            await tick()
+        except Exception as e:
+            log(f"✗ Tick fallido: {e} - se reintenta en el próximo")
+
+    if al_iniciar:
+        await ejecutar_tick()
+    while not detener.is_set():
+        espera = proximo_tick(time.time(), intervalo, desfase) - time.time()
+        try:
+            await asyncio.wait_for(detener.wait(), timeout=max(0.0, espera))
+        except asyncio.TimeoutError:
+            await ejecutar_tick()
@@ -4,55 +4,139 @@ Script de actualización diaria del tracker de BTC DCA
 Ejecuta automáticamente cada día a las 9:00 AM
 """
 
-import pandas as pd
-import requests
 from datetime import datetime
 from pathlib import Path
+import argparse
+import logging
+import os
 import time
 import sys
 
+# Solo stdlib y módulos livianos: pandas, numpy y requests se importan dentro de las
+# funciones que los usan, así las corridas de append y no-op arrancan sin cargarlos
+import dashboard
+import diario
+import downsample
+import escritura
+import intervalos
+import metrics
+import migraciones
+import price_cache
+import registro
+import storage
+import telemetria
+
 # Configuración de rutas
 BASE_DIR = Path(__file__).parent.parent
 COMISION_PORCENTAJE = 0.003  # 0.3% por transacción (compra)
+USD_POR_COMPRA = 2.00  # Monto bruto diario (con compras intradiarias se reparte entre las del día)
 CSV_FILE = BASE_DIR / "data" / "btc_purchases.csv"
+COLUMNAR_DIR = BASE_DIR / "data" / "btc_purchases.cols"
+SATOSHIS_DIR = BASE_DIR / "data" / "btc_purchases.sats"  # columnar int64: satoshis y micro-dólares
+SQLITE_FILE = BASE_DIR / "data" / "btc_purchases.db"
+PARTICIONES_DIR = BASE_DIR / "data" / "btc_purchases"  # un CSV por mes (AAAA/MM.csv) + manifest.json
+METRICS_FILE = BASE_DIR / "data" / "btc_purchases.metrics.json"
+DIARIO_FILE = BASE_DIR / "data" / "btc_purchases.diario.csv"  # resumen por día de los ledgers intradiarios
 DASHBOARD_FILE = BASE_DIR / "index.html"
+LOCK_FILE = BASE_DIR / "data" / ".btc_dca.lock"  # flock: corridas superpuestas (cron + manual) se serializan
+DATA_JSON_FILE = BASE_DIR / "data.json"
+NIVELES_FILE = BASE_DIR / "niveles.json"  # niveles del zoom de los gráficos, junto al dashboard
+ASSETS_DIR = BASE_DIR / "assets"
+DASHBOARD_MODE = os.environ.get("BTC_DCA_DASHBOARD", "inline")  # inline | shell
 LOG_DIR = BASE_DIR / "logs"
+RUN_METRICS_FILE = LOG_DIR / "run_metrics.jsonl"  # un span JSON por etapa + resumen por corrida
+LOG_FORMATO = os.environ.get("BTC_DCA_LOG_FORMATO", "plain")  # plain | json (archivo mensual)
+LOG_NIVEL = os.environ.get("BTC_DCA_LOG_NIVEL", "INFO")
+
+# Modo daemon: cada cuánto corre el tick de compra y desfase sobre la medianoche UTC (1d + 12h = 12:00 UTC)
+CADENCIA_DAEMON = os.environ.get("BTC_DCA_CADENCIA", "1d")
+DESFASE_DAEMON = os.environ.get("BTC_DCA_DESFASE", "12h")
+
+# Intervalo entre compras: 1d (clave = fecha, como siempre) o un divisor del día (15m, 1h...) con
+# clave = inicio del período en UTC; una corrida repetida dentro del período no vuelve a comprar
+INTERVALO_COMPRA = intervalos.intervalo_compra(os.environ.get("BTC_DCA_INTERVALO", "1d"))
+
+# Filas por lote al armar el dashboard recorriendo el ledger en streaming (0 = leer el ledger entero)
+LOTE_STREAMING = int(os.environ.get("BTC_DCA_LOTE", "0"))
+
+# Proveedores de precio consultados en paralelo; quórum 1 = primera cotización válida
+PROVEEDORES_PRECIO = os.environ.get("BTC_DCA_PROVEEDORES", "").split(",") if os.environ.get("BTC_DCA_PROVEEDORES") else None
+QUORUM_PRECIO = int(os.environ.get("BTC_DCA_QUORUM", "1"))
+PRESUPUESTO_PRECIO = float(os.environ.get("BTC_DCA_PRESUPUESTO_PRECIO", "5"))
+
+# Caché de cotizaciones entre ejecuciones (TTL en segundos; 0 la desactiva)
+PRICE_CACHE_FILE = BASE_DIR / "data" / "price_cache.json"
+PRICE_CACHE_TTL = float(os.environ.get("BTC_DCA_PRICE_TTL", price_cache.TTL_SEGUNDOS))
+CLAVE_PRECIO = "bitcoin-usd"
+
+# Configuración del modo multi-portafolio (subcomando portafolios)
+PORTAFOLIOS_FILE = Path(os.environ.get("BTC_DCA_PORTAFOLIOS", BASE_DIR / "portafolios.json"))
+
+# Activos a comprar (ids de CoinGecko); el primero es el que detalla el dashboard
+ACTIVO_PRINCIPAL = "bitcoin"
+ACTIVOS = [a.strip() for a in os.environ.get("BTC_DCA_ACTIVOS", ACTIVO_PRINCIPAL).split(",") if a.strip()]
+# id de CoinGecko -> (símbolo, nombre) para el dashboard combinado (otros ids usan el id en mayúsculas)
+NOMBRES_ACTIVOS = {
+    'bitcoin': ('BTC', 'Bitcoin'),
+    'ethereum': ('ETH', 'Ethereum'),
+    'solana': ('SOL', 'Solana'),
+    'cardano': ('ADA', 'Cardano'),
+    'ripple': ('XRP', 'XRP'),
+    'litecoin': ('LTC', 'Litecoin'),
+    'dogecoin': ('DOGE', 'Dogecoin'),
+}
 
 # Crear directorio de logs si no existe
 LOG_DIR.mkdir(exist_ok=True)
 
-def log_message(message):
-    """Registra mensaje con timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_msg = f"[{timestamp}] {message}"
-    print(log_msg)
+_logger = None
 
-    # Guardar en archivo de log
-    log_file = LOG_DIR / f"btc_tracker_{datetime.now().strftime('%Y%m')}.log"
-    with open(log_file, 'a') as f:
-        f.write(log_msg + '\n')
+def log_message(message, nivel=None):
+    """Registra mensaje con timestamp (consola + log mensual; nivel inferido de ✗/⚠ si no se indica)"""
+    global _logger
+    if _logger is None:
+        _logger = registro.configurar(LOG_DIR, LOG_FORMATO, LOG_NIVEL)
+    registro.registrar(_logger, nivel or registro.nivel_de_mensaje(message), message)
 
-def get_btc_price(max_retries=3):
-    """Obtiene precio actual de BTC desde CoinGecko con reintentos"""
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {"ids": "bitcoin", "vs_currencies": "usd"}
+def get_btc_price(max_retries=3, ttl=None):
+    """Obtiene precio actual de BTC consultando los proveedores en paralelo, con reintentos
 
-    for intento in range(max_retries):
-        try:
-            log_message(f"Consultando precio de BTC (intento {intento + 1}/{max_retries})...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            precio = response.json()["bitcoin"]["usd"]
+    Solo se reintenta (con backoff) si ningún proveedor respondió dentro del presupuesto.
+    Una cotización en caché más nueva que el TTL (PRICE_CACHE_TTL por defecto) se reutiliza sin
+    tocar la red, siempre que sea del período de compra en curso.
+    """
+    ttl = PRICE_CACHE_TTL if ttl is None else ttl
+    en_cache = price_cache.obtener(PRICE_CACHE_FILE, CLAVE_PRECIO, ttl, desde=inicio_periodo())
+    if en_cache is not None:
+        antiguedad = time.time() - en_cache['ts']
+        log_message(f"✓ Precio en caché: ${en_cache['precio']:,.2f} USD (hace {antiguedad:.0f}s)")
+        return en_cache['precio']
 
-            # Validar que el precio sea razonable
-            if precio <= 0:
-                raise ValueError(f"Precio inválido: {precio}")
+    import price_providers
 
-            log_message(f"✓ Precio obtenido: ${precio:,.2f} USD")
+    proveedores = PROVEEDORES_PRECIO or list(price_providers.PROVEEDORES)
+    for intento in range(max_retries):
+        try:
+            log_message(
+                f"Consultando precio de BTC en {', '.join(proveedores)} "
+                f"(intento {intento + 1}/{max_retries}, quórum {QUORUM_PRECIO})..."
+            )
+            resultado = price_providers.obtener_precio(
+                proveedores, quorum=QUORUM_PRECIO, presupuesto=PRESUPUESTO_PRECIO
+            )
+            for nombre, error in resultado['errores'].items():
+                log_message(f"⚠ {nombre}: {error}")
+            if resultado['parcial']:
+                log_message(f"⚠ Quórum incompleto: {len(resultado['cotizaciones'])}/{QUORUM_PRECIO} cotizaciones")
+
+            precio = resultado['precio']
+            fuentes = ', '.join(f"{n} ${p:,.2f}" for n, p in resultado['cotizaciones'].items())
+            log_message(f"✓ Precio obtenido: ${precio:,.2f} USD ({fuentes}; {resultado['segundos']:.2f}s)")
+            price_cache.guardar(PRICE_CACHE_FILE, CLAVE_PRECIO, precio, resultado['cotizaciones'], PRICE_CACHE_TTL)
             return precio
 
-        except requests.exceptions.RequestException as e:
-            log_message(f"✗ Error de conexión: {e}")
+        except price_providers.SinCotizacion as e:
+            log_message(f"✗ {e}")
             if intento < max_retries - 1:
                 wait_time = 2 ** intento  # Backoff exponencial: 1s, 2s, 4s
                 log_message(f"Esperando {wait_time}s antes de reintentar...")
@@ -60,74 +144,521 @@ def get_btc_price(max_retries=3):
             else:
                 log_message("✗ Máximo de reintentos alcanzado")
                 raise
-        except (KeyError, ValueError) as e:
-            log_message(f"✗ Error procesando respuesta: {e}")
-            raise
 
     raise Exception("No se pudo obtener el precio de BTC")
 
-def update_btc_data():
+def get_precios(activos, max_retries=3):
+    """Obtiene el precio de varios activos con una sola consulta agrupada a CoinGecko, con reintentos
+
+    Los activos con cotización vigente en la caché no se consultan; el resto viaja en un único request.
+    """
+    precios = {}
+    for activo in activos:
+        en_cache = price_cache.obtener(PRICE_CACHE_FILE, clave_precio(activo), PRICE_CACHE_TTL, desde=inicio_periodo())
+        if en_cache is not None:
+            precios[activo] = en_cache['precio']
+    if precios:
+        log_message(f"✓ Precios en caché: {', '.join(f'{a} ${p:,.2f}' for a, p in precios.items())}")
+
+    faltantes = [a for a in activos if a not in precios]
+    if not faltantes:
+        return precios
+
+    import price_providers
+
+    for intento in range(max_retries):
+        try:
+            log_message(
+                f"Consultando precios de {', '.join(faltantes)} en una sola consulta "
+                f"(intento {intento + 1}/{max_retries})..."
+            )
+            resultado = price_providers.obtener_precios(faltantes, presupuesto=PRESUPUESTO_PRECIO)
+            for activo, error in resultado['errores'].items():
+                log_message(f"⚠ {activo}: {error}")
+
+            cotizados = resultado['precios']
+            log_message(
+                f"✓ Precios obtenidos: {', '.join(f'{a} ${p:,.2f}' for a, p in cotizados.items())} "
+                f"({resultado['segundos']:.2f}s)"
+            )
+            price_cache.guardar_varias(
+                PRICE_CACHE_FILE, {clave_precio(a): p for a, p in cotizados.items()},
+                {clave_precio(a): {'coingecko': p} for a, p in cotizados.items()}, PRICE_CACHE_TTL,
+            )
+            precios.update(cotizados)
+            return precios
+
+        except price_providers.SinCotizacion as e:
+            log_message(f"✗ {e}")
+            if intento < max_retries - 1:
+                wait_time = 2 ** intento  # Backoff exponencial: 1s, 2s, 4s
+                log_message(f"Esperando {wait_time}s antes de reintentar...")
+                time.sleep(wait_time)
+            else:
+                log_message("✗ Máximo de reintentos alcanzado")
+                raise
+
+    raise Exception(f"No se pudo obtener el precio de {', '.join(faltantes)}")
+
+def clave_precio(activo):
+    """Clave de la caché de cotizaciones de un activo (bitcoin -> 'bitcoin-usd')"""
+    return f"{activo}-usd"
+
+def nombre_activo(activo):
+    """Devuelve (símbolo, nombre) del activo para mostrar"""
+    return NOMBRES_ACTIVOS.get(activo, (activo.upper(), activo.capitalize()))
+
+def rutas_ledger(activo=ACTIVO_PRINCIPAL):
+    """Rutas del ledger (por backend) y del estado de métricas de un activo
+
+    bitcoin conserva las rutas históricas; cada otro activo tiene las suyas (data/<id>_purchases.*).
+    """
+    if activo == ACTIVO_PRINCIPAL:
+        return {
+            'csv': CSV_FILE,
+            'columnar': COLUMNAR_DIR,
+            'satoshis': SATOSHIS_DIR,
+            'sqlite': SQLITE_FILE,
+            'particionado': PARTICIONES_DIR,
+            'metricas': METRICS_FILE,
+            'diario': DIARIO_FILE,
+        }
+    base = BASE_DIR / "data" / f"{activo}_purchases"
+    return {
+        'csv': base.with_suffix('.csv'),
+        'columnar': base.with_suffix('.cols'),
+        'satoshis': base.with_suffix('.sats'),
+        'sqlite': base.with_suffix('.db'),
+        'particionado': base,
+        'metricas': base.with_suffix('.metrics.json'),
+        'diario': base.with_suffix('.diario.csv'),
+    }
+
+def abrir_storage(backend, activo=ACTIVO_PRINCIPAL):
+    """Devuelve el backend de almacenamiento del ledger configurado (de un activo), en el esquema vigente"""
+    return asegurar_esquema(storage.crear_storage(backend, rutas_ledger(activo)[backend]))
+
+def asegurar_esquema(ledger, comision=None):
+    """Aplica las migraciones de esquema pendientes del ledger (una sola vez) y lo devuelve
+
+    La versión sale de la cabecera (una línea del CSV o el schema del backend): un ledger al día
+    no paga nada más. La migración toma el bloqueo, así dos corridas no migran a la vez.
+    """
+    if not ledger.existe() or migraciones.version(ledger.cabecera()) == migraciones.VERSION_ACTUAL:
+        return ledger
+    with escritura.bloqueo(LOCK_FILE):
+        desde = migraciones.version(ledger.cabecera())  # otra corrida pudo migrarlo mientras esperábamos
+        if desde == migraciones.VERSION_ACTUAL:
+            return ledger
+        contexto = {'comision_porcentaje': COMISION_PORCENTAJE if comision is None else comision}
+        with telemetria.etapa('migrar_esquema', backend=ledger.nombre, desde=desde):
+            aplicadas = migraciones.migrar(ledger, contexto)
+    log_message(f"✓ Ledger {ledger.nombre} migrado del esquema v{desde} a v{migraciones.VERSION_ACTUAL}: {'; '.join(aplicadas)}")
+    return ledger
+
+def actualizar_metricas(registro_previo, registro_nuevo, cargar_df, metrics_file=None):
+    """Actualiza el estado de métricas solo con el registro nuevo (recalcula si no sigue al ledger)"""
+    metrics_file = metrics_file or METRICS_FILE
+    estado = metrics.cargar_estado(metrics_file)
+    if metrics.sigue_al_ledger(estado, registro_previo):
+        if registro_nuevo is not None:
+            estado = metrics.actualizar(estado, registro_nuevo, COMISION_PORCENTAJE)
+    else:
+        log_message("⚠ Estado de métricas ausente o desactualizado - recalculando desde el ledger completo")
+        estado = metrics.recalcular(cargar_df(), COMISION_PORCENTAJE)
+    metrics.guardar_estado(metrics_file, estado)
+    return estado
+
+def es_intradia():
+    return not intervalos.es_diario(INTERVALO_COMPRA)
+
+def periodo_actual():
+    """Clave de la compra en curso: la fecha (intervalo diario) o el inicio del período en UTC"""
+    return intervalos.clave_periodo(INTERVALO_COMPRA)
+
+def inicio_periodo():
+    """Epoch de inicio del período en curso: la caché no reutiliza cotizaciones anteriores"""
+    return intervalos.inicio_periodo(INTERVALO_COMPRA)
+
+def metricas_ledger(ledger, registro_previo, registro_nuevo, activo=ACTIVO_PRINCIPAL):
+    """Estado de métricas tras la compra y el ledger del que se dibuja el dashboard
+
+    Con compras diarias: estado incremental y el propio ledger. Con compras intradiarias: el
+    resumen diario (una fila por día, actualizado en O(1)) y el estado calculado sobre él, así el
+    dashboard cuesta lo mismo que con un ledger diario aunque el ledger tenga 24-96 filas por día.
+    """
+    rutas = rutas_ledger(activo)
+    if not es_intradia():
+        return actualizar_metricas(registro_previo, registro_nuevo, ledger.cargar, rutas['metricas']), ledger
+    with telemetria.etapa('resumen_diario') as span:
+        span['reconstruido'] = diario.actualizar(rutas['diario'], registro_previo, registro_nuevo, ledger)
+        if span['reconstruido']:
+            log_message("⚠ Resumen diario ausente o desactualizado - reconstruido desde el ledger")
+        resumen = diario.ResumenDiario(rutas['diario'])
+        estado = diario.estado(resumen.leer_columnas(), COMISION_PORCENTAJE)
+    return estado, resumen
+
+def verificar_metricas(backend):
+    """Recalcula las métricas desde el ledger completo y las compara con el estado persistido"""
+    estado = metrics.cargar_estado(METRICS_FILE)
+    referencia = metrics.recalcular(abrir_storage(backend).cargar(), COMISION_PORCENTAJE)
+    distintas = metrics.diferencias(estado or {}, referencia)
+    if distintas:
+        log_message(f"⚠ Estado de métricas inconsistente ({', '.join(distintas)}) - reescribiendo")
+        metrics.guardar_estado(METRICS_FILE, referencia)
+    else:
+        log_message("✓ Estado de métricas consistente con el ledger")
+    return not distintas
+
+def update_btc_data_incremental(ledger):
+    """Registra la compra del período leyendo solo el último registro del ledger y agregando una fila"""
+    # Paso 1: Verificar si ya existe un registro para el período (búsqueda indexada o por cola)
+    fecha_hoy = periodo_actual()
+    with telemetria.etapa('leer_ultimo', backend=ledger.nombre):
+        ultimo = ledger.ultimo_registro()
+        existe_hoy = ledger.existe() and ledger.existe_fecha(fecha_hoy)
+
+    if existe_hoy:
+        log_message(f"⚠ Ya existe un registro para {intervalos.formatear(fecha_hoy)} - regenerando solo el dashboard")
+        with telemetria.etapa('metricas'):
+            estado, fuente = metricas_ledger(ledger, ultimo, None)
+        dashboard_ledger(fuente, estado)
+        log_message("✓ Dashboard actualizado (sin agregar nueva compra)")
+        return
+
+    if ultimo is None:
+        btc_acumulado_previo = 0.0
+        log_message(f"Primera ejecución - creando ledger {ledger.nombre}")
+    else:
+        btc_acumulado_previo = ultimo['btc_acumulado']
+        log_message(f"BTC acumulado previo: {btc_acumulado_previo:.8f}")
+
+    # Paso 2: Obtener precio y calcular compra del día
+    with telemetria.etapa('precio'):
+        precio_btc = get_btc_price()
+    nuevo_registro = calcular_compra(fecha_hoy, precio_btc, btc_acumulado_previo)
+
+    # Paso 3: Agregar una sola fila al ledger (sin reescribir el historial)
+    try:
+        with telemetria.etapa('agregar', backend=ledger.nombre, filas=1):
+            ledger.agregar(nuevo_registro)
+        log_message(f"✓ Registro agregado al ledger {ledger.nombre}")
+        with telemetria.etapa('metricas'):
+            estado, fuente = metricas_ledger(ledger, ultimo, nuevo_registro)
+    except storage.RegistroDuplicado as e:
+        log_message(f"⚠ {e} - no se agrega la compra")
+        with telemetria.etapa('metricas'):
+            estado, fuente = metricas_ledger(ledger, ledger.ultimo_registro(), None)
+
+    # Paso 4: Regenerar dashboard HTML (columnas como listas, sin pandas)
+    dashboard_ledger(fuente, estado)
+
+def calcular_compra(fecha, precio, acumulado_previo, simbolo='BTC', usd_por_compra=None, comision=None):
+    """Arma el registro de la compra del período (monto fijo menos comisión, al precio dado)
+
+    Sin usd_por_compra, el monto diario se reparte entre las compras del día del intervalo.
+    """
+    usd_invertidos = USD_POR_COMPRA / intervalos.compras_por_dia(INTERVALO_COMPRA) if usd_por_compra is None else usd_por_compra
+    comision_usd = usd_invertidos * (COMISION_PORCENTAJE if comision is None else comision)
+    comprados = (usd_invertidos - comision_usd) / precio
+    # Con compras intradiarias el monto es una fracción del diario ($2 / 1440 = $0.0014): más decimales
+    usd, comision = (6, 8) if es_intradia() else (2, 4)
+    log_message(f"Compra del día: ${usd_invertidos:.{usd}f} = {comprados:.8f} {simbolo} · Comisión: ${comision_usd:.{comision}f}")
+
+    acumulado = acumulado_previo + comprados
+    return {
+        'fecha': fecha,
+        'precio_btc_usd': precio,
+        'usd_invertidos': usd_invertidos,
+        'btc_comprados': comprados,
+        'btc_acumulado': acumulado,
+        'valor_actual_usd': acumulado * precio,
+        'comision_usd': comision_usd
+    }
+
+def update_activos(activos, backend='csv'):
+    """Registra la compra del día de varios activos con una sola consulta de precios
+
+    Cada activo tiene su ledger y su estado de métricas; el dashboard detalla el primero
+    y agrega un resumen de todos. Siempre escribe de forma incremental (una fila por activo).
+    """
+    try:
+        log_message("=" * 60)
+        log_message(f"Iniciando actualización diaria de {len(activos)} activo(s): {', '.join(activos)}")
+        fecha_hoy = periodo_actual()
+
+        # Paso 1: Último registro de cada ledger y activos que todavía no compraron hoy
+        ledgers, ultimos = {}, {}
+        with telemetria.etapa('leer_ultimo', backend=backend, activos=len(activos)):
+            for activo in activos:
+                ledgers[activo] = abrir_storage(backend, activo)
+                ultimos[activo] = ledgers[activo].ultimo_registro()
+            pendientes = [a for a in activos if not (ledgers[a].existe() and ledgers[a].existe_fecha(fecha_hoy))]
+
+        # Paso 2: Un solo round-trip para todos los precios pendientes
+        precios = {}
+        if pendientes:
+            with telemetria.etapa('precio', activos=len(pendientes)):
+                precios = get_precios(pendientes)
+        else:
+            log_message(f"⚠ Ya existe un registro para {intervalos.formatear(fecha_hoy)} en todos los activos - regenerando solo el dashboard")
+
+        # Paso 3: Una fila por activo y métricas incrementales
+        estados, fuentes = {}, {}
+        for activo in activos:
+            ledger, ultimo, nuevo_registro = ledgers[activo], ultimos[activo], None
+            simbolo, _ = nombre_activo(activo)
+            if activo in precios:
+                acumulado_previo = ultimo['btc_acumulado'] if ultimo is not None else 0.0
+                nuevo_registro = calcular_compra(fecha_hoy, precios[activo], acumulado_previo, simbolo)
+                try:
+                    with telemetria.etapa('agregar', backend=ledger.nombre, activo=activo, filas=1):
+                        ledger.agregar(nuevo_registro)
+                    log_message(f"✓ Registro de {simbolo} agregado al ledger {ledger.nombre}")
+                except storage.RegistroDuplicado as e:
+                    log_message(f"⚠ {e} - no se agrega la compra de {simbolo}")
+                    ultimo, nuevo_registro = ledger.ultimo_registro(), None
+            elif activo in pendientes:
+                log_message(f"⚠ Sin precio para {activo} - no se registra su compra de hoy")
+            if ultimo is None and nuevo_registro is None:
+                estados[activo] = metrics.estado_inicial()  # ledger todavía vacío
+                continue
+            with telemetria.etapa('metricas', activo=activo):
+                estados[activo], fuentes[activo] = metricas_ledger(ledger, ultimo, nuevo_registro, activo)
+
+        # Paso 4: Dashboard del primer activo con el resumen de todos
+        portafolio = [
+            (*nombre_activo(activo), estado) for activo, estado in estados.items() if estado['dias'] > 0
+        ]
+        principal = activos[0]
+        if estados[principal]['dias'] == 0:
+            # Primera corrida sin precio para el activo principal: no hay filas que dibujar
+            log_message(f"⚠ El ledger de {principal} sigue vacío - no se genera el dashboard")
+        else:
+            dashboard_ledger(fuentes.get(principal, ledgers[principal]), estados[principal], portafolio=portafolio)
+
+        log_message("✓ Actualización completada exitosamente")
+        log_message("=" * 60)
+
+    except Exception as e:
+        log_message(f"✗ ERROR CRÍTICO: {e}")
+        import traceback
+        log_message(traceback.format_exc(), logging.ERROR)
+        sys.exit(1)
+
+def update_portafolios(config, procesos=None):
+    """Actualiza todos los portafolios de la configuración en un solo proceso
+
+    Los precios se consultan una vez para todos; cada ledger recibe su fila del período (el
+    intervalo de compra es el mismo que el del ledger principal) y los dashboards se renderizan
+    en un pool de procesos desde la plantilla precompilada.
+    """
+    import portafolios as modulo_portafolios
+
+    try:
+        log_message("=" * 60)
+        portafolios = modulo_portafolios.cargar_config(config, USD_POR_COMPRA, COMISION_PORCENTAJE)
+        log_message(f"Iniciando actualización de {len(portafolios)} portafolio(s) desde {config}")
+        periodo = periodo_actual()
+        compras_por_dia = intervalos.compras_por_dia(INTERVALO_COMPRA)
+
+        # Paso 1: Último registro de cada ledger (solo la cola del CSV)
+        with telemetria.etapa('leer_ultimo', portafolios=len(portafolios)):
+            for p in portafolios:
+                p['storage'] = asegurar_esquema(storage.CSVStorage(p['ledger']), p['comision'])
+                p['ultimo'] = p['storage'].ultimo_registro()
+                # Claves normalizadas: fechas e instantes UTC se comparan como su medianoche / instante
+                p['pendiente'] = (
+                    p['ultimo'] is None
+                    or intervalos.como_instante(p['ultimo']['fecha']) < intervalos.como_instante(periodo)
+                )
+            pendientes = [p for p in portafolios if p['pendiente']]
+
+        # Paso 2: Precios una sola vez para todos los activos pendientes
+        activos = sorted({p['activo'] for p in pendientes})
+        precios = {}
+        if activos == [ACTIVO_PRINCIPAL]:
+            with telemetria.etapa('precio'):
+                precios = {ACTIVO_PRINCIPAL: get_btc_price()}
+        elif activos:
+            with telemetria.etapa('precio', activos=len(activos)):
+                precios = get_precios(activos)
+        log_message(f"{len(pendientes)} portafolio(s) sin compra del período · {len(portafolios) - len(pendientes)} al día")
+
+        # Paso 3: Una fila por portafolio pendiente y métricas incrementales
+        with telemetria.etapa('agregar', portafolios=len(pendientes)):
+            for p in portafolios:
+                nuevo_registro = None
+                if p['pendiente'] and p['activo'] in precios:
+                    acumulado_previo = p['ultimo']['btc_acumulado'] if p['ultimo'] is not None else 0.0
+                    # usd_por_compra es el monto diario del portafolio: se reparte entre las compras del día
+                    nuevo_registro = calcular_compra(
+                        periodo, precios[p['activo']], acumulado_previo, nombre_activo(p['activo'])[0],
+                        p['usd_por_compra'] / compras_por_dia, p['comision'],
+                    )
+                    p['ledger'].parent.mkdir(parents=True, exist_ok=True)
+                    try:
+                        p['storage'].agregar(nuevo_registro)
+                    except storage.RegistroDuplicado as e:
+                        log_message(f"⚠ {p['nombre']}: {e} - no se agrega la compra")
+                        p['ultimo'], nuevo_registro = p['storage'].ultimo_registro(), None
+                elif p['pendiente']:
+                    log_message(f"⚠ {p['nombre']}: sin precio para {p['activo']} - no se registra la compra")
+                if p['ultimo'] is None and nuevo_registro is None:
+                    p['estado'] = None
+                    continue
+                p['estado'] = actualizar_metricas(p['ultimo'], nuevo_registro, p['storage'].cargar, p['metricas'])
+
+        # Paso 4: Dashboards en paralelo
+        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        trabajos = [
+            {
+                'nombre': p['nombre'],
+                'ledger': str(p['ledger']),
+                'dashboard': str(p['dashboard']),
+                'estado': p['estado'],
+                'usd_por_compra': p['usd_por_compra'],
+                'timestamp': timestamp,
+            }
+            for p in portafolios if p['estado'] is not None and p['estado']['dias'] > 0
+        ]
+        with telemetria.etapa('dashboards', portafolios=len(trabajos)) as span:
+            inicio = time.perf_counter()
+            resultados = modulo_portafolios.renderizar_todos(trabajos, procesos)
+            span['bytes'] = sum(r[1] for r in resultados)
+        log_message(
+            f"✓ {len(resultados)} dashboard(s) generado(s) en {time.perf_counter() - inicio:.2f}s "
+            f"({span['bytes']:,} bytes)"
+        )
+        log_message("✓ Actualización completada exitosamente")
+        log_message("=" * 60)
+
+    except Exception as e:
+        log_message(f"✗ ERROR CRÍTICO: {e}")
+        import traceback
+        log_message(traceback.format_exc(), logging.ERROR)
+        sys.exit(1)
+
+def leer_columnas(ledger):
+    """Lee las columnas del ledger como listas (medido como etapa)"""
+    with telemetria.etapa('leer_columnas', backend=ledger.nombre) as span:
+        columnas = ledger.leer_columnas()
+        span['filas'] = len(columnas['fecha'])
+    return columnas
+
+def dashboard_ledger(ledger, estado, portafolio=None):
+    """Genera el dashboard desde el ledger: columnas completas o, con LOTE_STREAMING, por lotes"""
+    if not LOTE_STREAMING:
+        generate_dashboard(leer_columnas(ledger), estado, portafolio=portafolio)
+        return
+
+    import streaming
+
+    with telemetria.etapa('series_por_lotes', backend=ledger.nombre, lote=LOTE_STREAMING) as span:
+        series = streaming.recorrer(ledger.lotes(LOTE_STREAMING), {'series': streaming.series()})['series']
+        span['filas'] = len(series['ts'])
+    generate_dashboard(None, estado, portafolio=portafolio, series=series)
+
+def update_btc_data(append=False, backend='csv'):
     """Registra compra del día y actualiza CSV"""
     try:
         log_message("=" * 60)
         log_message("Iniciando actualización diaria del tracker BTC DCA")
 
-        # Paso 1: Obtener precio actual
-        precio_btc = get_btc_price()
-
-        # Paso 2: Calcular compra del día
-        usd_invertidos = 2.00
-        comision_usd = usd_invertidos * COMISION_PORCENTAJE
-        btc_comprados = (usd_invertidos - comision_usd) / precio_btc
-        log_message(f"Compra del día: ${usd_invertidos:.2f} = {btc_comprados:.8f} BTC · Comisión: ${comision_usd:.4f}")
+        # Los backends binarios y las compras intradiarias siempre escriben de forma incremental
+        if append or backend != 'csv' or es_intradia():
+            update_btc_data_incremental(abrir_storage(backend))
+            log_message("✓ Actualización completada exitosamente")
+            log_message("=" * 60)
+            return
 
-        # Paso 3: Leer datos históricos (si existen)
-        if CSV_FILE.exists():
-            df = pd.read_csv(CSV_FILE)
-            # Normalizar fechas a solo fecha (sin hora) para comparaciones - usar format='mixed' para manejar formatos inconsistentes
-            df['fecha'] = pd.to_datetime(df['fecha'], format='mixed').dt.date
+        # Migraciones de esquema pendientes (solo lee la cabecera si el CSV está al día)
+        asegurar_esquema(storage.CSVStorage(CSV_FILE))
 
-            # Migrar: agregar columna de comision si no existe (compatibilidad hacia atrás)
-            if 'comision_usd' not in df.columns:
-                df['comision_usd'] = df['usd_invertidos'] * COMISION_PORCENTAJE
-                log_message("✓ Columna comision_usd migrada al CSV existente")
+        # Corrida repetida del día: se resuelve leyendo solo la cola del CSV, sin pandas
+        if CSV_FILE.exists() and storage.CSVStorage(CSV_FILE).existe_fecha(datetime.now().date()):
+            update_btc_data_incremental(storage.CSVStorage(CSV_FILE))
+            log_message("=" * 60)
+            return
 
-            # Contar duplicados antes de limpiar
-            duplicados_antes = len(df)
+        # Claves de un intervalo menor a 1d (el ledger tuvo compras intradiarias): .dt.date las
+        # colapsaría a fechas al reescribir el CSV, así que la compra se agrega de forma incremental
+        if CSV_FILE.exists() and storage.csv_tiene_instantes(CSV_FILE):
+            log_message("⚠ El ledger tiene compras intradiarias - se registra la compra de forma incremental")
+            update_btc_data_incremental(storage.CSVStorage(CSV_FILE))
+            log_message("✓ Actualización completada exitosamente")
+            log_message("=" * 60)
+            return
 
-            # Eliminar duplicados si existen (mantener solo el primero de cada día)
-            df = df.drop_duplicates(subset=['fecha'], keep='first')
+        with telemetria.etapa('importar_pandas'):
+            import pandas as pd
+            import indice
 
-            duplicados_despues = len(df)
-            if duplicados_antes > duplicados_despues:
-                log_message(f"⚠ Se encontraron {duplicados_antes - duplicados_despues} registro(s) duplicado(s) - limpiando...")
-                # Guardar CSV limpio
-                df.to_csv(CSV_FILE, index=False)
-                log_message(f"✓ CSV limpio guardado")
+        # Paso 1: Leer datos históricos (si existen)
+        if CSV_FILE.exists():
+            with telemetria.etapa('leer_csv', bytes=telemetria.bytes_archivo(CSV_FILE)) as span:
+                df = pd.read_csv(CSV_FILE)
+                span['filas'] = len(df)
+            # Normalizar fechas a solo fecha (sin hora) para comparaciones - usar format='mixed' para manejar formatos inconsistentes
+            with telemetria.etapa('parsear_fechas', filas=len(df)):
+                fechas = pd.to_datetime(df['fecha'], format='mixed')
+                df['fecha'] = fechas.dt.date
+                # Índice datetime64[D] ordenado: búsquedas binarias en lugar de recorrer objetos date
+                indice_fechas = indice.crear(fechas)
+
+            # El ledger se mantiene ordenado por fecha y sin duplicados (se rechazan al insertar);
+            # solo un CSV editado a mano o de versiones anteriores necesita reparación
+            with telemetria.etapa('validar_indice', filas=len(df)) as span:
+                valido = indice.es_valido(indice_fechas)
+                span['valido'] = valido
+
+            if not valido:
+                filas_antes = len(df)
+                conservar = indice.reparar(indice_fechas)  # orden por fecha, primera aparición de cada día
+                df = df.iloc[conservar].reset_index(drop=True)
+                indice_fechas = indice_fechas[conservar]
+                # El CSV reparado se guarda una sola vez, junto con la compra del día (o antes de salir)
+                log_message(f"⚠ Ledger desordenado o con {filas_antes - len(df)} registro(s) duplicado(s) - reparando...")
 
             btc_acumulado_previo = df['btc_acumulado'].iloc[-1]
             log_message(f"BTC acumulado previo: {btc_acumulado_previo:.8f}")
         else:
             df = pd.DataFrame()
+            valido = True
+            indice_fechas = indice.crear([])
             btc_acumulado_previo = 0.0
             log_message("Primera ejecución - creando archivo CSV")
 
-        # Paso 4: Verificar si ya existe un registro para hoy
+        # Paso 2: Verificar si ya existe un registro para hoy (antes de consultar la red)
         fecha_hoy = datetime.now().date()
 
-        if not df.empty and fecha_hoy in df['fecha'].values:
+        if indice.contiene(indice_fechas, fecha_hoy):
             log_message(f"⚠ Ya existe un registro para {fecha_hoy} - regenerando solo el dashboard")
+            if not valido:
+                with escritura.reemplazar(CSV_FILE) as f:
+                    df.to_csv(f, index=False)
+                log_message("✓ CSV limpio guardado")
             # Regenerar dashboard con datos existentes
-            generate_dashboard(df)
+            with telemetria.etapa('metricas'):
+                estado = actualizar_metricas(df.iloc[-1].to_dict(), None, lambda: df)
+            generate_dashboard(df, estado)
             log_message("✓ Dashboard actualizado (sin agregar nueva compra)")
             log_message("=" * 60)
             return
 
-        # Paso 5: Calcular nuevos acumulados
+        # Paso 3: Obtener precio actual y calcular compra del día
+        with telemetria.etapa('precio'):
+            precio_btc = get_btc_price()
+        usd_invertidos = USD_POR_COMPRA
+        comision_usd = usd_invertidos * COMISION_PORCENTAJE
+        btc_comprados = (usd_invertidos - comision_usd) / precio_btc
+        log_message(f"Compra del día: ${usd_invertidos:.2f} = {btc_comprados:.8f} BTC · Comisión: ${comision_usd:.4f}")
+
+        # Paso 4: Calcular nuevos acumulados
         btc_acumulado = btc_acumulado_previo + btc_comprados
         valor_actual_usd = btc_acumulado * precio_btc
 
-        # Paso 6: Crear registro del día
+        # Paso 5: Crear registro del día
         nuevo_registro = {
             'fecha': fecha_hoy,
             'precio_btc_usd': precio_btc,
@@ -138,13 +669,23 @@ def update_btc_data():
             'comision_usd': comision_usd
         }
 
-        # Paso 7: Guardar en CSV
-        df = pd.concat([df, pd.DataFrame([nuevo_registro])], ignore_index=True)
-        df.to_csv(CSV_FILE, index=False)
+        # Paso 6: Guardar en CSV (la fila nueva va al final: el índice sigue ordenado)
+        if indice.posicion(indice_fechas, fecha_hoy) < len(indice_fechas):
+            raise storage.RegistroDuplicado(f"{fecha_hoy} es anterior al último registro del ledger")
+        registro_previo = df.iloc[-1].to_dict() if not df.empty else None
+        with telemetria.etapa('concat') as span:
+            df = pd.concat([df, pd.DataFrame([nuevo_registro])], ignore_index=True)
+            span['filas'] = len(df)
+        with telemetria.etapa('escribir_csv', filas=len(df)) as span:
+            with escritura.reemplazar(CSV_FILE) as f:
+                df.to_csv(f, index=False)
+            span['bytes'] = telemetria.bytes_archivo(CSV_FILE)
         log_message(f"✓ Datos guardados en {CSV_FILE}")
 
-        # Paso 8: Regenerar dashboard HTML
-        generate_dashboard(df)
+        # Paso 7: Actualizar métricas con la fila nueva y regenerar dashboard HTML
+        with telemetria.etapa('metricas'):
+            estado = actualizar_metricas(registro_previo, nuevo_registro, lambda: df)
+        generate_dashboard(df, estado)
 
         log_message("✓ Actualización completada exitosamente")
         log_message("=" * 60)
@@ -152,985 +693,557 @@ def update_btc_data():
     except Exception as e:
         log_message(f"✗ ERROR CRÍTICO: {e}")
         import traceback
-        log_message(traceback.format_exc())
+        log_message(traceback.format_exc(), logging.ERROR)
         sys.exit(1)
 
-def generate_dashboard(df):
-    """Genera el dashboard HTML mejorado con todas las nuevas features"""
-    from datetime import datetime
-
-    # ===== MÉTRICAS BÁSICAS =====
-    total_dias = len(df)
-    total_invertido = total_dias * 2.00
-    btc_total = df['btc_acumulado'].iloc[-1]
-    satoshis = int(btc_total * 100_000_000)
-    precio_actual = df['precio_btc_usd'].iloc[-1]
-    valor_actual = df['valor_actual_usd'].iloc[-1]
-    ganancia = valor_actual - total_invertido
-    porcentaje = (ganancia / total_invertido) * 100 if total_invertido > 0 else 0
-
-    # ===== COMISIONES =====
-    if 'comision_usd' in df.columns:
-        total_comisiones = df['comision_usd'].sum()
-    else:
-        total_comisiones = total_invertido * COMISION_PORCENTAJE
-    pct_comisiones = (total_comisiones / total_invertido) * 100 if total_invertido > 0 else 0
-    ganancia_neta = ganancia - total_comisiones
-    porcentaje_neto = (ganancia_neta / total_invertido) * 100 if total_invertido > 0 else 0
-    color_ganancia_neta = "#10b981" if ganancia_neta >= 0 else "#ef4444"
-    simbolo_neto = "+" if ganancia_neta >= 0 else ""
-
-    # ===== MEJORA 1: PRECIO PROMEDIO DE COMPRA =====
-    precio_promedio = total_invertido / btc_total if btc_total > 0 else 0
-    diff_vs_promedio = ((precio_actual - precio_promedio) / precio_promedio * 100) if precio_promedio > 0 else 0
-
-    # ===== MEJORA 3: INDICADORES DE TENDENCIA =====
-    if len(df) > 1:
-        valor_ayer = df['valor_actual_usd'].iloc[-2]
-        cambio_valor = valor_actual - valor_ayer
-        tendencia_valor = "↗️" if cambio_valor > 0 else "↘️" if cambio_valor < 0 else "→"
-
-        precio_ayer = df['precio_btc_usd'].iloc[-2]
-        cambio_precio = precio_actual - precio_ayer
-        tendencia_precio = "↗️" if cambio_precio > 0 else "↘️" if cambio_precio < 0 else "→"
-    else:
-        tendencia_valor = "→"
-        tendencia_precio = "→"
-        cambio_valor = 0
-        cambio_precio = 0
-
-    # ===== MEJORA 4: ESTADÍSTICAS =====
-    mejor_dia_idx = df['btc_comprados'].idxmax()
-    peor_dia_idx = df['btc_comprados'].idxmin()
-
-    mejor_dia_fecha = str(df.loc[mejor_dia_idx, 'fecha'])
-    mejor_dia_btc = df.loc[mejor_dia_idx, 'btc_comprados']
-    mejor_dia_precio = df.loc[mejor_dia_idx, 'precio_btc_usd']
-
-    peor_dia_fecha = str(df.loc[peor_dia_idx, 'fecha'])
-    peor_dia_btc = df.loc[peor_dia_idx, 'btc_comprados']
-    peor_dia_precio = df.loc[peor_dia_idx, 'precio_btc_usd']
-
-    racha_dias = total_dias
-
-    # Formatear racha en meses/años
-    if racha_dias < 30:
-        racha_formato = f"{racha_dias} día{'s' if racha_dias != 1 else ''}"
-    elif racha_dias < 365:
-        meses = racha_dias // 30
-        racha_formato = f"{meses} mes{'es' if meses != 1 else ''}"
+def escribir_si_cambia(path, contenido):
+    """Escribe el archivo solo si el contenido cambió (evita diffs y cache misses innecesarios)"""
+    path = Path(path)
+    if path.exists() and path.read_text(encoding='utf-8') == contenido:
+        return False
+    escritura.escribir(path, contenido)
+    return True
+
+def escribir_shell():
+    """Escribe los assets versionados y el shell estático (solo si cambiaron)"""
+    assets = dashboard.assets_shell()
+    for nombre, contenido in assets.items():
+        if not (ASSETS_DIR / nombre).exists():
+            escribir_si_cambia(ASSETS_DIR / nombre, contenido)
+            log_message(f"✓ Asset versionado generado: {ASSETS_DIR.name}/{nombre}")
+
+    # Eliminar versiones anteriores de los assets
+    for viejo in ASSETS_DIR.glob("dashboard.*"):
+        if viejo.name not in assets:
+            viejo.unlink()
+
+    nombre_css, nombre_js = sorted(assets, key=lambda n: not n.endswith('.css'))
+    shell = dashboard.render_shell(nombre_css, nombre_js, ASSETS_DIR.name)
+    if escribir_si_cambia(DASHBOARD_FILE, shell):
+        log_message(f"✓ Shell estático generado en {DASHBOARD_FILE}")
+
+def generate_dashboard(df, estado=None, modo=None, portafolio=None, series=None):
+    """Genera el dashboard HTML mejorado con todas las nuevas features
+
+    df puede ser el DataFrame del ledger o sus columnas como listas (camino sin pandas).
+    Las métricas salen del estado incremental; si no se pasa, se recalculan desde df (con las
+    columnas, por el reductor de métricas en un solo lote).
+    series: series ya armadas (recorrido por lotes); en ese caso df no se usa.
+    modo 'inline' escribe la página completa; 'shell' escribe el shell una vez y solo data.json.
+    portafolio: [(símbolo, nombre, estado)] de cada activo para el resumen multi-activo (solo inline).
+    """
+    modo = modo or DASHBOARD_MODE
+    with telemetria.etapa('dashboard', modo=modo):
+        if estado is None:
+            with telemetria.etapa('metricas'):
+                if isinstance(df, dict):
+                    import streaming
+                    estado = streaming.estado_columnas(df, COMISION_PORCENTAJE)
+                else:
+                    estado = metrics.recalcular(df, COMISION_PORCENTAJE)
+
+        campos = dashboard.campos_dashboard(estado)
+        if series is None:
+            with telemetria.etapa('series') as span:
+                series = dashboard.series_dashboard(df)
+                span['filas'] = len(series['ts'])
+        with telemetria.etapa('niveles') as span:
+            series['niveles'] = downsample.niveles_reducidos(series)
+            span['niveles'] = len(series['niveles'])
+        if series['niveles']:
+            # Niveles del zoom: la página (o data.json) trae solo el del primer render
+            contenido = dashboard.render_niveles_json(series)
+            with telemetria.etapa('escribir_niveles', bytes=len(contenido.encode('utf-8'))):
+                escritura.escribir(NIVELES_FILE, contenido)
+
+        if modo == 'shell':
+            if portafolio:
+                log_message("⚠ El resumen multi-activo solo se incluye en el dashboard inline")
+            with telemetria.etapa('escribir_shell'):
+                escribir_shell()
+            with telemetria.etapa('render'):
+                contenido = dashboard.render_datos_json(campos, series)
+            with telemetria.etapa('escribir_datos', bytes=len(contenido.encode('utf-8'))):
+                escritura.escribir(DATA_JSON_FILE, contenido)
+            log_message(f"✓ Datos del dashboard generados en {DATA_JSON_FILE} ({DATA_JSON_FILE.stat().st_size:,} bytes)")
+            return
+
+        # Guardar HTML
+        with telemetria.etapa('render'):
+            html = dashboard.render_inline(campos, series, portafolio)
+        with telemetria.etapa('escribir_html', bytes=len(html.encode('utf-8'))):
+            escritura.escribir(DASHBOARD_FILE, html)
+
+    log_message(f"✓ Dashboard generado en {DASHBOARD_FILE}")
+
+def import_csv(origen, backend):
+    """Importa un CSV de compras al backend de almacenamiento indicado"""
+    df, aplicadas = migraciones.migrar_df(storage.cargar_csv(origen), {'comision_porcentaje': COMISION_PORCENTAJE})
+    for descripcion in aplicadas:
+        log_message(f"✓ Migración aplicada durante la importación: {descripcion}")
+    ledger = abrir_storage(backend)
+    ledger.guardar(df)
+    log_message(f"✓ {len(df)} registros importados desde {origen} al ledger {ledger.nombre}")
+
+def export_csv(destino, backend, desde=None, hasta=None):
+    """Exporta el ledger (o un rango de fechas) del backend indicado a un CSV"""
+    df = abrir_storage(backend).rango(desde, hasta)
+    storage.CSVStorage(destino).guardar(df)
+    log_message(f"✓ {len(df)} registros exportados a {destino}")
+
+def query_ledger(backend, desde=None, hasta=None):
+    """Muestra los agregados de un rango de fechas del ledger"""
+    agregados = abrir_storage(backend).agregados(desde, hasta)
+    log_message(f"Resumen del ledger {backend} ({desde or 'inicio'} → {hasta or 'hoy'}):")
+    for clave, valor in agregados.items():
+        log_message(f"  {clave}: {valor}")
+    return agregados
+
+def backfill_ledger(backend, desde, hasta, archivo_precios=None):
+    """Completa las compras faltantes de un rango de fechas y recalcula los acumulados"""
+    import backfill
+
+    if es_intradia():
+        raise ValueError("El backfill completa días faltantes y no aplica a compras intradiarias (BTC_DCA_INTERVALO)")
+
+    log_message("=" * 60)
+    log_message(f"Backfill del ledger {backend}: {desde} → {hasta}")
+
+    # Paso 1: Precios históricos (archivo local o una sola consulta de rango)
+    if archivo_precios:
+        precios = backfill.cargar_precios_historicos(archivo_precios)
+        log_message(f"✓ {len(precios)} precios diarios leídos de {archivo_precios}")
     else:
-        años = racha_dias // 365
-        meses_restantes = (racha_dias % 365) // 30
-        if meses_restantes > 0:
-            racha_formato = f"{años} año{'s' if años != 1 else ''} y {meses_restantes} mes{'es' if meses_restantes != 1 else ''}"
-        else:
-            racha_formato = f"{años} año{'s' if años != 1 else ''}"
+        precios = backfill.descargar_precios_historicos(desde, hasta)
+        log_message(f"✓ {len(precios)} precios diarios descargados de CoinGecko")
 
-    # Colores
-    color_ganancia = "#10b981" if ganancia >= 0 else "#ef4444"
-    simbolo = "+" if ganancia >= 0 else ""
-    emoji_tendencia = "📈" if ganancia >= 0 else "📉"
+    # Paso 2: Simular todas las compras faltantes de una vez
+    ledger = abrir_storage(backend)
+    df = ledger.cargar() if ledger.existe() else None
 
-    # ===== DATOS PARA GRÁFICOS =====
-    # Generar labels en formato "14 Feb", "15 Feb", etc.
-    import locale
-    try:
-        locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-    except:
-        try:
-            locale.setlocale(locale.LC_TIME, 'es_ES')
-        except:
-            pass  # Si no está disponible, usar el locale por defecto
-
-    fechas_array = [pd.to_datetime(fecha).strftime("%d %b") for fecha in df['fecha']]
-    usd_acumulado_array = [(i + 1) * 2.00 for i in range(len(df))]
-    valor_btc_array = df['valor_actual_usd'].tolist()
-    precio_btc_array = df['precio_btc_usd'].tolist()
-
-    # Timestamp
-    timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-
-    # ===== GENERAR HTML =====
-    html_content = f"""<!DOCTYPE html>
-<html lang="es" data-theme="dark">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=5.0, user-scalable=yes">
-    <title>📊 Bitcoin DCA Tracker</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800;900&family=JetBrains+Mono:wght@400;500;600;800&display=swap" rel="stylesheet">
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5.5.0/dist/echarts.min.js"></script>
-    <style>
-        :root {{
-            --bg-gradient-start: #667eea;
-            --bg-gradient-end: #764ba2;
-            --card-bg: rgba(255, 255, 255, 0.95);
-            --card-border: rgba(255, 255, 255, 0.3);
-            --text-primary: #1f2937;
-            --text-secondary: #6b7280;
-            --text-tertiary: #9ca3af;
-            --shadow: rgba(0, 0, 0, 0.1);
-            --shadow-hover: rgba(0, 0, 0, 0.2);
-        }}
-
-        [data-theme="dark"] {{
-            --bg-gradient-start: #1a1a2e;
-            --bg-gradient-end: #16213e;
-            --card-bg: rgba(30, 30, 46, 0.8);
-            --card-border: rgba(255, 255, 255, 0.1);
-            --text-primary: #f3f4f6;
-            --text-secondary: #d1d5db;
-            --text-tertiary: #9ca3af;
-            --shadow: rgba(0, 0, 0, 0.3);
-            --shadow-hover: rgba(0, 0, 0, 0.5);
-        }}
-
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        /* Mejoras para experiencia táctil en mobile */
-        * {{
-            -webkit-tap-highlight-color: transparent;
-            -webkit-touch-callout: none;
-        }}
-
-        html {{
-            -webkit-text-size-adjust: 100%;
-            text-size-adjust: 100%;
-        }}
-
-        body {{
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, var(--bg-gradient-start) 0%, var(--bg-gradient-end) 100%);
-            background-attachment: fixed;
-            min-height: 100vh;
-            padding: 20px;
-            transition: background 0.3s ease;
-            animation: gradientShift 15s ease infinite;
-            background-size: 200% 200%;
-        }}
-
-        @keyframes gradientShift {{
-            0%, 100% {{ background-position: 0% 50%; }}
-            50% {{ background-position: 100% 50%; }}
-        }}
-
-        @keyframes fadeInUp {{
-            from {{
-                opacity: 0;
-                transform: translateY(20px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-
-        @keyframes pulse {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.05); }}
-        }}
-
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            animation: fadeInUp 0.6s ease;
-        }}
-
-        .header {{
-            text-align: center;
-            color: white;
-            margin-bottom: 40px;
-            position: relative;
-        }}
-
-        .header h1 {{
-            font-size: 3em;
-            margin-bottom: 10px;
-            font-weight: 700;
-            text-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
-            animation: fadeInUp 0.6s ease 0.1s both;
-        }}
-
-        .header p {{
-            opacity: 0.95;
-            font-size: 1.1em;
-            font-weight: 400;
-            animation: fadeInUp 0.6s ease 0.2s both;
-        }}
-
-        /* MODO OSCURO - Toggle (Icono SVG minimalista) */
-        .theme-toggle {{
-            position: absolute;
-            top: 0;
-            right: 0;
-            background: var(--card-bg);
-            border: 1px solid var(--card-border);
-            backdrop-filter: blur(10px);
-            width: 48px;
-            height: 48px;
-            border-radius: 50%;
-            cursor: pointer;
-            box-shadow: 0 4px 12px var(--shadow);
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            z-index: 9999;
-        }}
-
-        .theme-toggle:hover {{
-            transform: translateY(-2px) rotate(20deg);
-            box-shadow: 0 6px 16px var(--shadow-hover);
-        }}
-
-        .theme-toggle svg {{
-            width: 24px;
-            height: 24px;
-            fill: none;
-            stroke: var(--text-primary);
-            stroke-width: 2;
-            stroke-linecap: round;
-            stroke-linejoin: round;
-            transition: all 0.3s ease;
-            pointer-events: none;
-        }}
-
-        .theme-toggle-text {{
-            display: none;
-        }}
-
-        /* Métricas Grid - Estilo compacto con bordes de color */
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(210px, 1fr));
-            gap: 14px;
-            margin-bottom: 30px;
-        }}
-
-        /* Cards con borde de color y separador */
-        .metric-card {{
-            background: var(--card-bg);
-            backdrop-filter: blur(10px);
-            -webkit-backdrop-filter: blur(10px);
-            border-left: 4px solid #667eea;
-            padding: 18px 22px;
-            border-radius: 12px;
-            box-shadow: 0 4px 16px var(--shadow);
-            transition: all 0.3s ease;
-            position: relative;
-            animation: fadeInUp 0.6s ease both;
-            display: flex;
-            flex-direction: column;
-        }}
-
-        /* Colores de borde por card */
-        .metric-card:nth-child(1) {{
-            animation-delay: 0.1s;
-            border-left-color: #667eea;
-        }}
-        .metric-card:nth-child(2) {{
-            animation-delay: 0.15s;
-            border-left-color: #f7931a;
-        }}
-        .metric-card:nth-child(3) {{
-            animation-delay: 0.2s;
-            border-left-color: #10b981;
-        }}
-        .metric-card:nth-child(4) {{
-            animation-delay: 0.25s;
-            border-left-color: #ef4444;
-        }}
-        .metric-card:nth-child(5) {{
-            animation-delay: 0.3s;
-            border-left-color: #8b5cf6;
-        }}
-        .metric-card:nth-child(6) {{
-            animation-delay: 0.35s;
-            border-left-color: #06b6d4;
-        }}
-        .metric-card:nth-child(7) {{
-            animation-delay: 0.4s;
-            border-left-color: #f59e0b;
-        }}
-        .metric-card:nth-child(8) {{
-            animation-delay: 0.45s;
-            border-left-color: #ec4899;
-        }}
-
-        .metric-card:hover {{
-            transform: translateX(4px) translateY(-2px);
-            box-shadow: 0 8px 24px var(--shadow-hover);
-        }}
-
-        /* Label con separador (border-bottom) */
-        .metric-label {{
-            font-size: 0.7em;
-            color: var(--text-tertiary);
-            margin-bottom: 12px;
-            padding-bottom: 10px;
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 0.8px;
-            border-bottom: 1px solid var(--card-border);
-        }}
-
-        /* Tipografía monoespaciada para valores */
-        .metric-value {{
-            font-size: 2em;
-            font-weight: 800;
-            color: var(--text-primary);
-            margin: 8px 0 6px 0;
-            line-height: 1.1;
-            font-family: 'JetBrains Mono', 'SF Mono', 'Monaco', 'Consolas', monospace;
-        }}
-
-        .metric-subtitle {{
-            font-size: 0.75em;
-            color: var(--text-secondary);
-            font-weight: 500;
-        }}
-
-        /* Títulos de secciones */
-        .section-title {{
-            color: white;
-            font-size: 1.8em;
-            font-weight: 600;
-            margin: 40px 0 20px 0;
-            text-align: left;
-            opacity: 0.95;
-            text-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
-        }}
-
-        /* Secciones de información */
-        .info-section {{
-            background: var(--card-bg);
-            backdrop-filter: blur(10px);
-            border-left: 4px solid #667eea;
-            padding: 28px 32px;
-            border-radius: 12px;
-            box-shadow: 0 4px 16px var(--shadow);
-            margin-bottom: 20px;
-            animation: fadeInUp 0.6s ease 0.4s both;
-            transition: all 0.3s ease;
-        }}
-
-        .info-section:hover {{
-            transform: translateX(4px) translateY(-2px);
-            box-shadow: 0 8px 24px var(--shadow-hover);
-        }}
-
-        .info-section:nth-of-type(1) {{
-            border-left-color: #8b5cf6;
-        }}
-
-        .info-section:nth-of-type(2) {{
-            border-left-color: #10b981;
-        }}
-
-        .info-section h2 {{
-            margin-bottom: 24px;
-            padding-bottom: 12px;
-            border-bottom: 1px solid var(--card-border);
-            color: var(--text-primary);
-            font-weight: 600;
-            font-size: 1.4em;
-        }}
-
-
-        /* Gráficos */
-        .chart-container {{
-            position: relative;
-            height: 400px;
-            margin-bottom: 30px;
-        }}
-
-        footer {{
-            text-align: center;
-            color: white;
-            opacity: 0.9;
-            margin-top: 40px;
-            padding: 24px;
-            font-weight: 400;
-            animation: fadeInUp 0.6s ease 0.5s both;
-        }}
-
-        /* ===== MOBILE RESPONSIVE - MEJORES PRÁCTICAS ===== */
-
-        /* Tablet y pantallas medianas */
-        @media (max-width: 1024px) {{
-            body {{
-                padding: 15px;
-            }}
-
-            .metrics-grid {{
-                grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-                gap: 12px;
-            }}
-
-            .section-title {{
-                font-size: 1.5em;
-                margin: 30px 0 15px 0;
-            }}
-        }}
-
-        /* Mobile */
-        @media (max-width: 768px) {{
-            body {{
-                padding: 12px;
-            }}
-
-            /* Header optimizado para mobile */
-            .header {{
-                margin-bottom: 30px;
-                padding-right: 55px;
-            }}
-
-            .header h1 {{
-                font-size: 1.75em;
-                margin-bottom: 8px;
-                line-height: 1.2;
-            }}
-
-            /* Botón dark mode - tamaño táctil óptimo */
-            .theme-toggle {{
-                width: 44px;
-                height: 44px;
-                top: 0;
-                right: 0;
-            }}
-
-            .theme-toggle svg {{
-                width: 20px;
-                height: 20px;
-            }}
-
-            /* Grid de 2 columnas en mobile */
-            .metrics-grid {{
-                grid-template-columns: repeat(2, 1fr);
-                gap: 10px;
-                margin-bottom: 20px;
-            }}
-
-            /* Cards optimizadas para 2 columnas en mobile */
-            .metric-card {{
-                padding: 14px 12px;
-                border-radius: 10px;
-                border-left-width: 3px;
-            }}
-
-            .metric-label {{
-                font-size: 0.6em;
-                margin-bottom: 8px;
-                padding-bottom: 6px;
-                letter-spacing: 0.5px;
-            }}
-
-            .metric-value {{
-                font-size: 1.4em;
-                margin: 5px 0 4px 0;
-            }}
-
-            .metric-subtitle {{
-                font-size: 0.65em;
-                line-height: 1.3;
-            }}
-
-            /* Section titles más compactos */
-            .section-title {{
-                font-size: 1.3em;
-                margin: 25px 0 12px 0;
-            }}
-
-            /* Info sections optimizadas */
-            .info-section {{
-                padding: 18px 20px;
-                border-radius: 10px;
-                margin-bottom: 16px;
-            }}
-
-            .info-section h2 {{
-                font-size: 1.2em;
-                margin-bottom: 18px;
-                padding-bottom: 10px;
-            }}
-
-            /* Gráficos responsivos */
-            .chart-container {{
-                height: 280px;
-                margin-bottom: 20px;
-            }}
-
-            /* Footer */
-            footer {{
-                margin-top: 30px;
-                padding: 20px;
-                font-size: 0.85em;
-            }}
-        }}
-
-        /* Mobile pequeño (iPhone SE, etc) */
-        @media (max-width: 375px) {{
-            body {{
-                padding: 10px;
-            }}
-
-            .header {{
-                padding-right: 50px;
-            }}
-
-            .header h1 {{
-                font-size: 1.5em;
-            }}
-
-            .theme-toggle {{
-                width: 40px;
-                height: 40px;
-                top: 0;
-            }}
-
-            .theme-toggle svg {{
-                width: 18px;
-                height: 18px;
-            }}
-
-            .metric-card {{
-                padding: 14px 16px;
-            }}
-
-            .metric-value {{
-                font-size: 1.4em;
-            }}
-
-            .section-title {{
-                font-size: 1.2em;
-            }}
-
-            .info-section {{
-                padding: 16px 18px;
-            }}
-
-            .chart-container {{
-                height: 240px;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Header -->
-        <div class="header">
-            <!-- Toggle de Modo Oscuro -->
-            <div class="theme-toggle" onclick="toggleTheme()">
-                <svg id="theme-icon" viewBox="0 0 24 24">
-                    <!-- Sol (modo dark) -->
-                    <g class="sun-icon">
-                        <circle cx="12" cy="12" r="4"/>
-                        <line x1="12" y1="1" x2="12" y2="3"/>
-                        <line x1="12" y1="21" x2="12" y2="23"/>
-                        <line x1="4.22" y1="4.22" x2="5.64" y2="5.64"/>
-                        <line x1="18.36" y1="18.36" x2="19.78" y2="19.78"/>
-                        <line x1="1" y1="12" x2="3" y2="12"/>
-                        <line x1="21" y1="12" x2="23" y2="12"/>
-                        <line x1="4.22" y1="19.78" x2="5.64" y2="18.36"/>
-                        <line x1="18.36" y1="5.64" x2="19.78" y2="4.22"/>
-                    </g>
-                    <!-- Luna (modo light) -->
-                    <path class="moon-icon" d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z" style="visibility: hidden;"/>
-                </svg>
-            </div>
-
-            <h1>₿ Bitcoin DCA Tracker</h1>
-        </div>
-
-        <!-- Sección 1: Tu Inversión Actual -->
-        <h2 class="section-title">💰 Tu Inversión Actual</h2>
-        <div class="metrics-grid">
-            <div class="metric-card">
-                <div class="metric-label">💵 Total Invertido</div>
-                <div class="metric-value">${total_invertido:.2f}</div>
-                <div class="metric-subtitle">{total_dias} día{'s' if total_dias != 1 else ''} × $2 USD · Fees: ${total_comisiones:.3f}</div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">₿ BTC Acumulado</div>
-                <div class="metric-value">{btc_total:.8f}</div>
-                <div class="metric-subtitle">Satoshis: {satoshis:,}</div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">📈 Valor Actual</div>
-                <div class="metric-value">
-                    ${valor_actual:.2f}
-                </div>
-                <div class="metric-subtitle">BTC @ ${precio_actual:,.2f}</div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">{emoji_tendencia} Ganancia Real (con fees)</div>
-                <div class="metric-value" style="color: {color_ganancia_neta}">{simbolo_neto}${ganancia_neta:.2f}</div>
-                <div class="metric-subtitle" style="color: {color_ganancia_neta}">{simbolo_neto}{porcentaje_neto:.2f}% · Bruta: {simbolo}${ganancia:.2f}</div>
-            </div>
-        </div>
-
-        <!-- Sección 2: Análisis Histórico -->
-        <h2 class="section-title">📊 Análisis Histórico</h2>
-        <div class="metrics-grid">
-            <div class="metric-card">
-                <div class="metric-label">📊 Precio Promedio</div>
-                <div class="metric-value">${precio_promedio:,.2f}</div>
-                <div class="metric-subtitle">
-                    {'+' if diff_vs_promedio >= 0 else ''}{diff_vs_promedio:.1f}% vs actual
-                </div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">🏆 Mejor Día de Compra</div>
-                <div class="metric-value">${mejor_dia_precio:,.2f}</div>
-                <div class="metric-subtitle">{mejor_dia_fecha} · {mejor_dia_btc:.8f} BTC</div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">📉 Peor Día de Compra</div>
-                <div class="metric-value">${peor_dia_precio:,.2f}</div>
-                <div class="metric-subtitle">{peor_dia_fecha} · {peor_dia_btc:.8f} BTC</div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">🔥 Racha Consecutiva</div>
-                <div class="metric-value">{racha_formato}</div>
-                <div class="metric-subtitle">{racha_dias} día{'s' if racha_dias != 1 else ''} totales</div>
-            </div>
-
-            <div class="metric-card">
-                <div class="metric-label">💸 Comisiones Pagadas</div>
-                <div class="metric-value">${total_comisiones:.3f}</div>
-                <div class="metric-subtitle">{pct_comisiones:.1f}% del capital · {total_dias} transacción{'es' if total_dias != 1 else ''}</div>
-            </div>
-        </div>
-
-        <!-- Primer Gráfico - Evolución del DCA -->
-        <div class="info-section">
-            <h2>📊 Evolución del DCA</h2>
-            <div class="chart-container">
-                <div id="dcaChart" style="width: 100%; height: 100%;"></div>
-            </div>
-        </div>
-
-        <!-- Segundo Gráfico - Precio de Bitcoin -->
-        <div class="info-section">
-            <h2>💹 Precio de Bitcoin en el Tiempo</h2>
-            <div class="chart-container">
-                <div id="btcPriceChart" style="width: 100%; height: 100%;"></div>
-            </div>
-        </div>
-
-        <footer>
-            <p>@ Generado automáticamente · {timestamp}</p>
-        </footer>
-    </div>
-
-    <script>
-        // ===== MODO OSCURO =====
-        function updateThemeIcon(theme) {{
-            const svg = document.getElementById('theme-icon');
-            const sunIcon = svg.querySelector('.sun-icon');
-            const moonIcon = svg.querySelector('.moon-icon');
-
-            if (theme === 'dark') {{
-                // Modo dark: mostrar sol (para cambiar a light)
-                sunIcon.style.visibility = 'visible';
-                moonIcon.style.visibility = 'hidden';
-            }} else {{
-                // Modo light: mostrar luna (para cambiar a dark)
-                sunIcon.style.visibility = 'hidden';
-                moonIcon.style.visibility = 'visible';
-            }}
-        }}
-
-        // Cargar tema guardado
-        const savedTheme = localStorage.getItem('theme') || 'dark';
-        document.documentElement.setAttribute('data-theme', savedTheme);
-        updateThemeIcon(savedTheme);
-
-        // Datos desde Python
-        const labels = {fechas_array};
-        const dataInvertido = {usd_acumulado_array};
-        const dataValorBTC = {valor_btc_array};
-        const dataPrecioBTC = {precio_btc_array};
-
-        // ===== APACHE ECHARTS - GRÁFICOS =====
-
-        // Configuración de tema según modo
-        function getEChartsTheme() {{
-            const isDark = document.documentElement.getAttribute('data-theme') === 'dark';
-            return isDark ? 'dark' : null; // null es el tema light por defecto
-        }}
-
-        // Calcular rango dinámico para precio BTC (margen del 2%)
-        function getBTCPriceRange() {{
-            const min = Math.min(...dataPrecioBTC);
-            const max = Math.max(...dataPrecioBTC);
-            const range = max - min;
-            const margin = range * 0.5; // 50% de margen arriba y abajo
-            return {{
-                min: Math.floor(min - margin),
-                max: Math.ceil(max + margin)
-            }};
-        }}
-
-        // Calcular rango dinámico para DCA (comenzar cerca del primer valor)
-        function getDCARange() {{
-            const allValues = [...dataInvertido, ...dataValorBTC];
-            const min = Math.min(...allValues);
-            const max = Math.max(...allValues);
-            const range = max - min;
-            const margin = range * 0.3; // 30% de margen
-            return {{
-                min: Math.max(0, Math.floor(min - margin)),
-                max: Math.ceil(max + margin)
-            }};
-        }}
-
-        let dcaChart, btcPriceChart;
-
-        // Inicializar gráficos con ECharts
-        function initCharts() {{
-            try {{
-                const theme = getEChartsTheme();
-
-                // Destruir instancias previas si existen
-                if (dcaChart) dcaChart.dispose();
-                if (btcPriceChart) btcPriceChart.dispose();
-
-            // Gráfico 1: Evolución del DCA
-            dcaChart = echarts.init(document.getElementById('dcaChart'), theme);
-            dcaChart.setOption({{
-                animation: true,
-                animationDuration: 1000,
-                animationEasing: 'cubicOut',
-                tooltip: {{
-                    trigger: 'axis',
-                    axisPointer: {{
-                        type: 'cross',
-                        crossStyle: {{
-                            color: '#667eea'
-                        }}
-                    }},
-                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
-                    borderColor: '#667eea',
-                    borderWidth: 1,
-                    textStyle: {{ fontSize: 13 }},
-                    formatter: function(params) {{
-                        let result = params[0].name + '<br/>';
-                        params.forEach(item => {{
-                            result += item.marker + ' ' + item.seriesName + ': $' +
-                                     item.value.toFixed(2) + '<br/>';
-                        }});
-                        return result;
-                    }}
-                }},
-                legend: {{
-                    data: ['💵 USD Invertidos', '₿ Valor de Bitcoins'],
-                    top: 10,
-                    textStyle: {{ fontSize: 13 }}
-                }},
-                grid: {{
-                    left: '3%',
-                    right: '4%',
-                    bottom: '3%',
-                    top: 60,
-                    containLabel: true
-                }},
-                xAxis: {{
-                    type: 'category',
-                    data: labels,
-                    boundaryGap: false, // Comienza justo en el primer punto
-                    axisLabel: {{ rotate: 45 }},
-                    axisLine: {{ show: false }}, // Sin línea del eje
-                    axisTick: {{ show: false }}, // Sin ticks
-                    splitLine: {{ show: false }} // Sin líneas de cuadrícula
-                }},
-                yAxis: {{
-                    type: 'value',
-                    scale: true,
-                    min: getDCARange().min,
-                    max: getDCARange().max,
-                    axisLabel: {{
-                        formatter: '${{value}}'
-                    }},
-                    axisLine: {{ show: false }}, // Sin línea del eje
-                    axisTick: {{ show: false }}, // Sin ticks
-                    splitLine: {{ show: false }} // Sin líneas de cuadrícula
-                }},
-                series: [
-                    {{
-                        name: '💵 USD Invertidos',
-                        type: 'line',
-                        data: dataInvertido,
-                        smooth: true,
-                        lineStyle: {{ width: 3, color: '#667eea' }},
-                        itemStyle: {{ color: '#667eea' }},
-                        areaStyle: {{
-                            color: {{
-                                type: 'linear',
-                                x: 0, y: 0, x2: 0, y2: 1,
-                                colorStops: [
-                                    {{ offset: 0, color: 'rgba(102, 126, 234, 0.3)' }},
-                                    {{ offset: 1, color: 'rgba(102, 126, 234, 0.05)' }}
-                                ]
-                            }}
-                        }},
-                        emphasis: {{ focus: 'series' }}
-                    }},
-                    {{
-                        name: '₿ Valor de Bitcoins',
-                        type: 'line',
-                        data: dataValorBTC,
-                        smooth: true,
-                        lineStyle: {{ width: 3, color: '#f7931a' }},
-                        itemStyle: {{ color: '#f7931a' }},
-                        areaStyle: {{
-                            color: {{
-                                type: 'linear',
-                                x: 0, y: 0, x2: 0, y2: 1,
-                                colorStops: [
-                                    {{ offset: 0, color: 'rgba(247, 147, 26, 0.3)' }},
-                                    {{ offset: 1, color: 'rgba(247, 147, 26, 0.05)' }}
-                                ]
-                            }}
-                        }},
-                        emphasis: {{ focus: 'series' }}
-                    }}
-                ]
-            }});
-
-            // Gráfico 2: Precio de Bitcoin
-            btcPriceChart = echarts.init(document.getElementById('btcPriceChart'), theme);
-            btcPriceChart.setOption({{
-                animation: true,
-                animationDuration: 1000,
-                animationEasing: 'cubicOut',
-                tooltip: {{
-                    trigger: 'axis',
-                    axisPointer: {{
-                        type: 'cross',
-                        crossStyle: {{
-                            color: '#10b981'
-                        }}
-                    }},
-                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
-                    borderColor: '#10b981',
-                    borderWidth: 1,
-                    textStyle: {{ fontSize: 13 }},
-                    formatter: function(params) {{
-                        return params[0].name + '<br/>' +
-                               params[0].marker + ' Precio: $' +
-                               params[0].value.toLocaleString('en-US', {{minimumFractionDigits: 2}});
-                    }}
-                }},
-                legend: {{
-                    data: ['💰 Precio de Bitcoin (USD)'],
-                    top: 10,
-                    textStyle: {{ fontSize: 13 }}
-                }},
-                grid: {{
-                    left: '3%',
-                    right: '4%',
-                    bottom: '3%',
-                    top: 60,
-                    containLabel: true
-                }},
-                xAxis: {{
-                    type: 'category',
-                    data: labels,
-                    boundaryGap: false, // Comienza justo en el primer punto
-                    axisLabel: {{ rotate: 45 }},
-                    axisLine: {{ show: false }}, // Sin línea del eje
-                    axisTick: {{ show: false }}, // Sin ticks
-                    splitLine: {{ show: false }} // Sin líneas de cuadrícula
-                }},
-                yAxis: {{
-                    type: 'value',
-                    scale: true,
-                    min: getBTCPriceRange().min,
-                    max: getBTCPriceRange().max,
-                    axisLabel: {{
-                        formatter: function(value) {{
-                            return '$' + value.toLocaleString('en-US', {{maximumFractionDigits: 0}});
-                        }}
-                    }},
-                    axisLine: {{ show: false }}, // Sin línea del eje
-                    axisTick: {{ show: false }}, // Sin ticks
-                    splitLine: {{ show: false }} // Sin líneas de cuadrícula
-                }},
-                series: [{{
-                    name: '💰 Precio de Bitcoin (USD)',
-                    type: 'line',
-                    data: dataPrecioBTC,
-                    smooth: true,
-                    lineStyle: {{ width: 3, color: '#10b981' }},
-                    itemStyle: {{ color: '#10b981' }},
-                    areaStyle: {{
-                        color: {{
-                            type: 'linear',
-                            x: 0, y: 0, x2: 0, y2: 1,
-                            colorStops: [
-                                {{ offset: 0, color: 'rgba(16, 185, 129, 0.3)' }},
-                                {{ offset: 1, color: 'rgba(16, 185, 129, 0.05)' }}
-                            ]
-                        }}
-                    }},
-                    emphasis: {{ focus: 'series' }}
-                }}]
-            }});
-
-                // Responsive automático
-                window.addEventListener('resize', function() {{
-                    if (dcaChart) dcaChart.resize();
-                    if (btcPriceChart) btcPriceChart.resize();
-                }});
-            }} catch (error) {{
-                console.error('Error al inicializar gráficos:', error);
-                // Aunque falle, el resto del sitio debe funcionar
-            }}
-        }}
-
-        // Función actualizada de toggle theme
-        function toggleTheme() {{
-            const html = document.documentElement;
-            const currentTheme = html.getAttribute('data-theme');
-            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
-
-            html.setAttribute('data-theme', newTheme);
-            localStorage.setItem('theme', newTheme);
-            updateThemeIcon(newTheme);
-
-            // Recrear gráficos con nuevo tema
-            initCharts();
-        }}
-
-        // Inicializar gráficos cuando el DOM esté completamente cargado
-        if (document.readyState === 'loading') {{
-            document.addEventListener('DOMContentLoaded', initCharts);
-        }} else {{
-            // DOM ya está listo, ejecutar inmediatamente
-            initCharts();
-        }}
-    </script>
-</body>
-</html>"""
-
-    # Guardar HTML
-    with open(DASHBOARD_FILE, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    df, agregados, sin_precio = backfill.backfill(
+        df, precios, desde, hasta, USD_POR_COMPRA, COMISION_PORCENTAJE, storage.COLUMNAS
+    )
+    if sin_precio:
+        log_message(f"⚠ {len(sin_precio)} día(s) sin precio disponible: {', '.join(map(str, sin_precio[:5]))}{'...' if len(sin_precio) > 5 else ''}")
 
-    log_message(f"✓ Dashboard generado en {DASHBOARD_FILE}")
+    if agregados == 0:
+        log_message("✓ No hay días faltantes en el rango")
+        log_message("=" * 60)
+        return df
+
+    # Paso 3: Guardar ledger completo y regenerar dashboard
+    ledger.guardar(df)
+    log_message(f"✓ {agregados} compra(s) agregada(s) · {len(df)} registros en total")
+    estado = metrics.recalcular(df, COMISION_PORCENTAJE)
+    metrics.guardar_estado(METRICS_FILE, estado)
+    generate_dashboard(df, estado)
+    log_message("=" * 60)
+    return df
+
+def verificar_ledger(backend, reparar=False, rtol=None, tamano_lote=None):
+    """Recalcula acumulados, valor y comisiones del ledger por lotes y reporta la primera fila que no cierra
+
+    Con reparar, reescribe las columnas derivadas (y orden / fechas repetidas) y regenera métricas
+    y dashboard. Devuelve True si el ledger queda consistente.
+    """
+    import streaming
+    import verificacion
+
+    tamano_lote = tamano_lote or storage.TAMANO_LOTE
+    rtol = verificacion.RTOL if rtol is None else rtol
+    ledger = abrir_storage(backend)
+    if not ledger.existe():
+        log_message(f"⚠ No hay ledger {backend} para verificar")
+        return True
+
+    log_message(f"Verificando el ledger {backend} en lotes de {tamano_lote:,} filas (rtol {rtol:g})...")
+    inicio = time.perf_counter()
+    with telemetria.etapa('verificar', backend=backend, lote=tamano_lote) as span:
+        reductor = verificacion.reductor(COMISION_PORCENTAJE, rtol)
+        resultado = streaming.recorrer(ledger.lotes(tamano_lote), {'verificacion': reductor})['verificacion']
+        span['filas'] = resultado['filas']
+    log_message(f"✓ {resultado['filas']:,} filas verificadas en {time.perf_counter() - inicio:.3f}s")
+
+    for nombre, chequeo in resultado['chequeos'].items():
+        primera = chequeo['primera']
+        if primera is None:
+            log_message(f"  ✓ {nombre}: {verificacion.CHEQUEOS[nombre]}")
+            continue
+        detalle = f"fila {primera['fila']:,} ({primera['fecha']})"
+        if primera['esperado'] is not None:
+            detalle += f": guardado {primera['guardado']!r}, esperado {primera['esperado']!r}"
+        log_message(f"  ✗ {nombre}: {chequeo['divergentes']:,} fila(s) fuera de tolerancia · primera en {detalle}")
+    totales = resultado['totales']
+    log_message(f"  BTC acumulado recalculado: {totales['btc_acumulado'] or 0:.8f} · Invertido: ${totales['usd_invertidos']:,.2f} · Comisiones: ${totales['comision_usd']:,.4f}")
+
+    divergentes = [nombre for nombre, chequeo in resultado['chequeos'].items() if chequeo['divergentes']]
+    if not divergentes:
+        log_message("✓ Ledger consistente")
+        return True
+    corregibles = [nombre for nombre in divergentes if nombre in verificacion.CORREGIBLES]
+    if corregibles and not reparar:
+        log_message(f"⚠ {', '.join(corregibles)} se puede(n) recalcular con: verify --reparar")
+    if any(nombre not in verificacion.CORREGIBLES for nombre in divergentes):
+        log_message("⚠ comision_usd y btc_comprados registran lo que se pagó: no se reescriben, revisar a mano")
+    if not (reparar and corregibles):
+        return False
+
+    with telemetria.etapa('reparar', backend=backend):
+        df, descartadas = verificacion.corregir(ledger.cargar())
+        ledger.guardar(df)
+    log_message(f"✓ btc_acumulado y valor_actual_usd recalculados en {len(df):,} filas · {descartadas} fila(s) repetida(s) o fuera de orden descartada(s)")
+    estado, fuente = metricas_ledger(ledger, ledger.ultimo_registro(), None)
+    dashboard_ledger(fuente, estado)
+    return len(corregibles) == len(divergentes)
+
+def ejecutar_daemon(backend, cadencia=CADENCIA_DAEMON, desfase=DESFASE_DAEMON, debounce=None, perfilar=()):
+    """Modo daemon: ledger y métricas en memoria, una compra por período y solo deltas a disco
+
+    Cada tick toma el bloqueo de datos, compra si el período todavía no tiene registro (una fila
+    agregada y el estado de métricas) y pide un render; el render corre con debounce y también
+    bajo el bloqueo. perfilar: etapas a perfilar en cada tick y render (como --perfilar).
+    """
+    import asyncio
+    import daemon
+
+    intervalo = intervalos.parse_intervalo(cadencia)
+    desfase_segundos = intervalos.parse_intervalo(desfase) if desfase not in (None, '', '0') else 0.0
+    debounce = daemon.DEBOUNCE_SEGUNDOS if debounce is None else debounce
+    ledger = abrir_storage(backend)
+
+    def cargar_memoria():
+        # Con compras intradiarias las columnas en memoria son las del resumen diario
+        with telemetria.etapa('cargar_memoria', backend=ledger.nombre):
+            ultimo = ledger.ultimo_registro()
+            if ultimo is None:
+                columnas = diario.COLUMNAS if es_intradia() else storage.COLUMNAS
+                return {'columnas': {c: [] for c in columnas}, 'ultimo': None, 'estado': metrics.estado_inicial()}
+            estado, fuente = metricas_ledger(ledger, ultimo, None)
+            return {'columnas': leer_columnas(fuente), 'ultimo': ultimo, 'estado': estado}
+
+    def contador():
+        # Intradiario: el estado cuenta filas del resumen (días); las compras salen de su columna
+        dias = memoria['estado']['dias']
+        if not es_intradia():
+            return f"{dias:,} días"
+        return f"{sum(memoria['columnas']['compras']):,} compras en {dias:,} días"
+
+    def comprar():
+        """Tick sincrónico (corre en un hilo): devuelve True si cambió el estado en memoria"""
+        with escritura.bloqueo(LOCK_FILE):
+            # Otra corrida (cron, manual) pudo escribir el ledger: se compara solo su cola
+            recargado = not metrics.sigue_al_ledger(memoria['estado'], ledger.ultimo_registro())
+            if recargado:
+                log_message("⚠ El ledger cambió fuera del daemon - recargando el estado en memoria")
+                memoria.update(cargar_memoria())
+
+            periodo = periodo_actual()
+            ultimo = memoria['ultimo']
+            if ultimo is not None and intervalos.como_instante(ultimo['fecha']) >= intervalos.como_instante(periodo):
+                return recargado  # el período ya tiene su compra
+
+            with telemetria.etapa('precio'):
+                # TTL por debajo de la cadencia: la cotización del tick anterior nunca se reutiliza
+                precio_btc = get_btc_price(ttl=min(PRICE_CACHE_TTL, intervalo))
+            nuevo_registro = calcular_compra(periodo, precio_btc, ultimo['btc_acumulado'] if ultimo else 0.0)
+            with telemetria.etapa('agregar', backend=ledger.nombre, filas=1):
+                ledger.agregar(nuevo_registro)
+            with telemetria.etapa('metricas'):
+                if not es_intradia():
+                    memoria['estado'] = metrics.actualizar(memoria['estado'], nuevo_registro, COMISION_PORCENTAJE)
+                    metrics.guardar_estado(METRICS_FILE, memoria['estado'])
+                    for columna, valores in memoria['columnas'].items():
+                        valores.append(nuevo_registro[columna])
+                else:
+                    if diario.actualizar(DIARIO_FILE, ultimo, nuevo_registro, ledger):
+                        memoria['columnas'] = diario.ResumenDiario(DIARIO_FILE).leer_columnas()
+                    else:
+                        diario.acumular(memoria['columnas'], nuevo_registro)
+                    memoria['estado'] = diario.estado(memoria['columnas'], COMISION_PORCENTAJE)
+            memoria['ultimo'] = nuevo_registro
+            log_message(f"✓ Compra del {intervalos.formatear(periodo)} agregada al ledger {ledger.nombre} ({contador()})")
+            return True
+
+    def renderizar():
+        if memoria['estado']['dias'] == 0:
+            return
+        # index.html y niveles.json son datos del repo: el cron no puede escribirlos a la vez
+        with escritura.bloqueo(LOCK_FILE):
+            generate_dashboard(memoria['columnas'], memoria['estado'])
+
+    async def principal():
+        ocupado = asyncio.Lock()  # tick y render nunca se superponen (comparten la telemetría de la corrida)
+
+        async def tick():
+            async with ocupado:
+                try:
+                    cambio = await asyncio.to_thread(comprar)
+                finally:
+                    reiniciar_telemetria()
+                    registro.vaciar()  # el log del tick queda en disco aunque el daemon muera después
+            if cambio:
+                render.pedir()
+
+        async def dibujar():
+            async with ocupado:
+                try:
+                    await asyncio.to_thread(renderizar)
+                finally:
+                    reiniciar_telemetria()
+                    registro.vaciar()
+
+        render = daemon.Debounce(dibujar, espera=debounce)
+        render.pedir()  # primer render con el estado cargado al arrancar
+        await daemon.correr(tick, intervalo, desfase_segundos, log=log_message)
+        await render.vaciar()
+
+    def reiniciar_telemetria():
+        # Cada tick o render queda como una corrida propia en run_metrics.jsonl (sin acumular spans)
+        resumen = telemetria.finalizar('ok')
+        for perfil in perfilar if resumen else ():
+            destino = LOG_DIR / f"perfil-{perfil}-{resumen['corrida']}.prof"
+            if destino.exists():
+                log_message(f"✓ Perfil de '{perfil}' guardado en {destino}")
+        telemetria.iniciar(RUN_METRICS_FILE, 'daemon', perfilar, LOG_DIR)
+
+    log_message("=" * 60)
+    log_message(f"Daemon del tracker BTC DCA: ledger {backend}, cada {cadencia} (desfase {desfase}), debounce {debounce:g}s")
+    memoria = cargar_memoria()
+    log_message(f"✓ {contador()} en memoria")
+    asyncio.run(principal())
+    log_message("✓ Daemon detenido")
+    log_message("=" * 60)
+
+def analizar_ledger(backend, tamano_lote=None):
+    """Recalcula métricas y dashboard recorriendo el ledger por lotes (una pasada, memoria acotada)"""
+    import streaming
+
+    tamano_lote = tamano_lote or storage.TAMANO_LOTE
+    ledger = abrir_storage(backend)
+    log_message(f"Analizando el ledger {backend} en lotes de {tamano_lote:,} filas...")
+    inicio = time.perf_counter()
+    with telemetria.etapa('analizar', backend=backend, lote=tamano_lote) as span:
+        resultado = streaming.analizar(ledger.lotes(tamano_lote), COMISION_PORCENTAJE)
+        span['filas'] = resultado['estado']['dias']
+    estado = resultado['estado']
+    if estado['dias'] == 0:
+        log_message("⚠ El ledger está vacío - no hay nada que analizar")
+        return estado
+    log_message(f"✓ {estado['dias']:,} registros recorridos en {time.perf_counter() - inicio:.3f}s · {len(resultado['series']['ts']):,} puntos en las series")
+
+    precio_promedio = estado['total_invertido'] / estado['btc_total'] if estado['btc_total'] > 0 else 0
+    log_message(f"  Invertido: ${estado['total_invertido']:,.2f} · Comisiones: ${estado['total_comisiones']:,.4f}")
+    log_message(f"  BTC: {estado['btc_total']:.8f} · Precio promedio: ${precio_promedio:,.2f}")
+    log_message(f"  Mejor día: {estado['mejor_dia']['fecha']} · Peor día: {estado['peor_dia']['fecha']}")
+    metrics.guardar_estado(METRICS_FILE, estado)
+    generate_dashboard(None, estado, series=resultado['series'])
+    return estado
+
+def sweep_estrategias(backend, montos, frecuencias, comisiones, desde=None, hasta=None,
+                      archivo_precios=None, procesos=None, top=20, salida=None):
+    """Evalúa una grilla de estrategias DCA sobre la serie de precios histórica"""
+    import pandas as pd
+    import sweep
+
+    # Paso 1: Serie de precios (archivo local o precios registrados en el ledger)
+    if archivo_precios:
+        import backfill
+        precios = backfill.cargar_precios_historicos(archivo_precios)
+    else:
+        df = abrir_storage(backend).rango(desde, hasta)
+        precios = pd.Series(df['precio_btc_usd'].to_numpy(dtype='float64'), index=pd.to_datetime(df['fecha']))
+    if desde is not None:
+        precios = precios[precios.index >= pd.Timestamp(desde)]
+    if hasta is not None:
+        precios = precios[precios.index <= pd.Timestamp(hasta)]
+    if precios.empty:
+        raise ValueError("No hay precios en el rango indicado")
+    precios = sweep.serie_diaria(precios)
+
+    # Paso 2: Evaluar toda la grilla
+    total = sweep.combinaciones(montos, frecuencias, comisiones)
+    log_message(f"Evaluando {total:,} combinaciones sobre {len(precios)} días de precios...")
+    inicio = time.perf_counter()
+    tabla = sweep.evaluar_grilla(precios, montos, frecuencias, comisiones, procesos=procesos)
+    log_message(f"✓ Grilla evaluada en {time.perf_counter() - inicio:.3f}s")
+
+    # Paso 3: Mostrar ranking y guardar tabla completa
+    print(tabla.head(top).to_string(float_format=lambda v: f"{v:,.4f}"))
+    if salida:
+        tabla.to_csv(salida)
+        log_message(f"✓ Resultados guardados en {salida}")
+    return tabla
+
+# Subcomandos que no toman el bloqueo de datos: no escriben ledger, métricas ni dashboard,
+# o (daemon) lo toman en cada tick para no bloquear al cron mientras esperan
+COMANDOS_SIN_BLOQUEO = ("export", "query", "sweep", "daemon")
+
+def parse_lista(tipo):
+    """Devuelve un parser de listas separadas por coma para argparse"""
+    def parser(valor):
+        return [tipo(v) for v in valor.split(",") if v.strip()]
+    return parser
+
+def parse_fecha(valor):
+    """Parsea una fecha YYYY-MM-DD de la línea de comandos"""
+    return datetime.strptime(valor, "%Y-%m-%d").date()
+
+def parse_args(argv=None):
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Actualización diaria del tracker de BTC DCA")
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        default=os.environ.get("BTC_DCA_APPEND") == "1",
+        help="Modo ledger append-only: lee solo la cola del CSV y agrega una línea (también BTC_DCA_APPEND=1)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=sorted(storage.BACKENDS),
+        default=os.environ.get("BTC_DCA_STORAGE", "csv"),
+        help="Backend de almacenamiento del ledger (también BTC_DCA_STORAGE)",
+    )
+    parser.add_argument(
+        "--dashboard",
+        choices=["inline", "shell"],
+        default=DASHBOARD_MODE,
+        help="inline: página HTML completa; shell: shell estático cacheable + data.json (también BTC_DCA_DASHBOARD)",
+    )
+    parser.add_argument(
+        "--perfilar",
+        action="append",
+        metavar="ETAPA",
+        default=[e for e in os.environ.get("BTC_DCA_PERFILAR", "").split(",") if e],
+        help="Ejecuta la etapa (p. ej. leer_csv, render) bajo cProfile y guarda el .prof en logs/ (también BTC_DCA_PERFILAR)",
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=intervalos.intervalo_compra,
+        default=INTERVALO_COMPRA,
+        help="Intervalo entre compras: 1d o un divisor del día (15m, 1h); el monto diario se reparte entre las compras (también BTC_DCA_INTERVALO)",
+    )
+    parser.add_argument(
+        "--lote",
+        type=int,
+        default=LOTE_STREAMING,
+        help="Arma las series del dashboard recorriendo el ledger en lotes de N filas, con memoria acotada (también BTC_DCA_LOTE)",
+    )
+    parser.add_argument(
+        "--activos",
+        type=parse_lista(str.strip),
+        default=ACTIVOS,
+        help="Ids de CoinGecko a comprar, separados por coma (ej: bitcoin,ethereum); un ledger por activo (también BTC_DCA_ACTIVOS)",
+    )
+    subparsers = parser.add_subparsers(dest="comando")
+
+    parser_import = subparsers.add_parser("import", help="Importar un CSV al backend de --storage")
+    parser_import.add_argument("archivo", nargs="?", default=str(CSV_FILE), help="CSV de origen")
+
+    parser_export = subparsers.add_parser("export", help="Exportar el backend de --storage a CSV")
+    parser_export.add_argument("archivo", nargs="?", default=str(CSV_FILE), help="CSV de destino")
+    parser_export.add_argument("--desde", type=parse_fecha, help="Fecha inicial YYYY-MM-DD")
+    parser_export.add_argument("--hasta", type=parse_fecha, help="Fecha final YYYY-MM-DD")
+
+    parser_query = subparsers.add_parser("query", help="Agregados de un rango de fechas del ledger")
+    parser_query.add_argument("--desde", type=parse_fecha, help="Fecha inicial YYYY-MM-DD")
+    parser_query.add_argument("--hasta", type=parse_fecha, help="Fecha final YYYY-MM-DD")
+
+    parser_backfill = subparsers.add_parser("backfill", help="Completar compras faltantes de un rango de fechas")
+    parser_backfill.add_argument("--desde", type=parse_fecha, required=True, help="Fecha inicial YYYY-MM-DD")
+    parser_backfill.add_argument("--hasta", type=parse_fecha, default=datetime.now().date(), help="Fecha final YYYY-MM-DD (por defecto hoy)")
+    parser_backfill.add_argument("--precios", help="CSV local de precios históricos (fecha, precio); si se omite se descarga de CoinGecko")
+
+    parser_portafolios = subparsers.add_parser("portafolios", help="Actualizar todos los portafolios de un archivo de configuración")
+    parser_portafolios.add_argument("--config", default=str(PORTAFOLIOS_FILE), help="JSON con la lista de portafolios (también BTC_DCA_PORTAFOLIOS)")
+    parser_portafolios.add_argument("--procesos", type=int, help="Procesos del pool de render (por defecto según la cantidad de portafolios)")
+
+    subparsers.add_parser("metrics", help="Verificar el estado de métricas incrementales contra el ledger completo")
+
+    subparsers.add_parser("analizar", help="Recalcular métricas y dashboard recorriendo el ledger por lotes (--lote)")
+
+    parser_verify = subparsers.add_parser("verify", help="Verificar acumulados, valor y comisiones de cada fila del ledger (por lotes, --lote)")
+    parser_verify.add_argument("--reparar", action="store_true", help="Reescribir btc_acumulado y valor_actual_usd recalculados (y ordenar / quitar fechas repetidas)")
+    parser_verify.add_argument("--rtol", type=float, help="Tolerancia relativa (por defecto 1e-9; la absoluta es un satoshi / un micro-dólar)")
+
+    parser_daemon = subparsers.add_parser("daemon", help="Proceso continuo: compra en cada período y re-renderiza con debounce")
+    parser_daemon.add_argument("--cadencia", default=CADENCIA_DAEMON, help="Cada cuánto corre el tick: 15m, 1h, 1d (también BTC_DCA_CADENCIA)")
+    parser_daemon.add_argument("--desfase", default=DESFASE_DAEMON, help="Desfase de los ticks sobre la medianoche UTC; 1d + 12h = 12:00 UTC (también BTC_DCA_DESFASE)")
+    parser_daemon.add_argument("--debounce", type=float, help="Segundos sin cambios antes de re-renderizar el dashboard")
+
+    parser_sweep = subparsers.add_parser("sweep", help="Evaluar una grilla de estrategias DCA sobre el historial de precios")
+    parser_sweep.add_argument("--montos", type=parse_lista(float), default=[USD_POR_COMPRA], help="Montos por compra en USD (ej: 1,2,5,10)")
+    parser_sweep.add_argument("--frecuencias", type=parse_lista(int), default=[1, 7, 14, 30], help="Frecuencias en días; múltiplos de 7 prueban cada día de la semana")
+    parser_sweep.add_argument("--comisiones", type=parse_lista(float), default=[COMISION_PORCENTAJE], help="Comisiones por compra (ej: 0.001,0.003,0.006)")
+    parser_sweep.add_argument("--desde", type=parse_fecha, help="Fecha inicial YYYY-MM-DD")
+    parser_sweep.add_argument("--hasta", type=parse_fecha, help="Fecha final YYYY-MM-DD")
+    parser_sweep.add_argument("--precios", help="CSV local de precios históricos en lugar del ledger")
+    parser_sweep.add_argument("--procesos", type=int, help="Procesos del pool (por defecto según el tamaño de la grilla)")
+    parser_sweep.add_argument("--top", type=int, default=20, help="Filas del ranking a mostrar")
+    parser_sweep.add_argument("--salida", help="CSV donde guardar la tabla completa de resultados")
+
+    return parser.parse_args(argv)
+
+def ejecutar(args):
+    """Despacha el subcomando (sin argumentos: actualización diaria)
+
+    Los comandos que escriben el ledger o el dashboard toman el bloqueo de datos: dos corridas
+    superpuestas (cron + manual o local) se ejecutan una después de la otra.
+    """
+    if args.comando in COMANDOS_SIN_BLOQUEO:
+        despachar(args)
+        return
+    inicio = time.perf_counter()
+    with escritura.bloqueo(LOCK_FILE):
+        espera = time.perf_counter() - inicio
+        if espera > 0.1:
+            log_message(f"⚠ Otra corrida tenía el bloqueo de datos - se esperó {espera:.1f}s")
+        despachar(args)
+
+def despachar(args):
+    """Ejecuta el subcomando pedido"""
+    if args.comando == "import":
+        import_csv(args.archivo, args.storage)
+    elif args.comando == "export":
+        export_csv(args.archivo, args.storage, args.desde, args.hasta)
+    elif args.comando == "query":
+        query_ledger(args.storage, args.desde, args.hasta)
+    elif args.comando == "backfill":
+        backfill_ledger(args.storage, args.desde, args.hasta, args.precios)
+    elif args.comando == "portafolios":
+        update_portafolios(args.config, args.procesos)
+    elif args.comando == "metrics":
+        verificar_metricas(args.storage)
+    elif args.comando == "analizar":
+        analizar_ledger(args.storage, args.lote)
+    elif args.comando == "verify":
+        if not verificar_ledger(args.storage, args.reparar, args.rtol, args.lote):
+            sys.exit(1)
+    elif args.comando == "daemon":
+        ejecutar_daemon(args.storage, args.cadencia, args.desfase, args.debounce, args.perfilar)
+    elif args.comando == "sweep":
+        sweep_estrategias(
+            args.storage, args.montos, args.frecuencias, args.comisiones, args.desde, args.hasta,
+            args.precios, args.procesos, args.top, args.salida,
+        )
+    elif args.activos != [ACTIVO_PRINCIPAL]:
+        update_activos(args.activos, backend=args.storage)
+    else:
+        update_btc_data(append=args.append, backend=args.storage)
 
 if __name__ == "__main__":
-    update_btc_data()
+    args = parse_args()
+    DASHBOARD_MODE = args.dashboard
+    LOTE_STREAMING = args.lote
+    INTERVALO_COMPRA = args.intervalo
+    telemetria.iniciar(RUN_METRICS_FILE, args.comando or "update", args.perfilar, LOG_DIR)
+    estado_corrida = 'error'
+    try:
+        ejecutar(args)
+        estado_corrida = 'ok'
+    finally:
+        resumen = telemetria.finalizar(estado_corrida)
+        for perfil in args.perfilar:
+            destino = LOG_DIR / f"perfil-{perfil}-{resumen['corrida']}.prof"
+            if destino.exists():
+                log_message(f"✓ Perfil de '{perfil}' guardado en {destino} (python3 -m pstats {destino})")
\ No newline at end of file
@@ -0,0 +1,1263 @@
+"""
+Plantillas del dashboard HTML del tracker de BTC DCA
+Dos modos de salida: página autocontenida (inline) o shell estático cacheable + data.json
+"""
+
+import calendar
+import hashlib
+import html
+import json
+from datetime import datetime
+from itertools import accumulate
+
+import downsample
+import intervalos
+
+# Niveles del zoom de los gráficos, junto a cada index.html: la página lo pide al primer zoom
+NIVELES_ARCHIVO = "niveles.json"
+
+# ===== PLANTILLAS =====
+HEAD = """<!DOCTYPE html>
+<html lang="es" data-theme="dark">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=5.0, user-scalable=yes">
+    <title>📊 Bitcoin DCA Tracker</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800;900&family=JetBrains+Mono:wght@400;500;600;800&display=swap" rel="stylesheet">
+    <script src="https://cdn.jsdelivr.net/npm/echarts@5.5.0/dist/echarts.min.js"></script>
+"""
+
+CSS = """        :root {
+            --bg-gradient-start: #667eea;
+            --bg-gradient-end: #764ba2;
+            --card-bg: rgba(255, 255, 255, 0.95);
+            --card-border: rgba(255, 255, 255, 0.3);
+            --text-primary: #1f2937;
+            --text-secondary: #6b7280;
+            --text-tertiary: #9ca3af;
+            --shadow: rgba(0, 0, 0, 0.1);
+            --shadow-hover: rgba(0, 0, 0, 0.2);
+        }
+
+        [data-theme="dark"] {
+            --bg-gradient-start: #1a1a2e;
+            --bg-gradient-end: #16213e;
+            --card-bg: rgba(30, 30, 46, 0.8);
+            --card-border: rgba(255, 255, 255, 0.1);
+            --text-primary: #f3f4f6;
+            --text-secondary: #d1d5db;
+            --text-tertiary: #9ca3af;
+            --shadow: rgba(0, 0, 0, 0.3);
+            --shadow-hover: rgba(0, 0, 0, 0.5);
+        }
+
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+
+        /* Mejoras para experiencia táctil en mobile */
+        * {
+            -webkit-tap-highlight-color: transparent;
+            -webkit-touch-callout: none;
+        }
+
+        html {
+            -webkit-text-size-adjust: 100%;
+            text-size-adjust: 100%;
+        }
+
+        body {
+            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            background: linear-gradient(135deg, var(--bg-gradient-start) 0%, var(--bg-gradient-end) 100%);
+            background-attachment: fixed;
+            min-height: 100vh;
+            padding: 20px;
+            transition: background 0.3s ease;
+            animation: gradientShift 15s ease infinite;
+            background-size: 200% 200%;
+        }
+
+        @keyframes gradientShift {
+            0%, 100% { background-position: 0% 50%; }
+            50% { background-position: 100% 50%; }
+        }
+
+        @keyframes fadeInUp {
+            from {
+                opacity: 0;
+                transform: translateY(20px);
+            }
+            to {
+                opacity: 1;
+                transform: translateY(0);
+            }
+        }
+
+        @keyframes pulse {
+            0%, 100% { transform: scale(1); }
+            50% { transform: scale(1.05); }
+        }
+
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            animation: fadeInUp 0.6s ease;
+        }
+
+        .header {
+            text-align: center;
+            color: white;
+            margin-bottom: 40px;
+            position: relative;
+        }
+
+        .header h1 {
+            font-size: 3em;
+            margin-bottom: 10px;
+            font-weight: 700;
+            text-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
+            animation: fadeInUp 0.6s ease 0.1s both;
+        }
+
+        .header p {
+            opacity: 0.95;
+            font-size: 1.1em;
+            font-weight: 400;
+            animation: fadeInUp 0.6s ease 0.2s both;
+        }
+
+        /* MODO OSCURO - Toggle (Icono SVG minimalista) */
+        .theme-toggle {
+            position: absolute;
+            top: 0;
+            right: 0;
+            background: var(--card-bg);
+            border: 1px solid var(--card-border);
+            backdrop-filter: blur(10px);
+            width: 48px;
+            height: 48px;
+            border-radius: 50%;
+            cursor: pointer;
+            box-shadow: 0 4px 12px var(--shadow);
+            transition: all 0.3s ease;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            z-index: 9999;
+        }
+
+        .theme-toggle:hover {
+            transform: translateY(-2px) rotate(20deg);
+            box-shadow: 0 6px 16px var(--shadow-hover);
+        }
+
+        .theme-toggle svg {
+            width: 24px;
+            height: 24px;
+            fill: none;
+            stroke: var(--text-primary);
+            stroke-width: 2;
+            stroke-linecap: round;
+            stroke-linejoin: round;
+            transition: all 0.3s ease;
+            pointer-events: none;
+        }
+
+        .theme-toggle-text {
+            display: none;
+        }
+
+        /* Métricas Grid - Estilo compacto con bordes de color */
+        .metrics-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(210px, 1fr));
+            gap: 14px;
+            margin-bottom: 30px;
+        }
+
+        /* Cards con borde de color y separador */
+        .metric-card {
+            background: var(--card-bg);
+            backdrop-filter: blur(10px);
+            -webkit-backdrop-filter: blur(10px);
+            border-left: 4px solid #667eea;
+            padding: 18px 22px;
+            border-radius: 12px;
+            box-shadow: 0 4px 16px var(--shadow);
+            transition: all 0.3s ease;
+            position: relative;
+            animation: fadeInUp 0.6s ease both;
+            display: flex;
+            flex-direction: column;
+        }
+
+        /* Colores de borde por card */
+        .metric-card:nth-child(1) {
+            animation-delay: 0.1s;
+            border-left-color: #667eea;
+        }
+        .metric-card:nth-child(2) {
+            animation-delay: 0.15s;
+            border-left-color: #f7931a;
+        }
+        .metric-card:nth-child(3) {
+            animation-delay: 0.2s;
+            border-left-color: #10b981;
+        }
+        .metric-card:nth-child(4) {
+            animation-delay: 0.25s;
+            border-left-color: #ef4444;
+        }
+        .metric-card:nth-child(5) {
+            animation-delay: 0.3s;
+            border-left-color: #8b5cf6;
+        }
+        .metric-card:nth-child(6) {
+            animation-delay: 0.35s;
+            border-left-color: #06b6d4;
+        }
+        .metric-card:nth-child(7) {
+            animation-delay: 0.4s;
+            border-left-color: #f59e0b;
+        }
+        .metric-card:nth-child(8) {
+            animation-delay: 0.45s;
+            border-left-color: #ec4899;
+        }
+
+        .metric-card:hover {
+            transform: translateX(4px) translateY(-2px);
+            box-shadow: 0 8px 24px var(--shadow-hover);
+        }
+
+        /* Label con separador (border-bottom) */
+        .metric-label {
+            font-size: 0.7em;
+            color: var(--text-tertiary);
+            margin-bottom: 12px;
+            padding-bottom: 10px;
+            font-weight: 600;
+            text-transform: uppercase;
+            letter-spacing: 0.8px;
+            border-bottom: 1px solid var(--card-border);
+        }
+
+        /* Tipografía monoespaciada para valores */
+        .metric-value {
+            font-size: 2em;
+            font-weight: 800;
+            color: var(--text-primary);
+            margin: 8px 0 6px 0;
+            line-height: 1.1;
+            font-family: 'JetBrains Mono', 'SF Mono', 'Monaco', 'Consolas', monospace;
+        }
+
+        .metric-subtitle {
+            font-size: 0.75em;
+            color: var(--text-secondary);
+            font-weight: 500;
+        }
+
+        /* Títulos de secciones */
+        .section-title {
+            color: white;
+            font-size: 1.8em;
+            font-weight: 600;
+            margin: 40px 0 20px 0;
+            text-align: left;
+            opacity: 0.95;
+            text-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
+        }
+
+        /* Secciones de información */
+        .info-section {
+            background: var(--card-bg);
+            backdrop-filter: blur(10px);
+            border-left: 4px solid #667eea;
+            padding: 28px 32px;
+            border-radius: 12px;
+            box-shadow: 0 4px 16px var(--shadow);
+            margin-bottom: 20px;
+            animation: fadeInUp 0.6s ease 0.4s both;
+            transition: all 0.3s ease;
+        }
+
+        .info-section:hover {
+            transform: translateX(4px) translateY(-2px);
+            box-shadow: 0 8px 24px var(--shadow-hover);
+        }
+
+        .info-section:nth-of-type(1) {
+            border-left-color: #8b5cf6;
+        }
+
+        .info-section:nth-of-type(2) {
+            border-left-color: #10b981;
+        }
+
+        .info-section h2 {
+            margin-bottom: 24px;
+            padding-bottom: 12px;
+            border-bottom: 1px solid var(--card-border);
+            color: var(--text-primary);
+            font-weight: 600;
+            font-size: 1.4em;
+        }
+
+
+        /* Gráficos */
+        .chart-container {
+            position: relative;
+            height: 400px;
+            margin-bottom: 30px;
+        }
+
+        footer {
+            text-align: center;
+            color: white;
+            opacity: 0.9;
+            margin-top: 40px;
+            padding: 24px;
+            font-weight: 400;
+            animation: fadeInUp 0.6s ease 0.5s both;
+        }
+
+        /* ===== MOBILE RESPONSIVE - MEJORES PRÁCTICAS ===== */
+
+        /* Tablet y pantallas medianas */
+        @media (max-width: 1024px) {
+            body {
+                padding: 15px;
+            }
+
+            .metrics-grid {
+                grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+                gap: 12px;
+            }
+
+            .section-title {
+                font-size: 1.5em;
+                margin: 30px 0 15px 0;
+            }
+        }
+
+        /* Mobile */
+        @media (max-width: 768px) {
+            body {
+                padding: 12px;
+            }
+
+            /* Header optimizado para mobile */
+            .header {
+                margin-bottom: 30px;
+                padding-right: 55px;
+            }
+
+            .header h1 {
+                font-size: 1.75em;
+                margin-bottom: 8px;
+                line-height: 1.2;
+            }
+
+            /* Botón dark mode - tamaño táctil óptimo */
+            .theme-toggle {
+                width: 44px;
+                height: 44px;
+                top: 0;
+                right: 0;
+            }
+
+            .theme-toggle svg {
+                width: 20px;
+                height: 20px;
+            }
+
+            /* Grid de 2 columnas en mobile */
+            .metrics-grid {
+                grid-template-columns: repeat(2, 1fr);
+                gap: 10px;
+                margin-bottom: 20px;
+            }
+
+            /* Cards optimizadas para 2 columnas en mobile */
+            .metric-card {
+                padding: 14px 12px;
+                border-radius: 10px;
+                border-left-width: 3px;
+            }
+
+            .metric-label {
+                font-size: 0.6em;
+                margin-bottom: 8px;
+                padding-bottom: 6px;
+                letter-spacing: 0.5px;
+            }
+
+            .metric-value {
+                font-size: 1.4em;
+                margin: 5px 0 4px 0;
+            }
+
+            .metric-subtitle {
+                font-size: 0.65em;
+                line-height: 1.3;
+            }
+
+            /* Section titles más compactos */
+            .section-title {
+                font-size: 1.3em;
+                margin: 25px 0 12px 0;
+            }
+
+            /* Info sections optimizadas */
+            .info-section {
+                padding: 18px 20px;
+                border-radius: 10px;
+                margin-bottom: 16px;
+            }
+
+            .info-section h2 {
+                font-size: 1.2em;
+                margin-bottom: 18px;
+                padding-bottom: 10px;
+            }
+
+            /* Gráficos responsivos */
+            .chart-container {
+                height: 280px;
+                margin-bottom: 20px;
+            }
+
+            /* Footer */
+            footer {
+                margin-top: 30px;
+                padding: 20px;
+                font-size: 0.85em;
+            }
+        }
+
+        /* Mobile pequeño (iPhone SE, etc) */
+        @media (max-width: 375px) {
+            body {
+                padding: 10px;
+            }
+
+            .header {
+                padding-right: 50px;
+            }
+
+            .header h1 {
+                font-size: 1.5em;
+            }
+
+            .theme-toggle {
+                width: 40px;
+                height: 40px;
+                top: 0;
+            }
+
+            .theme-toggle svg {
+                width: 18px;
+                height: 18px;
+            }
+
+            .metric-card {
+                padding: 14px 16px;
+            }
+
+            .metric-value {
+                font-size: 1.4em;
+            }
+
+            .section-title {
+                font-size: 1.2em;
+            }
+
+            .info-section {
+                padding: 16px 18px;
+            }
+
+            .chart-container {
+                height: 240px;
+            }
+        }
+"""
+
+# Marcado del body: cada {campo} se completa con el texto ya formateado del dashboard
+MARKUP = """</head>
+<body>
+    <div class="container">
+        <!-- Header -->
+        <div class="header">
+            <!-- Toggle de Modo Oscuro -->
+            <div class="theme-toggle" onclick="toggleTheme()">
+                <svg id="theme-icon" viewBox="0 0 24 24">
+                    <!-- Sol (modo dark) -->
+                    <g class="sun-icon">
+                        <circle cx="12" cy="12" r="4"/>
+                        <line x1="12" y1="1" x2="12" y2="3"/>
+                        <line x1="12" y1="21" x2="12" y2="23"/>
+                        <line x1="4.22" y1="4.22" x2="5.64" y2="5.64"/>
+                        <line x1="18.36" y1="18.36" x2="19.78" y2="19.78"/>
+                        <line x1="1" y1="12" x2="3" y2="12"/>
+                        <line x1="21" y1="12" x2="23" y2="12"/>
+                        <line x1="4.22" y1="19.78" x2="5.64" y2="18.36"/>
+                        <line x1="18.36" y1="5.64" x2="19.78" y2="4.22"/>
+                    </g>
+                    <!-- Luna (modo light) -->
+                    <path class="moon-icon" d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z" style="visibility: hidden;"/>
+                </svg>
+            </div>
+
+            <h1>₿ Bitcoin DCA Tracker</h1>
+        </div>
+
+        <!-- Sección 1: Tu Inversión Actual -->
+        <h2 class="section-title">💰 Tu Inversión Actual</h2>
+        <div class="metrics-grid">
+            <div class="metric-card">
+                <div class="metric-label">💵 Total Invertido</div>
+                <div class="metric-value">{total_invertido}</div>
+                <div class="metric-subtitle">{subtitulo_invertido}</div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">₿ BTC Acumulado</div>
+                <div class="metric-value">{btc_total}</div>
+                <div class="metric-subtitle">{satoshis}</div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">📈 Valor Actual</div>
+                <div class="metric-value">
+                    {valor_actual}
+                </div>
+                <div class="metric-subtitle">{precio_actual}</div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">{emoji_tendencia} Ganancia Real (con fees)</div>
+                <div class="metric-value" style="color: {color_ganancia_neta}">{ganancia_neta}</div>
+                <div class="metric-subtitle" style="color: {color_ganancia_neta}">{subtitulo_ganancia}</div>
+            </div>
+        </div>
+
+        <!-- Sección 2: Análisis Histórico -->
+        <h2 class="section-title">📊 Análisis Histórico</h2>
+        <div class="metrics-grid">
+            <div class="metric-card">
+                <div class="metric-label">📊 Precio Promedio</div>
+                <div class="metric-value">{precio_promedio}</div>
+                <div class="metric-subtitle">
+                    {diff_vs_promedio}
+                </div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">🏆 Mejor Día de Compra</div>
+                <div class="metric-value">{mejor_dia_precio}</div>
+                <div class="metric-subtitle">{mejor_dia}</div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">📉 Peor Día de Compra</div>
+                <div class="metric-value">{peor_dia_precio}</div>
+                <div class="metric-subtitle">{peor_dia}</div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">🔥 Racha Consecutiva</div>
+                <div class="metric-value">{racha_formato}</div>
+                <div class="metric-subtitle">{subtitulo_racha}</div>
+            </div>
+
+            <div class="metric-card">
+                <div class="metric-label">💸 Comisiones Pagadas</div>
+                <div class="metric-value">{total_comisiones}</div>
+                <div class="metric-subtitle">{subtitulo_comisiones}</div>
+            </div>
+        </div>
+
+        <!-- Primer Gráfico - Evolución del DCA -->
+        <div class="info-section">
+            <h2>📊 Evolución del DCA</h2>
+            <div class="chart-container">
+                <div id="dcaChart" style="width: 100%; height: 100%;"></div>
+            </div>
+        </div>
+
+        <!-- Segundo Gráfico - Precio de Bitcoin -->
+        <div class="info-section">
+            <h2>💹 Precio de Bitcoin en el Tiempo</h2>
+            <div class="chart-container">
+                <div id="btcPriceChart" style="width: 100%; height: 100%;"></div>
+            </div>
+        </div>
+
+        <footer>
+            <p>@ Generado automáticamente · {timestamp}</p>
+        </footer>
+    </div>
+
+"""
+
+# Resumen multi-activo: se inserta antes de la primera sección del marcado inline
+MARCA_PRIMERA_SECCION = "        <!-- Sección 1: Tu Inversión Actual -->"
+
+MARKUP_PORTAFOLIO = """        <!-- Sección 0: Portafolio Multi-Activo -->
+        <h2 class="section-title">🪙 Portafolio por Activo</h2>
+        <div class="metrics-grid">
+{tarjetas}        </div>
+
+"""
+
+TARJETA_ACTIVO = """            <div class="metric-card">
+                <div class="metric-label">{etiqueta}</div>
+                <div class="metric-value">{valor}</div>
+                <div class="metric-subtitle">{detalle}</div>
+                <div class="metric-subtitle" style="color: {color}">{resultado}</div>
+            </div>
+"""
+
+JS_TEMA = """        // ===== MODO OSCURO =====
+        function updateThemeIcon(theme) {
+            const svg = document.getElementById('theme-icon');
+            const sunIcon = svg.querySelector('.sun-icon');
+            const moonIcon = svg.querySelector('.moon-icon');
+
+            if (theme === 'dark') {
+                // Modo dark: mostrar sol (para cambiar a light)
+                sunIcon.style.visibility = 'visible';
+                moonIcon.style.visibility = 'hidden';
+            } else {
+                // Modo light: mostrar luna (para cambiar a dark)
+                sunIcon.style.visibility = 'hidden';
+                moonIcon.style.visibility = 'visible';
+            }
+        }
+
+        // Cargar tema guardado
+        const savedTheme = localStorage.getItem('theme') || 'dark';
+        document.documentElement.setAttribute('data-theme', savedTheme);
+        updateThemeIcon(savedTheme);
+
+"""
+
+JS_DATOS = """        // Datos desde Python: nivel del primer render y rangos de los ejes
+        const datosGraficos = {datos};
+
+"""
+
+# Declaración de las series en el shell: se completan al cargar data.json
+JS_DATOS_SHELL = """        // Datos desde data.json
+        let datosGraficos = null;
+
+"""
+
+JS_GRAFICOS = """        // ===== APACHE ECHARTS - GRÁFICOS =====
+
+        // Configuración de tema según modo
+        function getEChartsTheme() {
+            const isDark = document.documentElement.getAttribute('data-theme') === 'dark';
+            return isDark ? 'dark' : null; // null es el tema light por defecto
+        }
+
+        // Fechas del eje de tiempo (las claves viajan como segundos UTC)
+        const FORMATO_EJE = new Intl.DateTimeFormat('es', { day: '2-digit', month: 'short', year: '2-digit', timeZone: 'UTC' });
+        const FORMATO_TOOLTIP = new Intl.DateTimeFormat('es', { day: '2-digit', month: 'short', year: 'numeric', timeZone: 'UTC' });
+
+        // Puntos [ms, valor]: en un eje de tiempo los niveles LTTB (puntos sin espaciado
+        // uniforme) conservan las fechas, y el mismo zoom es el mismo rango en todos los niveles
+        function puntos(ts, valores) {
+            return ts.map((t, i) => [t * 1000, valores[i]]);
+        }
+
+        // ===== NIVELES DE RESOLUCIÓN (LTTB) =====
+        // La página trae solo el nivel del primer render; el completo y los intermedios están en
+        // niveles.json y se piden la primera vez que se hace zoom
+        const MAX_PUNTOS_VISIBLES = 400;
+        let nivelesZoom = null;
+        let cargaNiveles = null;
+
+        function cargarNiveles() {
+            if (!cargaNiveles) {
+                cargaNiveles = fetch(datosGraficos.niveles, { cache: 'no-cache' })
+                    .then(response => response.json())
+                    .then(niveles => { nivelesZoom = niveles; })
+                    .catch(error => {
+                        console.error('Error al cargar ' + datosGraficos.niveles + ':', error);
+                        nivelesZoom = [datosGraficos.inicial];
+                    });
+            }
+            return cargaNiveles;
+        }
+
+        // El nivel más fino cuyos puntos visibles entran en MAX_PUNTOS_VISIBLES
+        function nivelParaVentana(inicio, fin) {
+            const fraccion = Math.max((fin - inicio) / 100, 0.0001);
+            for (const nivel of nivelesZoom) {
+                if (nivel.dca.ts.length * fraccion <= MAX_PUNTOS_VISIBLES) return nivel;
+            }
+            return nivelesZoom[nivelesZoom.length - 1];
+        }
+
+        // Barra de zoom solo cuando hay niveles reducidos (historiales largos)
+        function getDataZoom() {
+            if (!datosGraficos.niveles) return [];
+            return [{ type: 'slider', start: 0, end: 100, height: 18, bottom: 4 }];
+        }
+
+        // Al cambiar el zoom, reemplazar los datos por el nivel que corresponde a la ventana
+        function actualizarNivel(chart, grafico) {
+            cargarNiveles().then(() => {
+                if (chart.isDisposed()) return;
+                const zoom = chart.getOption().dataZoom[0];
+                const nivel = nivelParaVentana(zoom.start, zoom.end);
+                if (chart.nivelActual === nivel.nombre) return;
+                chart.nivelActual = nivel.nombre;
+                if (grafico === 'dca') {
+                    chart.setOption({
+                        series: [{ data: puntos(nivel.dca.ts, nivel.dca.invertido) }, { data: puntos(nivel.dca.ts, nivel.dca.valor) }]
+                    });
+                } else {
+                    chart.setOption({
+                        series: [{ data: puntos(nivel.precio.ts, nivel.precio.precio) }]
+                    });
+                }
+            });
+        }
+
+        // Calcular rango dinámico para precio BTC (margen del 2%)
+        function getBTCPriceRange() {
+            const [min, max] = datosGraficos.rangos.precio;
+            const range = max - min;
+            const margin = range * 0.5; // 50% de margen arriba y abajo
+            return {
+                min: Math.floor(min - margin),
+                max: Math.ceil(max + margin)
+            };
+        }
+
+        // Calcular rango dinámico para DCA (comenzar cerca del primer valor)
+        function getDCARange() {
+            const [min, max] = datosGraficos.rangos.dca;
+            const range = max - min;
+            const margin = range * 0.3; // 30% de margen
+            return {
+                min: Math.max(0, Math.floor(min - margin)),
+                max: Math.ceil(max + margin)
+            };
+        }
+
+        let dcaChart, btcPriceChart;
+
+        // Inicializar gráficos con ECharts
+        function initCharts() {
+            try {
+                const theme = getEChartsTheme();
+
+                // Destruir instancias previas si existen
+                if (dcaChart) dcaChart.dispose();
+                if (btcPriceChart) btcPriceChart.dispose();
+
+                // Primer render con el nivel que entra en la ventana completa (viene en la página)
+                const nivel = datosGraficos.inicial;
+                const gridBottom = datosGraficos.niveles ? 36 : '3%';
+
+            // Gráfico 1: Evolución del DCA
+            dcaChart = echarts.init(document.getElementById('dcaChart'), theme);
+            dcaChart.setOption({
+                animation: true,
+                animationDuration: 1000,
+                animationEasing: 'cubicOut',
+                tooltip: {
+                    trigger: 'axis',
+                    axisPointer: {
+                        type: 'cross',
+                        crossStyle: {
+                            color: '#667eea'
+                        }
+                    },
+                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                    borderColor: '#667eea',
+                    borderWidth: 1,
+                    textStyle: { fontSize: 13 },
+                    formatter: function(params) {
+                        let result = FORMATO_TOOLTIP.format(params[0].value[0]) + '<br/>';
+                        params.forEach(item => {
+                            result += item.marker + ' ' + item.seriesName + ': $' +
+                                     item.value[1].toFixed(2) + '<br/>';
+                        });
+                        return result;
+                    }
+                },
+                dataZoom: getDataZoom(),
+                legend: {
+                    data: ['💵 USD Invertidos', '₿ Valor de Bitcoins'],
+                    top: 10,
+                    textStyle: { fontSize: 13 }
+                },
+                grid: {
+                    left: '3%',
+                    right: '4%',
+                    bottom: gridBottom,
+                    top: 60,
+                    containLabel: true
+                },
+                xAxis: {
+                    type: 'time',
+                    boundaryGap: false, // Comienza justo en el primer punto
+                    axisLabel: { rotate: 45, formatter: value => FORMATO_EJE.format(value) },
+                    axisLine: { show: false }, // Sin línea del eje
+                    axisTick: { show: false }, // Sin ticks
+                    splitLine: { show: false } // Sin líneas de cuadrícula
+                },
+                yAxis: {
+                    type: 'value',
+                    scale: true,
+                    min: getDCARange().min,
+                    max: getDCARange().max,
+                    axisLabel: {
+                        formatter: '${value}'
+                    },
+                    axisLine: { show: false }, // Sin línea del eje
+                    axisTick: { show: false }, // Sin ticks
+                    splitLine: { show: false } // Sin líneas de cuadrícula
+                },
+                series: [
+                    {
+                        name: '💵 USD Invertidos',
+                        type: 'line',
+                        data: puntos(nivel.dca.ts, nivel.dca.invertido),
+                        smooth: true,
+                        lineStyle: { width: 3, color: '#667eea' },
+                        itemStyle: { color: '#667eea' },
+                        areaStyle: {
+                            color: {
+                                type: 'linear',
+                                x: 0, y: 0, x2: 0, y2: 1,
+                                colorStops: [
+                                    { offset: 0, color: 'rgba(102, 126, 234, 0.3)' },
+                                    { offset: 1, color: 'rgba(102, 126, 234, 0.05)' }
+                                ]
+                            }
+                        },
+                        emphasis: { focus: 'series' }
+                    },
+                    {
+                        name: '₿ Valor de Bitcoins',
+                        type: 'line',
+                        data: puntos(nivel.dca.ts, nivel.dca.valor),
+                        smooth: true,
+                        lineStyle: { width: 3, color: '#f7931a' },
+                        itemStyle: { color: '#f7931a' },
+                        areaStyle: {
+                            color: {
+                                type: 'linear',
+                                x: 0, y: 0, x2: 0, y2: 1,
+                                colorStops: [
+                                    { offset: 0, color: 'rgba(247, 147, 26, 0.3)' },
+                                    { offset: 1, color: 'rgba(247, 147, 26, 0.05)' }
+                                ]
+                            }
+                        },
+                        emphasis: { focus: 'series' }
+                    }
+                ]
+            });
+
+            // Gráfico 2: Precio de Bitcoin
+            btcPriceChart = echarts.init(document.getElementById('btcPriceChart'), theme);
+            btcPriceChart.setOption({
+                animation: true,
+                animationDuration: 1000,
+                animationEasing: 'cubicOut',
+                tooltip: {
+                    trigger: 'axis',
+                    axisPointer: {
+                        type: 'cross',
+                        crossStyle: {
+                            color: '#10b981'
+                        }
+                    },
+                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                    borderColor: '#10b981',
+                    borderWidth: 1,
+                    textStyle: { fontSize: 13 },
+                    formatter: function(params) {
+                        return FORMATO_TOOLTIP.format(params[0].value[0]) + '<br/>' +
+                               params[0].marker + ' Precio: $' +
+                               params[0].value[1].toLocaleString('en-US', {minimumFractionDigits: 2});
+                    }
+                },
+                dataZoom: getDataZoom(),
+                legend: {
+                    data: ['💰 Precio de Bitcoin (USD)'],
+                    top: 10,
+                    textStyle: { fontSize: 13 }
+                },
+                grid: {
+                    left: '3%',
+                    right: '4%',
+                    bottom: gridBottom,
+                    top: 60,
+                    containLabel: true
+                },
+                xAxis: {
+                    type: 'time',
+                    boundaryGap: false, // Comienza justo en el primer punto
+                    axisLabel: { rotate: 45, formatter: value => FORMATO_EJE.format(value) },
+                    axisLine: { show: false }, // Sin línea del eje
+                    axisTick: { show: false }, // Sin ticks
+                    splitLine: { show: false } // Sin líneas de cuadrícula
+                },
+                yAxis: {
+                    type: 'value',
+                    scale: true,
+                    min: getBTCPriceRange().min,
+                    max: getBTCPriceRange().max,
+                    axisLabel: {
+                        formatter: function(value) {
+                            return '$' + value.toLocaleString('en-US', {maximumFractionDigits: 0});
+                        }
+                    },
+                    axisLine: { show: false }, // Sin línea del eje
+                    axisTick: { show: false }, // Sin ticks
+                    splitLine: { show: false } // Sin líneas de cuadrícula
+                },
+                series: [{
+                    name: '💰 Precio de Bitcoin (USD)',
+                    type: 'line',
+                    data: puntos(nivel.precio.ts, nivel.precio.precio),
+                    smooth: true,
+                    lineStyle: { width: 3, color: '#10b981' },
+                    itemStyle: { color: '#10b981' },
+                    areaStyle: {
+                        color: {
+                            type: 'linear',
+                            x: 0, y: 0, x2: 0, y2: 1,
+                            colorStops: [
+                                { offset: 0, color: 'rgba(16, 185, 129, 0.3)' },
+                                { offset: 1, color: 'rgba(16, 185, 129, 0.05)' }
+                            ]
+                        }
+                    },
+                    emphasis: { focus: 'series' }
+                }]
+            });
+
+                dcaChart.nivelActual = nivel.nombre;
+                btcPriceChart.nivelActual = nivel.nombre;
+                dcaChart.on('datazoom', () => actualizarNivel(dcaChart, 'dca'));
+                btcPriceChart.on('datazoom', () => actualizarNivel(btcPriceChart, 'precio'));
+
+                // Responsive automático
+                window.addEventListener('resize', function() {
+                    if (dcaChart) dcaChart.resize();
+                    if (btcPriceChart) btcPriceChart.resize();
+                });
+            } catch (error) {
+                console.error('Error al inicializar gráficos:', error);
+                // Aunque falle, el resto del sitio debe funcionar
+            }
+        }
+
+        // Función actualizada de toggle theme
+        function toggleTheme() {
+            const html = document.documentElement;
+            const currentTheme = html.getAttribute('data-theme');
+            const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
+
+            html.setAttribute('data-theme', newTheme);
+            localStorage.setItem('theme', newTheme);
+            updateThemeIcon(newTheme);
+
+            // Recrear gráficos con nuevo tema
+            initCharts();
+        }
+
+"""
+
+JS_INICIO = """        // Inicializar gráficos cuando el DOM esté completamente cargado
+        if (document.readyState === 'loading') {
+            document.addEventListener('DOMContentLoaded', initCharts);
+        } else {
+            // DOM ya está listo, ejecutar inmediatamente
+            initCharts();
+        }
+"""
+
+JS_CARGA = """        // Cargar métricas y series desde data.json (lo único que cambia en cada actualización)
+        function aplicarDatos(datos) {
+            Object.entries(datos.campos).forEach(([campo, valor]) => {
+                if (campo.startsWith('color_')) {
+                    document.documentElement.style.setProperty('--' + campo, valor);
+                } else {
+                    document.querySelectorAll('[data-campo="' + campo + '"]').forEach(el => {
+                        el.textContent = valor;
+                    });
+                }
+            });
+            datosGraficos = datos.series;
+            nivelesZoom = null;
+            cargaNiveles = null;
+            initCharts();
+        }
+
+        fetch('data.json', { cache: 'no-cache' })
+            .then(response => response.json())
+            .then(aplicarDatos)
+            .catch(error => console.error('Error al cargar data.json:', error));
+"""
+
+
+def _plural(cantidad, singular, plural):
+    return singular if cantidad == 1 else plural
+
+
+def formatear_racha(racha_dias):
+    """Formatea la racha en días, meses o años y meses"""
+    if racha_dias < 30:
+        return f"{racha_dias} día{_plural(racha_dias, '', 's')}"
+    if racha_dias < 365:
+        meses = racha_dias // 30
+        return f"{meses} mes{_plural(meses, '', 'es')}"
+    años = racha_dias // 365
+    meses_restantes = (racha_dias % 365) // 30
+    if meses_restantes > 0:
+        return f"{años} año{_plural(años, '', 's')} y {meses_restantes} mes{_plural(meses_restantes, '', 'es')}"
+    return f"{años} año{_plural(años, '', 's')}"
+
+
+def campos_dashboard(estado, timestamp=None, usd_por_compra=2):
+    """Calcula los textos de todas las tarjetas del dashboard a partir del estado de métricas"""
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+    # ===== MÉTRICAS BÁSICAS =====
+    total_dias = estado['dias']
+    total_invertido = estado['total_invertido']
+    btc_total = estado['btc_total']
+    satoshis = round(btc_total * 100_000_000)  # redondeo: int() truncaba 0.99999 sat a 0
+    precio_actual = estado['ultimo']['precio']
+    valor_actual = estado['ultimo']['valor']
+    ganancia = valor_actual - total_invertido
+
+    # ===== COMISIONES =====
+    total_comisiones = estado['total_comisiones']
+    pct_comisiones = (total_comisiones / total_invertido) * 100 if total_invertido > 0 else 0
+    ganancia_neta = ganancia - total_comisiones
+    porcentaje_neto = (ganancia_neta / total_invertido) * 100 if total_invertido > 0 else 0
+    color_ganancia_neta = "#10b981" if ganancia_neta >= 0 else "#ef4444"
+    simbolo_neto = "+" if ganancia_neta >= 0 else ""
+
+    # ===== PRECIO PROMEDIO DE COMPRA =====
+    precio_promedio = total_invertido / btc_total if btc_total > 0 else 0
+    diff_vs_promedio = ((precio_actual - precio_promedio) / precio_promedio * 100) if precio_promedio > 0 else 0
+
+    # ===== ESTADÍSTICAS =====
+    mejor_dia = estado['mejor_dia']
+    peor_dia = estado['peor_dia']
+    racha_dias = total_dias
+
+    simbolo = "+" if ganancia >= 0 else ""
+    emoji_tendencia = "📈" if ganancia >= 0 else "📉"
+
+    return {
+        'total_invertido': f"${total_invertido:.2f}",
+        'subtitulo_invertido': f"{total_dias} día{_plural(total_dias, '', 's')} × ${usd_por_compra:g} USD · Fees: ${total_comisiones:.3f}",
+        'btc_total': f"{btc_total:.8f}",
+        'satoshis': f"Satoshis: {satoshis:,}",
+        'valor_actual': f"${valor_actual:.2f}",
+        'precio_actual': f"BTC @ ${precio_actual:,.2f}",
+        'emoji_tendencia': emoji_tendencia,
+        'color_ganancia_neta': color_ganancia_neta,
+        'ganancia_neta': f"{simbolo_neto}${ganancia_neta:.2f}",
+        'subtitulo_ganancia': f"{simbolo_neto}{porcentaje_neto:.2f}% · Bruta: {simbolo}${ganancia:.2f}",
+        'precio_promedio': f"${precio_promedio:,.2f}",
+        'diff_vs_promedio': f"{'+' if diff_vs_promedio >= 0 else ''}{diff_vs_promedio:.1f}% vs actual",
+        'mejor_dia_precio': f"${mejor_dia['precio']:,.2f}",
+        'mejor_dia': f"{mejor_dia['fecha']} · {mejor_dia['btc']:.8f} BTC",
+        'peor_dia_precio': f"${peor_dia['precio']:,.2f}",
+        'peor_dia': f"{peor_dia['fecha']} · {peor_dia['btc']:.8f} BTC",
+        'racha_formato': formatear_racha(racha_dias),
+        'subtitulo_racha': f"{racha_dias} día{_plural(racha_dias, '', 's')} totales",
+        'total_comisiones': f"${total_comisiones:.3f}",
+        'subtitulo_comisiones': f"{pct_comisiones:.1f}% del capital · {total_dias} transacción{_plural(total_dias, '', 'es')}",
+        'timestamp': timestamp,
+    }
+
+
+def _lista(valores):
+    """Convierte una columna (Series, array o lista) a lista de valores de Python"""
+    return valores.tolist() if hasattr(valores, 'tolist') else list(valores)
+
+
+def _segundos(valor):
+    """Segundos UTC de una clave del ledger: fecha (su medianoche), instante o texto del CSV"""
+    if not hasattr(valor, 'timetuple'):
+        valor = intervalos.parsear(str(valor))
+    return calendar.timegm(valor.timetuple())
+
+
+def marcas_tiempo(fechas):
+    """Eje x de los gráficos: segundos UTC de cada registro (el navegador formatea las fechas)"""
+    return [_segundos(fecha) for fecha in _lista(fechas)]
+
+
+def series_dashboard(datos):
+    """Arma las series de los gráficos (segundos UTC, USD invertidos, valor y precio)
+
+    datos: DataFrame del ledger o dict columna -> lista (Storage.leer_columnas).
+    """
+    return {
+        'ts': marcas_tiempo(datos['fecha']),
+        'invertido': list(accumulate(_lista(datos['usd_invertidos']))),
+        'valor': _lista(datos['valor_actual_usd']),
+        'precio': _lista(datos['precio_btc_usd']),
+    }
+
+
+def _tarjeta_activo(etiqueta, valor, invertido, comisiones, detalle):
+    ganancia_neta = valor - invertido - comisiones
+    porcentaje = (ganancia_neta / invertido) * 100 if invertido > 0 else 0
+    signo = "+" if ganancia_neta >= 0 else ""
+    return TARJETA_ACTIVO.format(
+        etiqueta=html.escape(etiqueta),
+        valor=f"${valor:,.2f}",
+        detalle=html.escape(detalle),
+        color="#10b981" if ganancia_neta >= 0 else "#ef4444",
+        resultado=f"{signo}${ganancia_neta:,.2f} ({signo}{porcentaje:.2f}%) con fees",
+    )
+
+
+def render_portafolio(portafolio):
+    """Sección con una tarjeta por activo y el total del portafolio
+
+    portafolio: [(símbolo, nombre, estado de métricas)] con al menos un registro cada uno.
+    """
+    tarjetas = []
+    for simbolo, nombre, estado in portafolio:
+        tarjetas.append(_tarjeta_activo(
+            f"{nombre} ({simbolo})",
+            estado['ultimo']['valor'],
+            estado['total_invertido'],
+            estado['total_comisiones'],
+            f"{estado['btc_total']:.8f} {simbolo} · Invertido ${estado['total_invertido']:,.2f}",
+        ))
+    invertido = sum(e['total_invertido'] for _, _, e in portafolio)
+    tarjetas.append(_tarjeta_activo(
+        "🧺 Total Portafolio",
+        sum(e['ultimo']['valor'] for _, _, e in portafolio),
+        invertido,
+        sum(e['total_comisiones'] for _, _, e in portafolio),
+        f"{len(portafolio)} activo{_plural(len(portafolio), '', 's')} · Invertido ${invertido:,.2f}",
+    ))
+    return MARKUP_PORTAFOLIO.format(tarjetas="".join(tarjetas))
+
+
+_plantilla_inline = None
+
+
+def plantilla_inline():
+    """Partes fijas de la página inline (cabecera+estilos, marcado, scripts), armadas una vez por proceso
+
+    Al renderizar solo se completan los campos del marcado y el bloque de datos entre los scripts.
+    """
+    global _plantilla_inline
+    if _plantilla_inline is None:
+        _plantilla_inline = (
+            HEAD + "    <style>\n" + CSS + "    </style>\n",
+            MARKUP,
+            "    <script>\n" + JS_TEMA,
+            JS_GRAFICOS + JS_INICIO + "    </script>\n</body>\n</html>",
+        )
+    return _plantilla_inline
+
+
+def _extremos(*columnas):
+    valores = [v for columna in columnas for v in columna]
+    return [min(valores), max(valores)] if valores else [0, 0]
+
+
+def niveles_zoom(series):
+    """Niveles que la página alterna al hacer zoom: el completo y los reducidos, del más fino al más grueso"""
+    return [downsample.nivel('completo', series)] + series.get('niveles', [])
+
+
+def datos_graficos(series):
+    """Lo que la página necesita para el primer render: un solo nivel y los rangos de los ejes
+
+    El nivel es el más fino que entra en MAX_PUNTOS_VISIBLES con el historial completo; con
+    niveles reducidos, el resto viaja en NIVELES_ARCHIVO y se pide recién al hacer zoom.
+    """
+    niveles = niveles_zoom(series)
+    inicial = next((n for n in niveles if len(n['dca']['ts']) <= downsample.MAX_PUNTOS_VISIBLES), niveles[-1])
+    return {
+        'inicial': inicial,
+        'rangos': {
+            'dca': _extremos(series['invertido'], series['valor']),
+            'precio': _extremos(series['precio']),
+        },
+        'niveles': NIVELES_ARCHIVO if len(niveles) > 1 else None,
+    }
+
+
+def render_niveles_json(series):
+    """Contenido de NIVELES_ARCHIVO: todos los niveles del zoom"""
+    return json.dumps(niveles_zoom(series), separators=(',', ':'))
+
+
+def render_inline(campos, series, portafolio=None):
+    """Página autocontenida: estilos, métricas y el nivel del primer render embebidos en el HTML
+
+    Con niveles reducidos, el resto de los niveles se escribe aparte (render_niveles_json).
+    portafolio: activos para el resumen multi-activo (ver render_portafolio); None lo omite.
+    """
+    datos = JS_DATOS.format(datos=json.dumps(datos_graficos(series), ensure_ascii=False, separators=(',', ':')))
+    prefijo, marcado, inicio_script, fin_script = plantilla_inline()
+    markup = marcado.format_map(campos)
+    if portafolio:
+        markup = markup.replace(MARCA_PRIMERA_SECCION, render_portafolio(portafolio) + MARCA_PRIMERA_SECCION, 1)
+    return prefijo + markup + inicio_script + datos + fin_script
+
+
+class _CamposShell(dict):
+    """Completa el marcado con huecos que el JS del shell llena desde data.json"""
+
+    def __missing__(self, campo):
+        if campo.startswith('color_'):
+            return f"var(--{campo})"
+        return f'<span data-campo="{campo}"></span>'
+
+
+def _hash(contenido):
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:10]
+
+
+def assets_shell():
+    """Devuelve {nombre de archivo: contenido} de los assets versionados por hash de contenido"""
+    js = JS_TEMA + JS_DATOS_SHELL + JS_GRAFICOS + JS_CARGA
+    return {
+        f"dashboard.{_hash(CSS)}.css": CSS,
+        f"dashboard.{_hash(js)}.js": js,
+    }
+
+
+def render_shell(nombre_css, nombre_js, directorio_assets='assets'):
+    """Shell estático: mismo marcado que la versión inline, sin datos"""
+    return (
+        HEAD
+        + f'    <link rel="stylesheet" href="{directorio_assets}/{nombre_css}">\n'
+        + MARKUP.format_map(_CamposShell())
+        + f'    <script src="{directorio_assets}/{nombre_js}"></script>\n</body>\n</html>'
+    )
+
+
+def render_datos_json(campos, series):
+    """Payload compacto con los textos de las tarjetas y el nivel del primer render de los gráficos"""
+    return json.dumps({'campos': campos, 'series': datos_graficos(series)}, ensure_ascii=False, separators=(',', ':'))
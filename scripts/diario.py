@@ -0,0 +1,117 @@
+"""
+Resumen diario de los ledgers con compras intradiarias del tracker de BTC DCA
+Una fila por día con las columnas del ledger (montos sumados; precio, acumulado y valor al cierre)
+más la cantidad de compras. El dashboard y las métricas leen este CSV chico en lugar de un ledger
+24-96 veces más largo, y cada compra lo actualiza en O(1) reescribiendo solo su última línea
+"""
+
+import math
+
+import intervalos
+import storage
+
+COLUMNAS = storage.COLUMNAS + ['compras']
+
+# Columnas que se suman dentro del día y columnas que quedan con el valor de la última compra
+SUMADAS = ('usd_invertidos', 'btc_comprados', 'comision_usd')
+AL_CIERRE = ('precio_btc_usd', 'btc_acumulado', 'valor_actual_usd')
+
+
+class ResumenDiario(storage.CSVStorage):
+    """CSV del resumen: se lee como un ledger diario más, con la columna compras incluida"""
+
+    def leer_columnas(self, columnas=COLUMNAS):
+        return super().leer_columnas(columnas)
+
+
+def fila(registro):
+    """Fila de un día a partir de su primera compra"""
+    return {
+        'fecha': intervalos.dia(registro['fecha']),
+        **{c: float(registro[c]) for c in SUMADAS + AL_CIERRE},
+        'compras': 1,
+    }
+
+
+def sumar(fila_dia, registro):
+    """Fila del día con una compra más"""
+    resultado = dict(fila_dia)
+    for c in SUMADAS:
+        resultado[c] = fila_dia[c] + float(registro[c])
+    for c in AL_CIERRE:
+        resultado[c] = float(registro[c])
+    resultado['compras'] = int(fila_dia['compras']) + 1
+    return resultado
+
+
+def sigue_al_ledger(ultima_fila, ultimo_registro):
+    """Indica si la última fila del resumen cierra en el último registro del ledger"""
+    if ultimo_registro is None or ultima_fila is None:
+        return ultimo_registro is None and ultima_fila is None
+    return (
+        ultima_fila['fecha'] == intervalos.dia(ultimo_registro['fecha'])
+        and math.isclose(ultima_fila['btc_acumulado'], float(ultimo_registro['btc_acumulado']), rel_tol=1e-9)
+    )
+
+
+def actualizar(path, registro_previo, registro_nuevo, ledger):
+    """Lleva el resumen al día tras agregar registro_nuevo al ledger (None si no hubo compra)
+
+    Si el resumen cerraba en registro_previo alcanza con tocar su última línea; si no (no existía,
+    otra herramienta reescribió el ledger, una corrida se cortó a mitad) se reconstruye entero.
+    Devuelve True si tuvo que reconstruirlo.
+    """
+    ultima = ResumenDiario(path).ultimo_registro()
+    if not sigue_al_ledger(ultima, registro_previo):
+        reconstruir(path, ledger)
+        return True
+    if registro_nuevo is None:
+        return False
+
+    if ultima is not None and ultima['fecha'] == intervalos.dia(registro_nuevo['fecha']):
+        storage.reemplazar_ultimo_registro(path, sumar(ultima, registro_nuevo), COLUMNAS)
+    else:
+        storage.agregar_registro(path, fila(registro_nuevo), COLUMNAS)
+    return False
+
+
+def reconstruir(path, ledger, tamano_lote=storage.TAMANO_LOTE):
+    """Recalcula el resumen recorriendo el ledger por lotes (en memoria solo hay un lote y los días)"""
+    import pandas as pd
+
+    partes = []
+    if ledger.existe():
+        for lote in ledger.lotes(tamano_lote):
+            df = pd.DataFrame(lote)
+            grupos = df.groupby(df['fecha'].dt.floor('D'), sort=False)
+            partes.append(pd.concat(
+                [grupos[list(SUMADAS)].sum(), grupos[list(AL_CIERRE)].last(), grupos.size().rename('compras')],
+                axis=1,
+            ))
+    if not partes:
+        resumen = pd.DataFrame(columns=COLUMNAS)
+    else:
+        # Un día puede quedar repartido entre dos lotes consecutivos: se vuelve a agrupar
+        agregacion = {**{c: 'sum' for c in SUMADAS}, **{c: 'last' for c in AL_CIERRE}, 'compras': 'sum'}
+        resumen = pd.concat(partes).groupby(level=0, sort=False).agg(agregacion)
+        resumen = resumen.rename_axis('fecha').reset_index()
+        resumen['fecha'] = resumen['fecha'].dt.date
+    ResumenDiario(path).guardar(resumen[COLUMNAS])
+
+
+def acumular(columnas, registro):
+    """Aplica una compra a las columnas del resumen en memoria (mismo resultado que actualizar)"""
+    if columnas['fecha'] and columnas['fecha'][-1] == intervalos.dia(registro['fecha']):
+        ultima = sumar({c: valores[-1] for c, valores in columnas.items()}, registro)
+        for c, valores in columnas.items():
+            valores[-1] = ultima[c]
+    else:
+        for c, valor in fila(registro).items():
+            columnas[c].append(valor)
+
+
+def estado(columnas, comision_porcentaje):
+    """Estado de métricas del dashboard sobre las filas del resumen (días, mejor y peor día...)"""
+    import streaming
+
+    return streaming.estado_columnas(columnas, comision_porcentaje)
@@ -0,0 +1,110 @@
+"""
+Downsampling de series para los gráficos del tracker de BTC DCA
+Largest-Triangle-Three-Buckets (LTTB): reduce puntos conservando la forma visual de la curva
+"""
+
+# Niveles de resolución: (nombre, factor de reducción respecto de la serie completa)
+NIVELES = [
+    ('semanal', 7),
+    ('mensual', 30),
+    ('trimestral', 90),
+    ('anual', 365),
+]
+
+# Por debajo de esta cantidad de puntos la serie completa se dibuja sin reducir
+MAX_PUNTOS_VISIBLES = 400
+
+# Un nivel con menos puntos que esto ya no aporta forma a la curva
+MIN_PUNTOS_NIVEL = 50
+
+
+def lttb_indices(valores, umbral, x=None):
+    """Devuelve los índices elegidos por LTTB para reducir la serie a `umbral` puntos
+
+    Siempre conserva el primer y el último punto; en cada bucket elige el punto que forma
+    el triángulo de mayor área con el punto elegido anterior y el promedio del bucket siguiente.
+    x: posición de cada punto en el eje (los timestamps, si la serie tiene huecos); por defecto
+    el índice. Los promedios y los puntos de cada bucket se arman de una vez con numpy: el
+    recorrido solo encadena el punto elegido, que depende del bucket anterior.
+    """
+    import numpy as np
+
+    y = np.asarray(valores, dtype='float64')
+    n = len(y)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype='float64') if x is None else np.asarray(x, dtype='float64')
+
+    # Bucket i: [bordes[i], bordes[i + 1]); el siguiente del último es el punto final
+    bordes = np.linspace(1, n - 1, umbral - 1).astype('int64')
+    finales = np.append(bordes[2:], n)
+    cantidad = finales - bordes[1:]
+    suma_x, suma_y = np.concatenate(([0.0], np.cumsum(x))), np.concatenate(([0.0], np.cumsum(y)))
+    promedio_x = (suma_x[finales] - suma_x[bordes[1:]]) / cantidad
+    promedio_y = (suma_y[finales] - suma_y[bordes[1:]]) / cantidad
+
+    # Puntos de cada bucket en una matriz; los buckets cortos repiten su primer punto, que no
+    # cambia el máximo y, ante empate, argmax se queda con la primera aparición
+    ancho = int((bordes[1:] - bordes[:-1]).max())
+    posiciones = bordes[:-1, None] + np.arange(ancho)
+    posiciones = np.where(posiciones < bordes[1:, None], posiciones, bordes[:-1, None])
+    bucket_x, bucket_y = x[posiciones], y[posiciones]
+
+    indices = np.empty(umbral, dtype='int64')
+    indices[0] = 0
+    indices[-1] = n - 1
+    elegido = 0
+    for i in range(umbral - 2):
+        xa, ya = x[elegido], y[elegido]
+        area = np.abs((xa - promedio_x[i]) * (bucket_y[i] - ya) - (xa - bucket_x[i]) * (promedio_y[i] - ya))
+        elegido = posiciones[i, area.argmax()]
+        indices[i + 1] = elegido
+    return indices
+
+
+def _tomar(valores, indices):
+    return [valores[i] for i in indices]
+
+
+def nivel(nombre, series, indices_dca=None, indices_precio=None):
+    """Nivel de resolución de los gráficos: las series en los índices dados (todas, sin índices)"""
+    if indices_dca is None:
+        indices_dca = indices_precio = range(len(series['ts']))
+    return {
+        'nombre': nombre,
+        'dca': {
+            'ts': _tomar(series['ts'], indices_dca),
+            'invertido': _tomar(series['invertido'], indices_dca),
+            'valor': _tomar(series['valor'], indices_dca),
+        },
+        'precio': {
+            'ts': _tomar(series['ts'], indices_precio),
+            'precio': _tomar(series['precio'], indices_precio),
+        },
+    }
+
+
+def niveles_reducidos(series, niveles=NIVELES):
+    """Precalcula los niveles reducidos de las series del dashboard (del más fino al más grueso)
+
+    Cada gráfico se reduce por su propia curva: el DCA por el valor de los BTC y el de
+    precio por el precio, así cada uno conserva sus picos.
+    """
+    n = len(series['ts'])
+    if n <= MAX_PUNTOS_VISIBLES:
+        return []
+
+    resultado = []
+    for nombre, factor in niveles:
+        puntos = n // factor
+        if puntos < MIN_PUNTOS_NIVEL:
+            break
+        resultado.append(nivel(
+            nombre,
+            series,
+            lttb_indices(series['valor'], puntos, series['ts']),
+            lttb_indices(series['precio'], puntos, series['ts']),
+        ))
+        if puntos <= MAX_PUNTOS_VISIBLES:
+            break
+    return resultado
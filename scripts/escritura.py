@@ -0,0 +1,100 @@
+"""
+Escritura segura de archivos del tracker de BTC DCA
+Bloqueo advisory (flock) para serializar corridas superpuestas y reemplazo atómico:
+archivo temporal en el mismo directorio, fsync y rename, así un lector nunca ve un archivo a medias
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock, el reemplazo atómico sigue funcionando
+    fcntl = None
+
+# Bloqueos tomados por este proceso: path -> [descriptor, profundidad] (reentrantes)
+_bloqueos = {}
+
+
+@contextmanager
+def bloqueo(path):
+    """Bloqueo exclusivo sobre un archivo .lock; otra corrida espera hasta que se libere
+
+    Es reentrante dentro del proceso: una función bloqueada puede llamar a otra que también bloquea.
+    """
+    path = str(path)
+    if path in _bloqueos:
+        _bloqueos[path][1] += 1
+        try:
+            yield
+        finally:
+            _bloqueos[path][1] -= 1
+        return
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        _bloqueos[path] = [fd, 1]
+        try:
+            yield
+        finally:
+            del _bloqueos[path]
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _sincronizar_directorio(directorio):
+    # El rename es durable recién cuando se sincroniza el directorio que lo contiene
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def reemplazar(path, binario=False):
+    """Abre un temporal junto a path; al salir sin error hace fsync y lo renombra sobre path
+
+    Si el bloque falla, el temporal se borra y path queda intacto. Conserva los permisos del
+    archivo reemplazado (mkstemp crea con 0600).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    f = os.fdopen(fd, 'wb') if binario else os.fdopen(fd, 'w', encoding='utf-8', newline='')
+    try:
+        try:
+            modo = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mascara = os.umask(0)
+            os.umask(mascara)
+            modo = 0o666 & ~mascara
+        os.chmod(temporal, modo)
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, path)
+    except BaseException:
+        f.close()
+        try:
+            os.unlink(temporal)
+        except FileNotFoundError:
+            pass
+        raise
+    _sincronizar_directorio(path.parent)
+
+
+def escribir(path, contenido):
+    """Reemplaza el archivo con el texto (o bytes) de forma atómica"""
+    with reemplazar(path, binario=isinstance(contenido, bytes)) as f:
+        f.write(contenido)
@@ -0,0 +1,135 @@
+"""
+Servidor HTTP local que imita las APIs de precio del tracker de BTC DCA
+Sirve las mismas rutas que price_providers.PROVEEDORES con latencias y fallas configurables
+
+Uso:
+    python3 scripts/fake_price_server.py --precio 80000 --lento kraken=3 --falla bitstamp
+    python3 scripts/fake_price_server.py --falla coinbase=500 --desvio kraken=81000
+    python3 scripts/fake_price_server.py --activo ethereum=3000 --activo solana=150
+    BTC_DCA_PRICE_BASE_URL=http://127.0.0.1:8765 python3 scripts/daily_update.py
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def respuestas(precio):
+    """JSON que devuelve cada ruta, con el formato real de cada proveedor"""
+    return {
+        "/api/v3/simple/price": ('coingecko', {"bitcoin": {"usd": precio}}),
+        "/v2/prices/BTC-USD/spot": ('coinbase', {"data": {"base": "BTC", "currency": "USD", "amount": f"{precio:.2f}"}}),
+        "/0/public/Ticker": ('kraken', {"error": [], "result": {"XXBTZUSD": {"c": [f"{precio:.5f}", "0.001"]}}}),
+        "/api/v2/ticker/btcusd/": ('bitstamp', {"last": f"{precio:.0f}"}),
+    }
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    consultas = 0  # requests recibidos (para verificar cuántos round-trips hace el cliente)
+
+    def handle_error(self, request, client_address):
+        # El cliente cierra conexiones sin esperar a los proveedores lentos: no es un error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def precios_agrupados(query, precio, activos):
+    """Respuesta de CoinGecko para ids=a,b,...&vs_currencies=x (ids desconocidos se omiten, como la API real)"""
+    parametros = parse_qs(query)
+    ids = ",".join(parametros.get("ids", ["bitcoin"])).split(",")
+    monedas = ",".join(parametros.get("vs_currencies", ["usd"])).split(",")
+    cotizaciones = {'bitcoin': precio, **activos}
+    return {i: {m: cotizaciones[i] for m in monedas} for i in ids if i in cotizaciones}
+
+
+def crear_servidor(host="127.0.0.1", puerto=8765, precio=80000.0, retrasos=None, fallas=(), desvios=None, activos=None):
+    """Arma el servidor (puerto=0 elige uno libre)
+
+    retrasos: {proveedor: segundos}; fallas: proveedores que responden 503 (o {proveedor: código});
+    desvios: {proveedor: precio alternativo} para probar la mediana del quórum;
+    activos: {id de CoinGecko: precio} además de bitcoin para la consulta agrupada.
+    """
+    retrasos = retrasos or {}
+    desvios = desvios or {}
+    activos = activos or {}
+    fallas = dict(fallas) if isinstance(fallas, dict) else dict.fromkeys(fallas, 503)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, como las APIs reales
+
+        def do_GET(self):
+            self.server.consultas += 1
+            url = urlparse(self.path)
+            ruta = url.path
+            if ruta not in respuestas(precio):
+                self._responder(404, {"error": "not found"})
+                return
+            proveedor, _ = respuestas(precio)[ruta]
+            time.sleep(retrasos.get(proveedor, 0))
+            if proveedor in fallas:
+                self._responder(fallas[proveedor], {"error": "unavailable"})
+                return
+            if proveedor == 'coingecko':
+                self._responder(200, precios_agrupados(url.query, desvios.get(proveedor, precio), activos))
+                return
+            self._responder(200, respuestas(desvios.get(proveedor, precio))[ruta][1])
+
+        def _responder(self, codigo, datos):
+            cuerpo = json.dumps(datos).encode()
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, formato, *args):
+            pass
+
+    return _Servidor((host, puerto), Handler)
+
+
+def iniciar_en_segundo_plano(**opciones):
+    """Levanta el servidor en un hilo y devuelve (servidor, url base)"""
+    servidor = crear_servidor(**opciones)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    host, puerto = servidor.server_address[:2]
+    return servidor, f"http://{host}:{puerto}"
+
+
+def _parse_pares(valores, tipo=float):
+    pares = {}
+    for valor in valores:
+        nombre, _, numero = valor.partition('=')
+        pares[nombre] = tipo(numero)
+    return pares
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita las APIs de precio")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--precio', type=float, default=80000.0)
+    parser.add_argument('--lento', action='append', default=[], metavar='PROVEEDOR=SEGUNDOS',
+                        help="Demora la respuesta de un proveedor")
+    parser.add_argument('--falla', action='append', default=[], metavar='PROVEEDOR[=CÓDIGO]',
+                        help="El proveedor responde con error (503 si no se indica el código)")
+    parser.add_argument('--desvio', action='append', default=[], metavar='PROVEEDOR=PRECIO',
+                        help="El proveedor cotiza otro precio")
+    parser.add_argument('--activo', action='append', default=[], metavar='ID=PRECIO',
+                        help="Precio de otro activo en la consulta agrupada de CoinGecko (ej: ethereum=3000)")
+    args = parser.parse_args()
+
+    fallas = {nombre: int(codigo or 503) for nombre, _, codigo in (f.partition('=') for f in args.falla)}
+    servidor = crear_servidor(args.host, args.puerto, args.precio,
+                              _parse_pares(args.lento), fallas, _parse_pares(args.desvio),
+                              _parse_pares(args.activo))
+    print(f"Sirviendo precios falsos en http://{args.host}:{servidor.server_address[1]} (Ctrl+C para salir)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Reporte de tiempo de arranque del tracker de BTC DCA
+Ejecuta Python con `-X importtime` y resume qué módulos dominan el arranque
+
+Uso:
+    python3 scripts/importtime_report.py                      # solo el import de daily_update
+    python3 scripts/importtime_report.py --top 20
+    python3 scripts/importtime_report.py -- scripts/daily_update.py --append   # corrida completa
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+SCRIPTS_DIR = BASE_DIR / "scripts"
+
+# Dependencias pesadas que el camino rápido (append / no-op) no debería cargar
+MODULOS_PESADOS = ['pandas', 'numpy', 'requests']
+
+
+def medir(argumentos):
+    """Ejecuta Python con -X importtime y devuelve (segundos de pared, salida de importtime)"""
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", *argumentos],
+        cwd=SCRIPTS_DIR if argumentos[:1] == ["-c"] else BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    segundos = time.perf_counter() - inicio
+    if proceso.returncode != 0:
+        errores = proceso.stdout.splitlines() + [
+            l for l in proceso.stderr.splitlines() if not l.startswith("import time:")
+        ]
+        raise RuntimeError(f"El comando terminó con código {proceso.returncode}:\n" + "\n".join(errores[-20:]))
+    return segundos, proceso.stderr
+
+
+def parsear_importtime(salida):
+    """Convierte las líneas 'import time: self | cumulative | módulo' en dicts con nivel de anidamiento"""
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|", 2)
+        nombre = nombre[1:]
+        modulos.append({
+            'modulo': nombre.strip(),
+            'nivel': (len(nombre) - len(nombre.lstrip())) // 2,
+            'propio_us': int(propio),
+            'acumulado_us': int(acumulado),
+        })
+    return modulos
+
+
+def reporte(segundos, modulos, top=15):
+    """Arma el texto del reporte: total, módulos pesados cargados y ranking de imports de primer nivel"""
+    primer_nivel = [m for m in modulos if m['nivel'] == 0]
+    total_us = sum(m['acumulado_us'] for m in primer_nivel)
+    cargados = {m['modulo'].split('.')[0] for m in modulos}
+
+    lineas = [
+        f"Tiempo total del proceso:  {segundos * 1000:8.1f} ms",
+        f"Tiempo en imports:         {total_us / 1000:8.1f} ms ({len(modulos)} módulos)",
+        "",
+        "Dependencias pesadas:",
+    ]
+    for nombre in MODULOS_PESADOS:
+        estado = "⚠ importado" if nombre in cargados else "✓ no importado"
+        lineas.append(f"  {nombre:<10} {estado}")
+
+    lineas += ["", f"Top {top} imports de primer nivel (acumulado):"]
+    for m in sorted(primer_nivel, key=lambda m: m['acumulado_us'], reverse=True)[:top]:
+        lineas.append(f"  {m['acumulado_us'] / 1000:8.1f} ms  {m['modulo']}")
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque (python -X importtime)")
+    parser.add_argument('--top', type=int, default=15, help="Cantidad de imports a listar")
+    parser.add_argument('comando', nargs=argparse.REMAINDER,
+                        help="Script y argumentos a medir después de '--' (default: import de daily_update)")
+    args = parser.parse_args()
+
+    comando = [a for a in args.comando if a != '--'] or ["-c", "import daily_update"]
+    segundos, salida = medir(comando)
+    print(reporte(segundos, parsear_importtime(salida), args.top))
@@ -0,0 +1,122 @@
+"""
+Índice de fechas del ledger del tracker de BTC DCA
+El ledger se mantiene ordenado por fecha y sin repetidos, así que existencia, rangos
+y huecos se resuelven con búsqueda binaria (np.searchsorted) sobre un array datetime64[D]
+(datetime64[s] en ledgers con compras intradiarias; los huecos se cuentan siempre en días)
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+UN_DIA = np.timedelta64(1, 'D')
+
+
+def crear(fechas):
+    """Array datetime64[D] a partir de fechas (date, str ISO, Timestamp o datetime64)"""
+    return np.asarray(fechas).astype('datetime64[D]')
+
+
+def _dia(fecha):
+    return np.datetime64(fecha, 'D')
+
+
+def _instante(fecha):
+    # Sin forzar unidad: numpy compara días e instantes llevándolos a la más fina
+    return np.datetime64(fecha)
+
+
+def _es_dia(fecha):
+    if isinstance(fecha, np.datetime64):
+        return np.datetime_data(fecha.dtype)[0] == 'D'
+    return not isinstance(fecha, datetime)
+
+
+def es_valido(indice):
+    """Indica si el índice está estrictamente ordenado (ordenado y sin fechas repetidas)"""
+    return len(indice) < 2 or bool((indice[1:] > indice[:-1]).all())
+
+
+def reparar(indice):
+    """Posiciones a conservar para ordenar el índice y descartar repetidos (queda la primera aparición)"""
+    orden = np.argsort(indice, kind='stable')
+    ordenado = indice[orden]
+    primera = np.ones(len(orden), dtype=bool)
+    primera[1:] = ordenado[1:] != ordenado[:-1]
+    return orden[primera]
+
+
+def posicion(indice, fecha):
+    """Posición donde iría la fecha para mantener el orden (O(log n))"""
+    return int(np.searchsorted(indice, _instante(fecha), side='left'))
+
+
+def contiene(indice, fecha):
+    """Indica si la fecha ya está en el índice (O(log n))"""
+    i = posicion(indice, fecha)
+    return i < len(indice) and indice[i] == _instante(fecha)
+
+
+def rango(indice, desde=None, hasta=None):
+    """slice de las filas entre desde y hasta inclusive (O(log n)); un `hasta` de tipo día abarca el día entero"""
+    inicio = 0 if desde is None else posicion(indice, desde)
+    if hasta is None:
+        fin = len(indice)
+    elif _es_dia(hasta):
+        fin = int(np.searchsorted(indice, _dia(hasta) + UN_DIA, side='left'))
+    else:
+        fin = int(np.searchsorted(indice, _instante(hasta), side='right'))
+    return slice(inicio, max(inicio, fin))
+
+
+def dias_faltantes(indice, desde, hasta):
+    """Cantidad de días sin registro entre desde y hasta inclusive (O(log n))"""
+    desde, hasta = _dia(desde), _dia(hasta)
+    if hasta < desde:
+        return 0
+    esperados = int((hasta - desde) // UN_DIA) + 1
+    filas = rango(indice, desde, hasta)
+    return esperados - (filas.stop - filas.start)
+
+
+def huecos(indice, desde=None, hasta=None):
+    """Rangos [(inicio, fin)] de días sin registro entre desde y hasta inclusive
+
+    Bisección: un tramo cuyas puntas distan tantos días como filas tiene está completo y no
+    se recorre. Con k huecos el costo es O(k log n) en lugar de comparar todo el historial.
+    """
+    filas = rango(indice, desde, hasta)
+    i, j = filas.start, filas.stop
+    desde = _dia(desde) if desde is not None else (indice[0] if len(indice) else None)
+    hasta = _dia(hasta) if hasta is not None else (indice[-1] if len(indice) else None)
+    if desde is None or hasta < desde:
+        return []
+    if i == j:
+        return [(desde, hasta)]
+
+    resultado = []
+    if indice[i] > desde:
+        resultado.append((desde, indice[i] - UN_DIA))
+    internos = []
+    pendientes = [(i, j - 1)]
+    while pendientes:
+        a, b = pendientes.pop()
+        if (indice[b] - indice[a]) // UN_DIA == b - a:
+            continue  # tramo completo
+        if b - a == 1:
+            internos.append((indice[a] + UN_DIA, indice[b] - UN_DIA))
+            continue
+        medio = (a + b) // 2
+        pendientes.append((medio, b))
+        pendientes.append((a, medio))
+    resultado.extend(sorted(internos))
+    if indice[j - 1] < hasta:
+        resultado.append((indice[j - 1] + UN_DIA, hasta))
+    return resultado
+
+
+def expandir(rangos):
+    """Días (datetime64[D]) de una lista de rangos [(inicio, fin)]"""
+    if not rangos:
+        return np.array([], dtype='datetime64[D]')
+    return np.concatenate([np.arange(inicio, fin + UN_DIA, dtype='datetime64[D]') for inicio, fin in rangos])
@@ -0,0 +1,95 @@
+"""
+Intervalos de compra y claves de período del ledger del tracker de BTC DCA
+Con intervalo diario la clave es la fecha (como siempre); con intervalos menores es el inicio
+del período en UTC, escrito como 'YYYY-MM-DDTHH:MM:SSZ'. Solo stdlib: lo usa el camino rápido
+"""
+
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+
+UNIDADES = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+UN_DIA = 86400
+
+FORMATO_INSTANTE = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def parse_intervalo(texto):
+    """Convierte '15m', '1h', '1d', '90s' (o segundos sueltos) a segundos"""
+    coincidencia = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', str(texto))
+    if not coincidencia:
+        raise ValueError(f"Intervalo inválido: {texto} (ej: 15m, 1h, 1d)")
+    segundos = float(coincidencia[1]) * UNIDADES[coincidencia[2] or 's']
+    if segundos <= 0:
+        raise ValueError(f"El intervalo debe ser positivo: {texto}")
+    return segundos
+
+
+def intervalo_compra(texto):
+    """Segundos entre compras: 1d o un divisor exacto del día (1m, 15m, 1h, 6h...)"""
+    segundos = parse_intervalo(texto)
+    if segundos == UN_DIA or (segundos < UN_DIA and segundos >= 1 and UN_DIA % segundos == 0):
+        return int(segundos)
+    raise ValueError(f"Intervalo de compra no soportado: {texto} (1d o un divisor del día, ej: 15m, 1h)")
+
+
+def es_diario(segundos):
+    return segundos >= UN_DIA
+
+
+def compras_por_dia(segundos):
+    return max(1, UN_DIA // int(segundos))
+
+
+def clave_periodo(segundos, ahora=None):
+    """Clave idempotente del período en curso: la fecha local (diario) o el inicio del período en UTC
+
+    Dos corridas dentro del mismo período obtienen la misma clave y la segunda no vuelve a comprar.
+    ahora: datetime con zona horaria (por defecto, el momento actual).
+    """
+    epoch = ahora.timestamp() if ahora else time.time()
+    if es_diario(segundos):
+        return datetime.fromtimestamp(epoch).date()
+    inicio = int(epoch // segundos * segundos)
+    return datetime.fromtimestamp(inicio, timezone.utc).replace(tzinfo=None)
+
+
+def inicio_periodo(segundos, ahora=None):
+    """Epoch en que empezó el período en curso (la medianoche local con intervalo diario)"""
+    clave = clave_periodo(segundos, ahora)
+    if es_diario(segundos):
+        return datetime.combine(clave, datetime.min.time()).timestamp()
+    return clave.replace(tzinfo=timezone.utc).timestamp()
+
+
+def formatear(clave):
+    """'YYYY-MM-DD' para fechas, 'YYYY-MM-DDTHH:MM:SSZ' para instantes (UTC)"""
+    if isinstance(clave, datetime):
+        return clave.strftime(FORMATO_INSTANTE)
+    return clave.isoformat()
+
+
+def parsear(texto):
+    """Inversa de formatear: con sufijo Z es un instante UTC; si no, una fecha (se ignora la hora
+    de los formatos viejos, como hacía .dt.date)"""
+    texto = texto.strip()
+    if texto.endswith('Z'):
+        return datetime.strptime(texto, FORMATO_INSTANTE)
+    return date.fromisoformat(texto[:10])
+
+
+def como_instante(clave):
+    """Lleva fechas a su medianoche para poder comparar claves diarias con instantes"""
+    if isinstance(clave, datetime):
+        return clave
+    return datetime.combine(clave, datetime.min.time())
+
+
+def dia(clave):
+    """Día UTC de la clave"""
+    return clave.date() if isinstance(clave, datetime) else clave
+
+
+def fin_del_dia(clave):
+    """Primer instante posterior al día de una fecha (límite exclusivo de los rangos)"""
+    return como_instante(dia(clave)) + timedelta(days=1)
@@ -0,0 +1,193 @@
+"""
+Métricas incrementales del dashboard del tracker de BTC DCA
+Mantiene los agregados (totales, mejor/peor día, últimos dos días) y los actualiza fila a fila
+"""
+
+import json
+import math
+from datetime import date
+
+import escritura
+
+VERSION_ESTADO = 1
+
+
+def _fecha_iso(valor):
+    """Normaliza una fecha (date, Timestamp, datetime64 o str) a 'YYYY-MM-DD'"""
+    if isinstance(valor, str):
+        return valor[:10]
+    if isinstance(valor, date):
+        return valor.isoformat()[:10]
+    return str(valor.astype('datetime64[D]'))
+
+
+def _dia(registro):
+    return {
+        'fecha': _fecha_iso(registro['fecha']),
+        'btc': float(registro['btc_comprados']),
+        'precio': float(registro['precio_btc_usd']),
+    }
+
+
+def _cierre(registro):
+    return {
+        'fecha': _fecha_iso(registro['fecha']),
+        'valor': float(registro['valor_actual_usd']),
+        'precio': float(registro['precio_btc_usd']),
+    }
+
+
+def estado_inicial():
+    """Estado vacío (ledger sin registros)"""
+    return {
+        'version': VERSION_ESTADO,
+        'dias': 0,
+        'total_invertido': 0.0,
+        'total_comisiones': 0.0,
+        'btc_total': 0.0,
+        'mejor_dia': None,
+        'peor_dia': None,
+        'ultimo': None,
+        'anterior': None,
+    }
+
+
+def actualizar(estado, registro, comision_porcentaje):
+    """Incorpora un registro nuevo al estado en O(1), sin mirar el historial"""
+    estado = dict(estado)
+    comision = registro.get('comision_usd')
+    if comision is None or (isinstance(comision, float) and math.isnan(comision)):
+        comision = registro['usd_invertidos'] * comision_porcentaje
+
+    estado['dias'] += 1
+    estado['total_invertido'] += float(registro['usd_invertidos'])
+    estado['total_comisiones'] += float(comision)
+    estado['btc_total'] = float(registro['btc_acumulado'])
+
+    # Mismo criterio que idxmax/idxmin: ante empate se conserva el primero
+    btc = float(registro['btc_comprados'])
+    if estado['mejor_dia'] is None or btc > estado['mejor_dia']['btc']:
+        estado['mejor_dia'] = _dia(registro)
+    if estado['peor_dia'] is None or btc < estado['peor_dia']['btc']:
+        estado['peor_dia'] = _dia(registro)
+
+    estado['anterior'] = estado['ultimo']
+    estado['ultimo'] = _cierre(registro)
+    return estado
+
+
+def recalcular(df, comision_porcentaje):
+    """Recalcula el estado completo desde el DataFrame del ledger (verificación / fallback)"""
+    estado = estado_inicial()
+    if df.empty:
+        return estado
+
+    if 'comision_usd' in df.columns:
+        total_comisiones = float(df['comision_usd'].sum())
+    else:
+        total_comisiones = float(df['usd_invertidos'].sum()) * comision_porcentaje
+
+    btc_comprados = df['btc_comprados'].to_numpy()
+    mejor = df.iloc[btc_comprados.argmax()]
+    peor = df.iloc[btc_comprados.argmin()]
+    ultimo = df.iloc[-1]
+    estado.update({
+        'dias': len(df),
+        'total_invertido': float(df['usd_invertidos'].sum()),
+        'total_comisiones': total_comisiones,
+        'btc_total': float(df['btc_acumulado'].iloc[-1]),
+        'mejor_dia': _dia(mejor),
+        'peor_dia': _dia(peor),
+        'ultimo': _cierre(ultimo),
+        'anterior': _cierre(df.iloc[-2]) if len(df) > 1 else None,
+    })
+    return estado
+
+
+def _fila(lote, i):
+    return {c: valores[i] for c, valores in lote.items()}
+
+
+def reductor(comision_porcentaje):
+    """Versión por lotes de recalcular (generador: ver streaming.recorrer)
+
+    Recibe lotes dict columna -> array con send() y al recibir None devuelve el mismo estado
+    que recalcular, sin tener más de un lote en memoria.
+    """
+    estado = estado_inicial()
+    cola = []  # últimas dos filas vistas (anterior y último)
+    while True:
+        lote = yield
+        if lote is None:
+            break
+        n = len(lote['fecha'])
+        if n == 0:
+            continue
+        if 'comision_usd' in lote:
+            comisiones = float(lote['comision_usd'].sum())
+        else:
+            comisiones = float(lote['usd_invertidos'].sum()) * comision_porcentaje
+        estado['dias'] += n
+        estado['total_invertido'] += float(lote['usd_invertidos'].sum())
+        estado['total_comisiones'] += comisiones
+        estado['btc_total'] = float(lote['btc_acumulado'][-1])
+
+        # argmax/argmin devuelven la primera aparición y la comparación estricta conserva el lote anterior
+        btc = lote['btc_comprados']
+        mejor, peor = _fila(lote, int(btc.argmax())), _fila(lote, int(btc.argmin()))
+        if estado['mejor_dia'] is None or float(mejor['btc_comprados']) > estado['mejor_dia']['btc']:
+            estado['mejor_dia'] = _dia(mejor)
+        if estado['peor_dia'] is None or float(peor['btc_comprados']) < estado['peor_dia']['btc']:
+            estado['peor_dia'] = _dia(peor)
+        cola = (cola + [_fila(lote, i) for i in range(max(0, n - 2), n)])[-2:]
+
+    if cola:
+        estado['ultimo'] = _cierre(cola[-1])
+        estado['anterior'] = _cierre(cola[0]) if len(cola) > 1 else None
+    return estado
+
+
+def sigue_al_ledger(estado, ultimo_registro):
+    """Indica si el estado persistido corresponde al último registro del ledger"""
+    if estado is None or estado.get('version') != VERSION_ESTADO:
+        return False
+    if ultimo_registro is None:
+        return estado['dias'] == 0
+    if estado['ultimo'] is None:
+        return False
+    return (
+        estado['ultimo']['fecha'] == _fecha_iso(ultimo_registro['fecha'])
+        and math.isclose(estado['btc_total'], float(ultimo_registro['btc_acumulado']), rel_tol=1e-9)
+    )
+
+
+def _coinciden(actual, esperado, rel_tol):
+    """Compara valores del estado (recursivo en dicts) con tolerancia para floats"""
+    if isinstance(esperado, dict) and isinstance(actual, dict):
+        return actual.keys() == esperado.keys() and all(
+            _coinciden(actual[k], esperado[k], rel_tol) for k in esperado
+        )
+    if isinstance(esperado, float) and isinstance(actual, (int, float)):
+        return math.isclose(actual, esperado, rel_tol=rel_tol, abs_tol=1e-12)
+    return actual == esperado
+
+
+def diferencias(estado, referencia, rel_tol=1e-9):
+    """Lista las claves del estado que no coinciden con la referencia recalculada"""
+    return [clave for clave in referencia if not _coinciden(estado.get(clave), referencia[clave], rel_tol)]
+
+
+def cargar_estado(path):
+    """Lee el estado persistido (None si no existe o está corrupto)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def guardar_estado(path, estado):
+    """Persiste el estado de métricas como JSON (reemplazo atómico)"""
+    with escritura.reemplazar(path) as f:
+        json.dump(estado, f, indent=2, ensure_ascii=False)
+        f.write('\n')
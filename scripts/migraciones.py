@@ -0,0 +1,116 @@
+"""
+Migraciones de esquema del ledger del tracker de BTC DCA
+Cada versión del ledger se reconoce por sus columnas, así que la versión se detecta leyendo solo
+la cabecera (la primera línea del CSV o los metadatos del backend) y no cuesta nada en cada corrida.
+Las migraciones pendientes se aplican una sola vez, en orden, recorriendo el ledger por lotes
+"""
+
+import storage
+
+# Columnas de la primera versión del ledger (antes de registrar la comisión)
+COLUMNAS_V1 = [c for c in storage.COLUMNAS if c != 'comision_usd']
+
+
+def _agregar_comision(lote, contexto):
+    """v2: comisión de cada compra, estimada con el porcentaje configurado"""
+    lote['comision_usd'] = lote['usd_invertidos'].astype(float) * contexto['comision_porcentaje']
+    return lote
+
+
+# Registro ordenado: (versión a la que lleva, columnas que agrega, descripción, función(lote, contexto))
+# La función recibe un lote DataFrame con las columnas de la versión anterior (los CSV como texto,
+# para no reformatear los valores que no toca) y devuelve el lote con las columnas de la nueva
+MIGRACIONES = [
+    (2, ['comision_usd'], "comision_usd: usd_invertidos × comisión", _agregar_comision),
+]
+
+VERSION_ACTUAL = MIGRACIONES[-1][0] if MIGRACIONES else 1
+
+
+def version(cabecera):
+    """Versión del esquema según las columnas guardadas: la última cuyas columnas están todas"""
+    cabecera = set(cabecera) - {''}
+    if not cabecera:
+        return VERSION_ACTUAL  # archivo vacío: la próxima escritura pone la cabecera vigente
+    if not set(COLUMNAS_V1) <= cabecera:
+        faltan = ', '.join(c for c in COLUMNAS_V1 if c not in cabecera)
+        raise ValueError(f"Cabecera de ledger desconocida (faltan {faltan})")
+    actual = 1
+    for destino, agregadas, _, _ in MIGRACIONES:
+        if not set(agregadas) <= cabecera:
+            break
+        actual = destino
+    return actual
+
+
+def pendientes(cabecera):
+    """Migraciones que todavía no se aplicaron a un ledger con esa cabecera"""
+    desde = version(cabecera)
+    return [m for m in MIGRACIONES if m[0] > desde]
+
+
+def migrar_df(df, contexto):
+    """Aplica las migraciones pendientes a un DataFrame en memoria (importación de un CSV externo)
+
+    Devuelve (df, descripciones de las migraciones aplicadas).
+    """
+    aplicadas = pendientes(df.columns)
+    for _, _, _, funcion in aplicadas:
+        df = funcion(df, contexto)
+    return df, [m[2] for m in aplicadas]
+
+
+def migrar_csv(path, contexto, tamano_lote=storage.TAMANO_LOTE):
+    """Migra un CSV por lotes a un temporal que reemplaza al original de forma atómica
+
+    Las columnas se leen como texto y se escriben tal cual: solo cambian las que agrega la migración.
+    Devuelve las descripciones de las migraciones aplicadas (vacío si ya estaba al día).
+    """
+    import pandas as pd
+
+    import escritura
+
+    cabecera = storage.leer_cabecera(path)
+    aplicadas = pendientes(cabecera)
+    if not aplicadas:
+        return []
+
+    def migrar_lote(lote):
+        for _, _, _, funcion in aplicadas:
+            lote = funcion(lote, contexto)
+        return lote
+
+    with escritura.reemplazar(path) as f, \
+            pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=tamano_lote) as lector:
+        vacio = True
+        for lote in lector:
+            migrar_lote(lote).to_csv(f, index=False, header=vacio)
+            vacio = False
+        if vacio:
+            migrar_lote(pd.DataFrame(columns=cabecera, dtype=str)).to_csv(f, index=False)
+    return [m[2] for m in aplicadas]
+
+
+def migrar(ledger, contexto, tamano_lote=storage.TAMANO_LOTE):
+    """Lleva el ledger a VERSION_ACTUAL; devuelve las descripciones de las migraciones aplicadas
+
+    Los CSV (y cada mes del particionado) se migran por lotes sin cargarlos enteros; el resto de
+    los backends se reescribe con guardar(). El manifiesto del particionado se recalcula después
+    de migrar los meses, así sus acumulados incluyen las columnas nuevas.
+    """
+    if isinstance(ledger, storage.PartitionedStorage):
+        aplicadas = []
+        for p in ledger.particiones():
+            for descripcion in migrar_csv(ledger.directorio / p['archivo'], contexto, tamano_lote):
+                if descripcion not in aplicadas:
+                    aplicadas.append(descripcion)
+        if aplicadas:
+            ledger.recalcular_manifiesto()
+        return aplicadas
+    if isinstance(ledger, storage.CSVStorage):
+        return migrar_csv(ledger.path, contexto, tamano_lote)
+
+    df, aplicadas = migrar_df(ledger.cargar(), contexto)
+    if aplicadas:
+        ledger.guardar(df)
+    return aplicadas
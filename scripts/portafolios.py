@@ -0,0 +1,97 @@
+"""
+Modo multi-portafolio del tracker de BTC DCA
+Lee la configuración de portafolios (uno por persona o estrategia) y renderiza todos
+los dashboards en un pool de procesos a partir de la plantilla inline precompilada
+"""
+
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import dashboard
+import downsample
+import escritura
+import storage
+
+# Por debajo de esta cantidad de dashboards por proceso no conviene levantar el pool
+PORTAFOLIOS_POR_PROCESO = 8
+
+CAMPOS_OBLIGATORIOS = ('nombre', 'directorio')
+
+
+def cargar_config(path, usd_por_compra, comision):
+    """Lee el JSON de portafolios y completa los valores por defecto
+
+    Formato: {"portafolios": [{"nombre", "directorio", "activo", "usd_por_compra", "comision"}, ...]}.
+    Los directorios relativos se resuelven desde la carpeta del archivo de configuración.
+    """
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    portafolios, nombres = [], set()
+    for i, entrada in enumerate(config.get('portafolios', [])):
+        faltantes = [c for c in CAMPOS_OBLIGATORIOS if c not in entrada]
+        if faltantes:
+            raise ValueError(f"Portafolio #{i + 1} sin {', '.join(faltantes)} en {path}")
+        if entrada['nombre'] in nombres:
+            raise ValueError(f"Portafolio duplicado en {path}: {entrada['nombre']}")
+        nombres.add(entrada['nombre'])
+
+        activo = entrada.get('activo', 'bitcoin')
+        directorio = (path.parent / entrada['directorio']).resolve()
+        prefijo = 'btc' if activo == 'bitcoin' else activo
+        portafolios.append({
+            'nombre': entrada['nombre'],
+            'activo': activo,
+            'usd_por_compra': float(entrada.get('usd_por_compra', usd_por_compra)),
+            'comision': float(entrada.get('comision', comision)),
+            'ledger': directorio / f"{prefijo}_purchases.csv",
+            'metricas': directorio / f"{prefijo}_purchases.metrics.json",
+            'dashboard': directorio / "index.html",
+        })
+    return portafolios
+
+
+def renderizar(trabajo):
+    """Renderiza y escribe el dashboard de un portafolio (se ejecuta dentro del pool)
+
+    trabajo: {'nombre', 'ledger', 'dashboard', 'estado', 'usd_por_compra', 'timestamp'}.
+    Devuelve (nombre, bytes escritos, segundos).
+    """
+    inicio = time.perf_counter()
+    columnas = storage.leer_columnas_csv(trabajo['ledger'], storage.COLUMNAS)
+    series = dashboard.series_dashboard(columnas)
+    series['niveles'] = downsample.niveles_reducidos(series)
+    campos = dashboard.campos_dashboard(trabajo['estado'], trabajo['timestamp'], trabajo['usd_por_compra'])
+    html = dashboard.render_inline(campos, series)
+
+    escritura.escribir(Path(trabajo['dashboard']), html)
+    if series['niveles']:
+        escritura.escribir(Path(trabajo['dashboard']).with_name(dashboard.NIVELES_ARCHIVO), dashboard.render_niveles_json(series))
+    return trabajo['nombre'], len(html.encode('utf-8')), time.perf_counter() - inicio
+
+
+def _inicializar_proceso():
+    # Plantilla una sola vez por proceso del pool (no una vez por dashboard)
+    dashboard.plantilla_inline()
+
+
+def renderizar_todos(trabajos, procesos=None):
+    """Renderiza los dashboards en paralelo y devuelve [(nombre, bytes, segundos)] en orden
+
+    procesos: None decide según la cantidad de dashboards; 1 fuerza ejecución en serie.
+    """
+    if procesos is None:
+        procesos = min(os.cpu_count() or 1, max(1, len(trabajos) // PORTAFOLIOS_POR_PROCESO))
+    _inicializar_proceso()  # los procesos creados por fork heredan la plantilla ya armada
+    if procesos <= 1 or len(trabajos) <= 1:
+        return [renderizar(t) for t in trabajos]
+
+    # Lotes grandes: menos idas y vueltas entre procesos que un dashboard por tarea
+    lote = max(1, math.ceil(len(trabajos) / (procesos * 4)))
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso) as pool:
+        return list(pool.map(renderizar, trabajos, chunksize=lote))
@@ -0,0 +1,67 @@
+"""
+Caché en disco de cotizaciones del tracker de BTC DCA
+Reutiliza la última cotización entre ejecuciones mientras no venza su TTL
+"""
+
+import json
+import time
+
+import escritura
+
+TTL_SEGUNDOS = 900  # 15 minutos
+MAX_ENTRADAS = 64
+
+
+def cargar(path):
+    """Lee todas las entradas de la caché ({} si no existe o está corrupta)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            entradas = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return entradas if isinstance(entradas, dict) else {}
+
+
+def _vigentes(entradas, ttl, ahora):
+    return {
+        clave: entrada for clave, entrada in entradas.items()
+        if isinstance(entrada, dict) and 0 <= ahora - entrada.get('ts', 0) < ttl
+    }
+
+
+def obtener(path, clave, ttl=TTL_SEGUNDOS, ahora=None, desde=None):
+    """Devuelve la entrada vigente de la clave ({'precio', 'ts', 'fuentes'}) o None
+
+    desde: epoch mínimo de la cotización (inicio del período de compra: una cotización de un
+    período anterior no sirve aunque no haya vencido su TTL).
+    """
+    if ttl <= 0:
+        return None
+    ahora = time.time() if ahora is None else ahora
+    entrada = _vigentes(cargar(path), ttl, ahora).get(clave)
+    if entrada is not None and desde is not None and entrada.get('ts', 0) < desde:
+        return None
+    return entrada
+
+
+def guardar(path, clave, precio, fuentes=None, ttl=TTL_SEGUNDOS, max_entradas=MAX_ENTRADAS, ahora=None):
+    """Guarda una cotización y desaloja las vencidas y las más viejas por encima del máximo"""
+    guardar_varias(path, {clave: precio}, {clave: fuentes}, ttl, max_entradas, ahora)
+
+
+def guardar_varias(path, precios, fuentes=None, ttl=TTL_SEGUNDOS, max_entradas=MAX_ENTRADAS, ahora=None):
+    """Guarda varias cotizaciones ({clave: precio}) reescribiendo el archivo una sola vez"""
+    if ttl <= 0:
+        return
+    ahora = time.time() if ahora is None else ahora
+    fuentes = fuentes or {}
+    entradas = _vigentes(cargar(path), ttl, ahora)
+    for clave, precio in precios.items():
+        entradas[clave] = {'precio': precio, 'ts': ahora, 'fuentes': fuentes.get(clave) or {}}
+    if len(entradas) > max_entradas:
+        recientes = sorted(entradas.items(), key=lambda item: item[1]['ts'], reverse=True)
+        entradas = dict(recientes[:max_entradas])
+
+    with escritura.reemplazar(path) as f:
+        json.dump(entradas, f, indent=2, ensure_ascii=False)
+        f.write('\n')
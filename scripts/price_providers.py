@@ -0,0 +1,180 @@
+"""
+Proveedores de precio del tracker de BTC DCA
+Consulta varias APIs en paralelo sobre conexiones keep-alive y devuelve la primera
+cotización válida o la mediana de un quórum, dentro de un presupuesto de latencia.
+Para varios activos, una sola consulta agrupada a CoinGecko (ids=bitcoin,ethereum,...)
+"""
+
+import math
+import os
+import queue
+import statistics
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Permite redirigir todos los proveedores a otro host (p. ej. scripts/fake_price_server.py)
+URL_BASE_OVERRIDE = os.environ.get("BTC_DCA_PRICE_BASE_URL")
+
+PRESUPUESTO_SEGUNDOS = 5.0
+
+
+def _coingecko(datos):
+    return datos["bitcoin"]["usd"]
+
+
+def _coinbase(datos):
+    return datos["data"]["amount"]
+
+
+def _kraken(datos):
+    if datos.get("error"):
+        raise ValueError(", ".join(datos["error"]))
+    par = next(iter(datos["result"].values()))
+    return par["c"][0]
+
+
+def _bitstamp(datos):
+    return datos["last"]
+
+
+# nombre -> (url base, ruta, parámetros, función que extrae el precio del JSON)
+PROVEEDORES = {
+    'coingecko': (
+        "https://api.coingecko.com", "/api/v3/simple/price",
+        {"ids": "bitcoin", "vs_currencies": "usd"}, _coingecko,
+    ),
+    'coinbase': ("https://api.coinbase.com", "/v2/prices/BTC-USD/spot", {}, _coinbase),
+    'kraken': ("https://api.kraken.com", "/0/public/Ticker", {"pair": "XBTUSD"}, _kraken),
+    'bitstamp': ("https://www.bitstamp.net", "/api/v2/ticker/btcusd/", {}, _bitstamp),
+}
+
+# Endpoint agrupado: un solo request cotiza todos los activos (ids de CoinGecko)
+URL_PRECIOS_AGRUPADOS = ("https://api.coingecko.com", "/api/v3/simple/price")
+
+_sesion = None
+
+
+class SinCotizacion(Exception):
+    """Ningún proveedor devolvió una cotización válida dentro del presupuesto"""
+
+    def __init__(self, errores):
+        self.errores = errores
+        detalle = "; ".join(f"{nombre}: {error}" for nombre, error in errores.items())
+        super().__init__(f"Sin cotización válida ({detalle or 'sin proveedores'})")
+
+
+def sesion_compartida():
+    """Sesión HTTP reutilizada entre consultas (pool de conexiones keep-alive por host)"""
+    global _sesion
+    if _sesion is None:
+        _sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=len(PROVEEDORES), pool_maxsize=len(PROVEEDORES))
+        _sesion.mount("https://", adaptador)
+        _sesion.mount("http://", adaptador)
+        _sesion.headers["User-Agent"] = "btc-dca-tracker"
+    return _sesion
+
+
+def consultar(nombre, sesion=None, timeout=PRESUPUESTO_SEGUNDOS, url_base=None):
+    """Consulta un proveedor y devuelve el precio validado (float > 0)"""
+    base, ruta, params, extraer = PROVEEDORES[nombre]
+    url = (url_base or URL_BASE_OVERRIDE or base).rstrip("/") + ruta
+    response = (sesion or sesion_compartida()).get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    precio = float(extraer(response.json()))
+    if not math.isfinite(precio) or precio <= 0:
+        raise ValueError(f"Precio inválido: {precio}")
+    return precio
+
+
+def obtener_precio(proveedores=None, quorum=1, presupuesto=PRESUPUESTO_SEGUNDOS, sesion=None, url_base=None):
+    """Consulta los proveedores en paralelo y resuelve el precio
+
+    quorum=1 devuelve la primera cotización válida; quorum>1 espera esa cantidad de
+    cotizaciones y devuelve su mediana. Si vence el presupuesto con menos cotizaciones
+    que el quórum pero al menos una, se usa la mediana de las disponibles (parcial=True).
+
+    Devuelve {'precio', 'cotizaciones': {nombre: precio}, 'errores': {nombre: error},
+    'parcial', 'segundos'}; lanza SinCotizacion si no hubo ninguna válida.
+    """
+    proveedores = list(proveedores or PROVEEDORES)
+    quorum = max(1, min(quorum, len(proveedores)))
+    sesion = sesion or sesion_compartida()
+    inicio = time.monotonic()
+    limite = inicio + presupuesto
+
+    # Hilos daemon: un proveedor lento no demora ni la respuesta ni la salida del proceso
+    resultados = queue.Queue()
+
+    def trabajar(nombre):
+        try:
+            resultados.put((nombre, consultar(nombre, sesion, presupuesto, url_base), None))
+        except (requests.exceptions.RequestException, KeyError, IndexError, TypeError, ValueError) as e:
+            resultados.put((nombre, None, e))
+
+    for nombre in proveedores:
+        threading.Thread(target=trabajar, args=(nombre,), daemon=True).start()
+
+    cotizaciones, errores = {}, {}
+    pendientes = set(proveedores)
+    while pendientes and len(cotizaciones) < quorum:
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            break
+        try:
+            nombre, precio, error = resultados.get(timeout=restante)
+        except queue.Empty:
+            break
+        pendientes.discard(nombre)
+        if error is None:
+            cotizaciones[nombre] = precio
+        else:
+            errores[nombre] = error
+    if len(cotizaciones) < quorum:
+        for nombre in pendientes:
+            errores[nombre] = TimeoutError(f"sin respuesta en {presupuesto:g}s")
+
+    if not cotizaciones:
+        raise SinCotizacion(errores)
+    return {
+        'precio': statistics.median(cotizaciones.values()),
+        'cotizaciones': cotizaciones,
+        'errores': errores,
+        'parcial': len(cotizaciones) < quorum,
+        'segundos': time.monotonic() - inicio,
+    }
+
+
+def obtener_precios(activos, moneda='usd', presupuesto=PRESUPUESTO_SEGUNDOS, sesion=None, url_base=None):
+    """Cotiza varios activos con una sola consulta a CoinGecko (ids=a,b,...&vs_currencies=moneda)
+
+    N activos cuestan un solo round-trip. Devuelve {'precios': {activo: precio},
+    'errores': {activo: error}, 'segundos'}; lanza SinCotizacion si no hubo ningún precio válido.
+    """
+    activos = list(dict.fromkeys(activos))
+    base, ruta = URL_PRECIOS_AGRUPADOS
+    url = (url_base or URL_BASE_OVERRIDE or base).rstrip("/") + ruta
+    params = {"ids": ",".join(activos), "vs_currencies": moneda}
+    inicio = time.monotonic()
+    try:
+        response = (sesion or sesion_compartida()).get(url, params=params, timeout=presupuesto)
+        response.raise_for_status()
+        datos = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        raise SinCotizacion({'coingecko': e})
+
+    precios, errores = {}, {}
+    for activo in activos:
+        try:
+            precio = float(datos[activo][moneda])
+            if not math.isfinite(precio) or precio <= 0:
+                raise ValueError(f"Precio inválido: {precio}")
+            precios[activo] = precio
+        except (KeyError, TypeError, ValueError) as e:
+            errores[activo] = e if isinstance(e, ValueError) else KeyError(f"sin cotización de {activo}")
+    if not precios:
+        raise SinCotizacion(errores)
+    return {'precios': precios, 'errores': errores, 'segundos': time.monotonic() - inicio}
@@ -0,0 +1,212 @@
+"""
+Logging estructurado del tracker de BTC DCA
+Consola sincrónica + archivo mensual escrito por un hilo en segundo plano (cola), con buffer,
+formato plano o JSON, niveles, rotación por tamaño y gzip de los meses anteriores
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+NOMBRE_LOGGER = "btc_dca"
+PREFIJO_ARCHIVO = "btc_tracker_"
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+MAX_BYTES = 5 * 1024 * 1024  # por archivo mensual antes de rotar a .log.1, .log.2, ...
+BACKUPS = 5
+
+# Prefijos de mensaje que ya usa el proyecto -> nivel de logging
+NIVELES_POR_PREFIJO = (("✗", logging.ERROR), ("⚠", logging.WARNING))
+
+_listener = None
+
+
+class FormatoPlano(logging.Formatter):
+    """'[YYYY-MM-DD HH:MM:SS] mensaje' (mismo formato que los logs históricos)"""
+
+    def __init__(self):
+        super().__init__("[%(asctime)s] %(message)s", FORMATO_FECHA)
+
+    def formatTime(self, record, datefmt=None):
+        # La fecha se formatea una sola vez por registro aunque lo escriban varios handlers
+        if not hasattr(record, 'fecha_texto'):
+            record.fecha_texto = time.strftime(FORMATO_FECHA, time.localtime(record.created))
+        return record.fecha_texto
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: ts, nivel, mensaje, pid y los campos de extra={'datos': {...}}"""
+
+    def format(self, record):
+        linea = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'mensaje': record.getMessage(),
+            'pid': record.process,
+        }
+        linea.update(getattr(record, 'datos', None) or {})
+        if record.exc_info:
+            linea['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(linea, ensure_ascii=False, default=str)
+
+
+class ArchivoMensual(logging.handlers.RotatingFileHandler):
+    """Archivo btc_tracker_YYYYMM.log abierto una sola vez, con buffer y rotación por tamaño
+
+    Al cambiar de mes (o al arrancar) comprime con gzip los archivos de meses anteriores.
+    Solo fuerza flush en registros de nivel >= nivel_flush o con la marca de vaciar(); el resto
+    se vuelca al cerrar.
+    """
+
+    def __init__(self, directorio, max_bytes=MAX_BYTES, backups=BACKUPS, nivel_flush=logging.ERROR):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.nivel_flush = nivel_flush
+        self._flush_pendiente = False
+        self._mes, self._proximo_mes = self._limites_mes(time.time())
+        super().__init__(self._archivo(self._mes), maxBytes=max_bytes, backupCount=backups,
+                         encoding='utf-8', delay=True)
+        self._bytes = self._tamano_actual()
+        comprimir_meses_anteriores(self.directorio, self._mes)
+
+    @staticmethod
+    def _limites_mes(ts):
+        inicio = datetime.fromtimestamp(ts).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        siguiente = inicio.replace(year=inicio.year + inicio.month // 12, month=inicio.month % 12 + 1)
+        return inicio.strftime('%Y%m'), siguiente.timestamp()
+
+    def _archivo(self, mes):
+        return str(self.directorio / f"{PREFIJO_ARCHIVO}{mes}.log")
+
+    def _tamano_actual(self):
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+
+    def shouldRollover(self, record):
+        # Contador propio: tell() sobre el stream vaciaría el buffer en cada mensaje
+        return self.maxBytes > 0 and self._bytes >= self.maxBytes
+
+    def doRollover(self):
+        super().doRollover()
+        self._bytes = 0
+
+    def emit(self, record):
+        if getattr(record, 'vaciar', False):
+            self._flush_pendiente = True
+            self.flush()
+            return
+        if record.created >= self._proximo_mes:
+            self.close()
+            self._mes, self._proximo_mes = self._limites_mes(record.created)
+            self.baseFilename = self._archivo(self._mes)
+            self._bytes = self._tamano_actual()
+            comprimir_meses_anteriores(self.directorio, self._mes)
+        self._flush_pendiente = record.levelno >= self.nivel_flush
+        super().emit(record)
+
+    def format(self, record):
+        texto = super().format(record)
+        self._bytes += len(texto.encode('utf-8')) + 1
+        return texto
+
+    def flush(self):
+        if self._flush_pendiente:
+            super().flush()
+            self._flush_pendiente = False
+
+
+class _Encolar(logging.handlers.QueueHandler):
+    """Encola el registro tal cual: el formateo y la escritura quedan para el hilo del listener"""
+
+    def prepare(self, record):
+        return record
+
+
+def comprimir_meses_anteriores(directorio, mes_actual):
+    """Comprime con gzip los logs (y sus rotaciones) de meses distintos al actual"""
+    for path in Path(directorio).glob(f"{PREFIJO_ARCHIVO}*.log*"):
+        if path.suffix == '.gz' or path.name.startswith(f"{PREFIJO_ARCHIVO}{mes_actual}."):
+            continue
+        with open(path, 'rb') as origen, gzip.open(f"{path}.gz", 'wb') as destino:
+            shutil.copyfileobj(origen, destino)
+        path.unlink()
+
+
+def configurar(directorio, formato='plain', nivel='INFO', max_bytes=MAX_BYTES, backups=BACKUPS):
+    """Configura el logger: consola sincrónica y archivo mensual detrás de una cola
+
+    El hilo del QueueListener hace toda la E/S del archivo; el proceso principal solo encola.
+    Idempotente: una segunda llamada reemplaza la configuración anterior.
+    """
+    global _listener
+    detener()
+
+    logger = logging.getLogger(NOMBRE_LOGGER)
+    logger.handlers.clear()
+    logger.setLevel(nivel.upper() if isinstance(nivel, str) else nivel)
+    logger.propagate = False
+
+    consola = logging.StreamHandler(sys.stdout)
+    consola.setFormatter(FormatoPlano())
+    logger.addHandler(consola)
+
+    archivo = ArchivoMensual(directorio, max_bytes=max_bytes, backups=backups)
+    archivo.setFormatter(FormatoJSON() if formato == 'json' else FormatoPlano())
+    cola = queue.SimpleQueue()
+    logger.addHandler(_Encolar(cola))
+    _listener = logging.handlers.QueueListener(cola, archivo)
+    _listener.start()
+    return logger
+
+
+def vaciar():
+    """Vuelca al archivo todo lo registrado hasta acá (procesos largos: el daemon, tras cada tick)
+
+    Viaja por la cola como un registro más, así el hilo del listener lo procesa después de los
+    mensajes que ya estaban encolados.
+    """
+    if _listener is not None:
+        _listener.queue.put_nowait(logging.makeLogRecord({'vaciar': True, 'levelno': logging.CRITICAL}))
+
+
+def detener():
+    """Vacía la cola, cierra el archivo (vuelca el buffer) y detiene el hilo del listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def registrar(logger, nivel, mensaje, **datos):
+    """Emite un mensaje sin la inspección de stack de logger.log (findCaller)
+
+    datos: campos extra que el formato JSON agrega a la línea.
+    """
+    if logger.isEnabledFor(nivel):
+        record = logger.makeRecord(logger.name, nivel, "", 0, mensaje, None, None)
+        record.datos = datos
+        logger.handle(record)
+
+
+def nivel_de_mensaje(mensaje):
+    """Infiere el nivel a partir de los prefijos ✗ / ⚠ que usan los mensajes del proyecto"""
+    for prefijo, nivel in NIVELES_POR_PREFIJO:
+        if mensaje.startswith(prefijo):
+            return nivel
+    return logging.INFO
+
+
+atexit.register(detener)
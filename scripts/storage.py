@@ -0,0 +1,1005 @@
+"""
+Almacenamiento del ledger de compras del tracker de BTC DCA
+Backends intercambiables: CSV (formato de importación/exportación), CSV particionado por mes,
+columnar binario, columnar de enteros (satoshis / micro-dólares) y SQLite
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+import escritura
+import intervalos
+
+# Orden de columnas del CSV de compras
+COLUMNAS = [
+    'fecha',
+    'precio_btc_usd',
+    'usd_invertidos',
+    'btc_comprados',
+    'btc_acumulado',
+    'valor_actual_usd',
+    'comision_usd',
+]
+
+# Tipos de cada columna en el almacenamiento columnar (little-endian, ancho fijo).
+# Ledgers con compras intradiarias guardan la fecha como TIPO_INSTANTE (segundos UTC)
+TIPOS_COLUMNAS = {
+    'fecha': '<M8[D]',
+    'precio_btc_usd': '<f8',
+    'usd_invertidos': '<f8',
+    'btc_comprados': '<f8',
+    'btc_acumulado': '<f8',
+    'valor_actual_usd': '<f8',
+    'comision_usd': '<f8',
+}
+TIPO_INSTANTE = '<M8[s]'
+
+# Ledger entero (backend 'satoshis'): columna pública -> (columna guardada como int64, unidades por unidad)
+SATOSHIS_POR_BTC = 100_000_000
+MICRO_USD = 1_000_000
+ESCALAS_ENTERAS = {
+    'precio_btc_usd': ('precio_micro_usd', MICRO_USD),
+    'usd_invertidos': ('usd_invertidos_micro', MICRO_USD),
+    'btc_comprados': ('sats_comprados', SATOSHIS_POR_BTC),
+    'btc_acumulado': ('sats_acumulado', SATOSHIS_POR_BTC),
+    'valor_actual_usd': ('valor_micro_usd', MICRO_USD),
+    'comision_usd': ('comision_micro_usd', MICRO_USD),
+}
+
+# Tamaño del bloque leído desde el final del archivo
+TAMANO_BLOQUE = 4096
+
+# Filas por lote al recorrer el ledger en streaming (Storage.lotes)
+TAMANO_LOTE = 100_000
+
+
+def _parsear_fecha(valor):
+    """Convierte la clave del CSV a date ('YYYY-MM-DD', con o sin hora) o a datetime UTC (sufijo Z)"""
+    return intervalos.parsear(valor)
+
+
+def _formatear_valor(valor):
+    """Formatea un valor igual que pandas.to_csv (repr para floats, ISO para fechas, Z para instantes)"""
+    if isinstance(valor, date):
+        return intervalos.formatear(valor)
+    if isinstance(valor, float):
+        return repr(valor)
+    return str(valor)
+
+
+def leer_cabecera(path):
+    """Lee solo la primera línea del CSV y devuelve la lista de columnas"""
+    with open(path, 'rb') as f:
+        return f.readline().decode('utf-8').strip().split(',')
+
+
+def _ultima_linea(f, tamano_bloque=TAMANO_BLOQUE):
+    """(offset donde empieza, bytes) de la última línea no vacía, recorriendo bloques desde el final"""
+    f.seek(0, os.SEEK_END)
+    posicion = f.tell()
+    datos = b''
+    while posicion > 0:
+        leer = min(tamano_bloque, posicion)
+        posicion -= leer
+        f.seek(posicion)
+        datos = f.read(leer) + datos
+        # Con un salto de línea antes del último registro ya alcanza
+        if b'\n' in datos.rstrip(b'\r\n'):
+            break
+    datos = datos.rstrip(b'\r\n')
+    corte = datos.rfind(b'\n') + 1
+    return posicion + corte, datos[corte:]
+
+
+def leer_ultima_linea(path, tamano_bloque=TAMANO_BLOQUE):
+    """Lee la última línea no vacía del archivo recorriendo bloques desde el final"""
+    with open(path, 'rb') as f:
+        return _ultima_linea(f, tamano_bloque)[1].decode('utf-8').strip()
+
+
+def leer_ultimo_registro(path):
+    """Devuelve el último registro del CSV como dict (None si no hay registros)"""
+    columnas = leer_cabecera(path)
+    ultima = leer_ultima_linea(path)
+    if not ultima or ultima.split(',') == columnas:
+        return None
+
+    registro = {}
+    for columna, valor in zip(columnas, ultima.split(',')):
+        registro[columna] = _parsear_fecha(valor) if columna == 'fecha' else float(valor)
+    return registro
+
+
+def agregar_registro(path, registro, columnas=None):
+    """Agrega un registro al final del CSV sin reescribir el archivo (O(1))"""
+    path = str(path)
+    nuevo = not os.path.exists(path) or os.path.getsize(path) == 0
+    if columnas is None:
+        columnas = COLUMNAS if nuevo else leer_cabecera(path)
+
+    with open(path, 'ab+') as f:
+        if nuevo:
+            f.write((','.join(columnas) + '\n').encode('utf-8'))
+        else:
+            # Asegurar que el archivo termine en salto de línea antes de agregar
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        linea = ','.join(_formatear_valor(registro.get(c, '')) for c in columnas)
+        f.write((linea + '\n').encode('utf-8'))
+        # La fila queda en disco antes de actualizar métricas o manifiesto
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def reemplazar_ultimo_registro(path, registro, columnas=None):
+    """Reescribe solo la última fila del CSV (trunca desde donde empieza y la vuelve a escribir, O(1))"""
+    columnas = columnas or leer_cabecera(path)
+    with open(path, 'r+b') as f:
+        inicio, _ = _ultima_linea(f)
+        if inicio == 0:
+            raise ValueError(f"{path} no tiene registros para reemplazar")
+        f.truncate(inicio)
+        f.seek(inicio)
+        linea = ','.join(_formatear_valor(registro.get(c, '')) for c in columnas)
+        f.write((linea + '\n').encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _convertir_columna(valores):
+    """Convierte los textos de una columna numérica como pandas: int si todos lo son, si no float"""
+    try:
+        return [int(v) for v in valores]
+    except ValueError:
+        return [float(v) if v else float('nan') for v in valores]
+
+
+def leer_columnas_csv(path, columnas=None):
+    """Lee columnas del CSV como listas de Python sin pandas (fechas como date)"""
+    import csv
+
+    with open(path, newline='', encoding='utf-8') as f:
+        lector = csv.reader(f)
+        cabecera = next(lector, [])
+        filas = [fila for fila in lector if fila]
+    columnas = columnas or cabecera
+    resultado = {}
+    for columna in columnas:
+        i = cabecera.index(columna)
+        valores = [fila[i] for fila in filas]
+        resultado[columna] = [_parsear_fecha(v) for v in valores] if columna == 'fecha' else _convertir_columna(valores)
+    return resultado
+
+
+def tiene_instantes(columna):
+    """Indica si alguna clave leída como texto es un instante (sufijo Z): el ledger tuvo compras intradiarias"""
+    # Un join y una búsqueda de subcadena: 4 veces más rápido que .str.endswith sobre la columna
+    return 'Z' in ''.join(columna.astype(str).tolist())
+
+
+def csv_tiene_instantes(path, tamano_bloque=1 << 20):
+    """Como tiene_instantes, pero sobre los bytes del CSV sin parsearlo (~10 ms por millón de filas)
+
+    Ni la cabecera ni los números tienen una Z: si aparece, es el sufijo de una clave intradiaria.
+    """
+    with open(path, 'rb') as f:
+        return any(b'Z' in bloque for bloque in iter(lambda: f.read(tamano_bloque), b''))
+
+
+def normalizar_fechas(columna):
+    """Claves leídas como texto -> date (ledger diario) o datetime64 UTC sin zona (claves con sufijo Z)
+
+    Basta una clave con sufijo Z: un ledger que volvió de compras intradiarias a diarias tiene
+    instantes en el medio y fechas al final (format='mixed' fallaría por mezclar zonas).
+    """
+    import pandas as pd
+
+    if len(columna) and (str(columna.iloc[-1]).endswith('Z') or tiene_instantes(columna)):
+        return pd.to_datetime(columna, format='ISO8601', utc=True).dt.tz_localize(None)
+    return pd.to_datetime(columna, format='mixed').dt.date
+
+
+def fechas_numpy(columna, unidad=None):
+    """Claves leídas como texto -> datetime64[D] (ledger diario) o datetime64[s] (instantes)
+
+    Quien recorre el ledger por lotes fija `unidad` para todo el archivo: si la decidiera cada lote,
+    un ledger mixto daría lotes diarios en [D] y lotes intradiarios en [s].
+    """
+    fechas = normalizar_fechas(columna)
+    if fechas.dtype.kind == 'M':
+        return fechas.to_numpy().astype(f"datetime64[{unidad or 's'}]")
+    import pandas as pd
+
+    return pd.to_datetime(fechas).to_numpy().astype(f"datetime64[{unidad or 'D'}]")
+
+
+def es_intradia(fechas):
+    """Indica si una columna de fechas (pandas) tiene claves con hora, es decir, compras intradiarias"""
+    return fechas.dtype.kind == 'M' and bool((fechas != fechas.dt.normalize()).any())
+
+
+def claves_texto(fechas):
+    """Claves de una columna de fechas (pandas) como texto: 'YYYY-MM-DD' o instantes con sufijo Z"""
+    import pandas as pd
+
+    if es_intradia(fechas):
+        return fechas.dt.strftime(intervalos.FORMATO_INSTANTE)
+    return pd.to_datetime(fechas).dt.strftime('%Y-%m-%d')
+
+
+def escribir_csv(df, f):
+    """to_csv del ledger: las claves intradiarias se escriben con sufijo Z (las diarias, sin cambios)"""
+    if es_intradia(df['fecha']):
+        df = df.assign(fecha=claves_texto(df['fecha']))
+    df.to_csv(f, index=False)
+
+
+def cargar_csv(path):
+    """Lee el CSV completo normalizando fechas (solo lectura, sin reescribir)"""
+    import pandas as pd
+
+    # round_trip: el parser por defecto de pandas cambia el último dígito de algunos floats y,
+    # al reescribir (importación, particiones), esa diferencia quedaría guardada
+    df = pd.read_csv(path, float_precision='round_trip')
+    df['fecha'] = normalizar_fechas(df['fecha'])
+    return df
+
+
+def pd_fecha(valor):
+    """Normaliza un valor de fecha (date, Timestamp o datetime64) a date, o a datetime si tiene hora"""
+    import pandas as pd
+
+    valor = pd.Timestamp(valor)
+    return valor.to_pydatetime() if valor != valor.normalize() else valor.date()
+
+
+def tipo_fecha(clave):
+    """dtype de la columna fecha en el almacenamiento columnar según la clave (día o instante)"""
+    return TIPO_INSTANTE if isinstance(clave, datetime) else TIPOS_COLUMNAS['fecha']
+
+
+def filtrar_rango(df, desde=None, hasta=None):
+    """Filas de df entre desde y hasta inclusive; un `hasta` de tipo date abarca el día entero"""
+    import pandas as pd
+
+    fechas = pd.to_datetime(df['fecha'])
+    dentro = pd.Series(True, index=df.index)
+    if desde is not None:
+        dentro &= fechas >= pd.Timestamp(desde)
+    if hasta is not None:
+        if isinstance(hasta, datetime):
+            dentro &= fechas <= pd.Timestamp(hasta)
+        else:
+            dentro &= fechas < pd.Timestamp(intervalos.fin_del_dia(hasta))
+    return df[dentro].reset_index(drop=True)
+
+
+class RegistroDuplicado(ValueError):
+    """Ya existe un registro para esa fecha en el ledger"""
+
+
+class Storage:
+    """Interfaz común de los backends del ledger"""
+
+    nombre = None
+
+    def cabecera(self):
+        """Columnas guardadas, leyendo solo metadatos (el esquema de migraciones.py sale de acá)
+
+        Los backends que siempre escriben el esquema completo (SQLite, satoshis) no tienen otra versión.
+        """
+        return list(COLUMNAS)
+
+    def existe_fecha(self, fecha):
+        """Indica si ya hay un registro para la fecha (el ledger se escribe en orden cronológico)"""
+        ultimo = self.ultimo_registro()
+        return ultimo is not None and intervalos.como_instante(ultimo['fecha']) >= intervalos.como_instante(fecha)
+
+    def validar_insercion(self, fecha):
+        """Rechaza fechas repetidas o anteriores al último registro: el ledger queda ordenado y sin duplicados
+
+        Las claves diarias se comparan como su medianoche, así un ledger diario puede seguir con instantes.
+        """
+        ultimo = self.ultimo_registro()
+        previa, nueva = intervalos.como_instante(ultimo['fecha']) if ultimo else None, intervalos.como_instante(fecha)
+        if ultimo is None or previa < nueva:
+            return
+        if previa == nueva:
+            raise RegistroDuplicado(f"Ya existe un registro para {fecha}")
+        raise RegistroDuplicado(f"{fecha} es anterior al último registro del ledger ({ultimo['fecha']})")
+
+    def leer_columnas(self, columnas=COLUMNAS):
+        """Devuelve dict columna -> lista de valores de Python (los backends evitan pandas)"""
+        df = self.cargar()
+        return {c: [pd_fecha(v) for v in df[c]] if c == 'fecha' else df[c].tolist() for c in columnas}
+
+    def lotes(self, tamano=TAMANO_LOTE, columnas=COLUMNAS):
+        """Recorre el ledger en lotes de hasta `tamano` filas: dict columna -> array numpy
+
+        Las fechas llegan como datetime64[D] (o [s] en ledgers intradiarios). Los backends leen cada
+        lote del disco; esta versión genérica carga el ledger completo y solo lo corta (no acota la memoria).
+        """
+        import pandas as pd
+
+        df = self.cargar()
+        unidad = 's' if es_intradia(pd.to_datetime(df['fecha'])) else 'D'
+        for inicio in range(0, len(df), tamano):
+            parte = df.iloc[inicio:inicio + tamano]
+            yield {
+                c: pd.to_datetime(parte[c]).to_numpy().astype(f'datetime64[{unidad}]') if c == 'fecha'
+                else parte[c].to_numpy()
+                for c in columnas
+            }
+
+    def rango(self, desde=None, hasta=None):
+        """Devuelve los registros entre desde y hasta (inclusive)"""
+        return filtrar_rango(self.cargar(), desde, hasta)
+
+    def agregados(self, desde=None, hasta=None):
+        """Calcula totales del rango (los backends con motor de consultas lo resuelven sin cargar filas)"""
+        df = self.rango(desde, hasta)
+        vacio = df.empty
+        return {
+            'dias': len(df),
+            'primera_fecha': None if vacio else str(pd_fecha(df['fecha'].iloc[0])),
+            'ultima_fecha': None if vacio else str(pd_fecha(df['fecha'].iloc[-1])),
+            'usd_invertidos': float(df['usd_invertidos'].sum()),
+            'comision_usd': float(df['comision_usd'].sum()),
+            'btc_comprados': float(df['btc_comprados'].sum()),
+            'precio_min': None if vacio else float(df['precio_btc_usd'].min()),
+            'precio_max': None if vacio else float(df['precio_btc_usd'].max()),
+            'precio_promedio': None if vacio else float(df['precio_btc_usd'].mean()),
+        }
+
+
+class CSVStorage(Storage):
+    """Ledger en un único CSV de texto (compatible con Excel/Numbers)"""
+
+    nombre = 'csv'
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def existe(self):
+        return self.path.exists()
+
+    def cabecera(self):
+        return leer_cabecera(self.path)
+
+    def cargar(self):
+        return cargar_csv(self.path)
+
+    def leer_columnas(self, columnas=COLUMNAS):
+        return leer_columnas_csv(self.path, columnas)
+
+    def ultimo_registro(self):
+        return leer_ultimo_registro(self.path) if self.existe() else None
+
+    def lotes(self, tamano=TAMANO_LOTE, columnas=COLUMNAS):
+        """read_csv por chunks: en memoria solo hay un lote a la vez"""
+        import pandas as pd
+
+        unidad = 's' if csv_tiene_instantes(self.path) else 'D'
+        # round_trip: mismos floats que float() de Python (leer_columnas_csv), sin diferencias de último dígito
+        with pd.read_csv(self.path, usecols=columnas, chunksize=tamano, float_precision='round_trip') as lector:
+            for parte in lector:
+                lote = {c: parte[c].to_numpy() for c in columnas}
+                lote['fecha'] = fechas_numpy(parte['fecha'], unidad)
+                yield lote
+
+    def agregar(self, registro):
+        self.validar_insercion(registro['fecha'])
+        agregar_registro(self.path, registro)
+
+    def guardar(self, df):
+        with escritura.reemplazar(self.path) as f:
+            escribir_csv(df, f)
+
+
+class ColumnarStorage(Storage):
+    """Ledger columnar binario: un archivo .bin de ancho fijo por columna, leído con memmap"""
+
+    nombre = 'columnar'
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self.schema_file = self.directorio / 'schema.json'
+
+    def existe(self):
+        return self.schema_file.exists()
+
+    def _leer_schema(self):
+        with open(self.schema_file, encoding='utf-8') as f:
+            return json.load(f)['columnas']
+
+    def _escribir_schema(self, columnas, fecha=TIPOS_COLUMNAS['fecha']):
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        tipos = {**TIPOS_COLUMNAS, 'fecha': fecha}
+        schema = {
+            'version': 1,
+            'columnas': [{'nombre': c, 'dtype': tipos.get(c, '<f8')} for c in columnas],
+        }
+        with escritura.reemplazar(self.schema_file) as f:
+            json.dump(schema, f, indent=2)
+
+    def cabecera(self):
+        return [c['nombre'] for c in self._leer_schema()]
+
+    def _tipo_fecha(self):
+        return next(c['dtype'] for c in self._leer_schema() if c['nombre'] == 'fecha')
+
+    def _pasar_a_instantes(self):
+        """Convierte la columna fecha de días a segundos (primera compra intradiaria de un ledger diario)
+
+        Mismo ancho (8 bytes): primero se reescribe el .bin y después el schema que lo describe.
+        """
+        import numpy as np
+
+        fechas = np.asarray(self.columnas()['fecha']).astype(TIPO_INSTANTE)
+        with escritura.reemplazar(self._archivo('fecha'), binario=True) as f:
+            fechas.tofile(f)
+        self._escribir_schema([c['nombre'] for c in self._leer_schema()], TIPO_INSTANTE)
+
+    def _archivo(self, columna):
+        return self.directorio / f"{columna}.bin"
+
+    def filas(self):
+        """Cantidad de filas completas (tolera un append interrumpido a mitad de columnas)"""
+        import numpy as np
+
+        if not self.existe():
+            return 0
+        filas = [
+            self._archivo(c['nombre']).stat().st_size // np.dtype(c['dtype']).itemsize
+            if self._archivo(c['nombre']).exists() else 0
+            for c in self._leer_schema()
+        ]
+        return min(filas) if filas else 0
+
+    def columnas(self):
+        """Devuelve dict columna -> array memory-mapped de solo lectura (zero-copy)"""
+        import numpy as np
+
+        n = self.filas()
+        arrays = {}
+        for c in self._leer_schema():
+            dtype = np.dtype(c['dtype'])
+            if n == 0:
+                arrays[c['nombre']] = np.empty(0, dtype=dtype)
+            else:
+                arrays[c['nombre']] = np.memmap(self._archivo(c['nombre']), dtype=dtype, mode='r', shape=(n,))
+        return arrays
+
+    def cargar(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.columnas(), copy=False)
+
+    def leer_columnas(self, columnas=COLUMNAS):
+        arrays = self.columnas()
+        return {c: arrays[c].tolist() for c in columnas}
+
+    def lotes(self, tamano=TAMANO_LOTE, columnas=COLUMNAS):
+        """Slices de los memmaps: cada lote se lee del disco recién al usarlo"""
+        arrays = self.columnas()
+        for inicio in range(0, self.filas(), tamano):
+            yield {c: arrays[c][inicio:inicio + tamano] for c in columnas}
+
+    def ultimo_registro(self):
+        n = self.filas()
+        if n == 0:
+            return None
+
+        registro = {}
+        for columna, array in self.columnas().items():
+            valor = array[n - 1]
+            registro[columna] = valor.item() if columna == 'fecha' else float(valor)
+        return registro
+
+    def existe_fecha(self, fecha):
+        """Búsqueda binaria sobre la columna de fechas (ordenada por invariante)"""
+        import indice
+
+        return self.existe() and indice.contiene(self.columnas()['fecha'], fecha)
+
+    def rango(self, desde=None, hasta=None):
+        """Registros entre desde y hasta: búsqueda binaria de los extremos y slice de los memmaps"""
+        import indice
+        import pandas as pd
+
+        columnas = self.columnas()
+        filas = indice.rango(columnas['fecha'], desde, hasta)
+        return pd.DataFrame({c: valores[filas] for c, valores in columnas.items()})
+
+    def agregar(self, registro):
+        import numpy as np
+
+        if not self.existe():
+            self._escribir_schema(COLUMNAS, tipo_fecha(registro['fecha']))
+        else:
+            self.validar_insercion(registro['fecha'])
+            if tipo_fecha(registro['fecha']) == TIPO_INSTANTE and self._tipo_fecha() != TIPO_INSTANTE:
+                self._pasar_a_instantes()
+        n = self.filas()
+        for c in self._leer_schema():
+            valor = registro.get(c['nombre'])
+            if c['nombre'] == 'fecha':
+                valor = np.datetime64(valor, np.datetime_data(np.dtype(c['dtype']))[0])
+            datos = np.array([valor], dtype=c['dtype']).tobytes()
+            with open(self._archivo(c['nombre']), 'r+b' if self._archivo(c['nombre']).exists() else 'wb') as f:
+                # Descartar cualquier resto de un append interrumpido antes de escribir
+                f.truncate(n * len(datos))
+                f.seek(n * len(datos))
+                f.write(datos)
+
+    def guardar(self, df):
+        import numpy as np
+        import pandas as pd
+
+        columnas = [c for c in COLUMNAS if c in df.columns] + [c for c in df.columns if c not in COLUMNAS]
+        self._escribir_schema(columnas, TIPO_INSTANTE if es_intradia(pd.to_datetime(df['fecha'])) else TIPOS_COLUMNAS['fecha'])
+        for c in self._leer_schema():
+            if c['nombre'] == 'fecha':
+                datos = pd.to_datetime(df['fecha']).to_numpy().astype(c['dtype'])
+            else:
+                datos = np.ascontiguousarray(df[c['nombre']].to_numpy(), dtype=c['dtype'])
+            with escritura.reemplazar(self._archivo(c['nombre']), binario=True) as f:
+                datos.tofile(f)
+
+
+class SatoshiStorage(ColumnarStorage):
+    """Ledger columnar de enteros: satoshis y micro-dólares en int64 (aritmética exacta)
+
+    Los acumulados son sumas enteras de satoshis, sin deriva por sumar floats durante años.
+    Hacia afuera expone el mismo esquema que los demás backends (BTC y USD como float).
+    """
+
+    nombre = 'satoshis'
+
+    def _escribir_schema(self, columnas=None, fecha=TIPOS_COLUMNAS['fecha']):
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        schema = {
+            'version': 1,
+            'columnas': [{'nombre': 'fecha', 'dtype': fecha}] + [
+                {'nombre': guardada, 'dtype': '<i8', 'escala': escala}
+                for guardada, escala in ESCALAS_ENTERAS.values()
+            ],
+        }
+        with escritura.reemplazar(self.schema_file) as f:
+            json.dump(schema, f, indent=2)
+
+    def cabecera(self):
+        return list(COLUMNAS)
+
+    def columnas_enteras(self):
+        """Columnas tal como están guardadas (int64 memory-mapped, sin conversión)"""
+        return super().columnas()
+
+    def columnas(self):
+        """Columnas en el esquema público: satoshis y micro-dólares convertidos a BTC y USD"""
+        enteras = self.columnas_enteras()
+        resultado = {'fecha': enteras['fecha']}
+        for publica, (guardada, escala) in ESCALAS_ENTERAS.items():
+            resultado[publica] = enteras[guardada] / escala
+        return resultado
+
+    def lotes(self, tamano=TAMANO_LOTE, columnas=COLUMNAS):
+        """Convierte a BTC / USD lote a lote (columnas() convertiría el ledger entero de una vez)"""
+        enteras = self.columnas_enteras()
+        for inicio in range(0, self.filas(), tamano):
+            fin = inicio + tamano
+            lote = {'fecha': enteras['fecha'][inicio:fin]}
+            for publica, (guardada, escala) in ESCALAS_ENTERAS.items():
+                if publica in columnas:
+                    lote[publica] = enteras[guardada][inicio:fin] / escala
+            yield {c: lote[c] for c in columnas}
+
+    def ultimo_registro(self):
+        n = self.filas()
+        if n == 0:
+            return None
+        enteras = self.columnas_enteras()
+        registro = {'fecha': enteras['fecha'][n - 1].item()}
+        for publica, (guardada, escala) in ESCALAS_ENTERAS.items():
+            registro[publica] = int(enteras[guardada][n - 1]) / escala
+        return registro
+
+    def agregar(self, registro):
+        """Agrega la compra redondeada al satoshi / micro-dólar y suma el acumulado en enteros
+
+        registro se actualiza con los valores exactos guardados (para las métricas incrementales).
+        """
+        n = self.filas() if self.existe() else 0
+        if not self.existe():
+            self._escribir_schema(fecha=tipo_fecha(registro['fecha']))
+
+        sats = round(registro['btc_comprados'] * SATOSHIS_POR_BTC)
+        if n == 0:
+            acumulado = round(registro['btc_acumulado'] * SATOSHIS_POR_BTC)
+        else:
+            acumulado = int(self.columnas_enteras()['sats_acumulado'][n - 1]) + sats
+        precio = round(registro['precio_btc_usd'] * MICRO_USD)
+        enteros = {
+            'fecha': registro['fecha'],
+            'precio_micro_usd': precio,
+            'usd_invertidos_micro': round(registro['usd_invertidos'] * MICRO_USD),
+            'sats_comprados': sats,
+            'sats_acumulado': acumulado,
+            # Enteros de Python: sats × micro-dólares no desborda (en int64 sí, a partir de ~1 BTC)
+            'valor_micro_usd': (acumulado * precio + SATOSHIS_POR_BTC // 2) // SATOSHIS_POR_BTC,
+            'comision_micro_usd': round(registro['comision_usd'] * MICRO_USD),
+        }
+        super().agregar(enteros)
+        for publica, (guardada, escala) in ESCALAS_ENTERAS.items():
+            registro[publica] = enteros[guardada] / escala
+
+    def guardar(self, df):
+        """Reemplaza el ledger: redondea cada compra al satoshi y recalcula el acumulado con cumsum entero"""
+        import numpy as np
+        import pandas as pd
+
+        def enteros(columna, escala):
+            return np.rint(df[columna].to_numpy(dtype='float64') * escala).astype('<i8')
+
+        fechas = pd.to_datetime(df['fecha'])
+        tipo = TIPO_INSTANTE if es_intradia(fechas) else TIPOS_COLUMNAS['fecha']
+        self._escribir_schema(fecha=tipo)
+        sats = enteros('btc_comprados', SATOSHIS_POR_BTC)
+        # El primer acumulado conserva un saldo inicial si el ledger no arrancó en cero
+        inicial = int(enteros('btc_acumulado', SATOSHIS_POR_BTC)[0]) - int(sats[0]) if len(df) else 0
+        acumulado = inicial + np.cumsum(sats, dtype='<i8')
+        precio = enteros('precio_btc_usd', MICRO_USD)
+        datos = {
+            'fecha': fechas.to_numpy().astype(tipo),
+            'precio_micro_usd': precio,
+            'usd_invertidos_micro': enteros('usd_invertidos', MICRO_USD),
+            'sats_comprados': sats,
+            'sats_acumulado': acumulado,
+            # Valor de mercado (derivado, no acumulado): float64 redondeado al micro-dólar evita el desborde
+            'valor_micro_usd': np.rint(acumulado * (precio / SATOSHIS_POR_BTC)).astype('<i8'),
+            'comision_micro_usd': enteros('comision_usd', MICRO_USD),
+        }
+        for nombre, valores in datos.items():
+            with escritura.reemplazar(self._archivo(nombre), binario=True) as f:
+                np.ascontiguousarray(valores).tofile(f)
+
+
+class PartitionedStorage(Storage):
+    """Ledger CSV particionado por mes (AAAA/MM.csv) con un manifiesto de particiones
+
+    La compra del día solo toca el CSV del mes en curso y el manifiesto: el commit diario cambia
+    dos archivos chicos en lugar del historial entero, y un rango de fechas abre solo sus meses.
+    """
+
+    nombre = 'particionado'
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+        self.manifiesto_file = self.directorio / 'manifest.json'
+
+    def existe(self):
+        return self.manifiesto_file.exists()
+
+    def particiones(self):
+        """Entradas del manifiesto en orden: mes, archivo, filas, fechas extremas y acumulados al cierre"""
+        if not self.existe():
+            return []
+        with open(self.manifiesto_file, encoding='utf-8') as f:
+            return json.load(f)['particiones']
+
+    def cabecera(self):
+        """Cabecera del mes más viejo: una migración reescribe todos los meses antes que el manifiesto"""
+        particiones = self.particiones()
+        return leer_cabecera(self.directorio / particiones[0]['archivo']) if particiones else list(COLUMNAS)
+
+    def _escribir_manifiesto(self, particiones):
+        with escritura.reemplazar(self.manifiesto_file) as f:
+            json.dump({'version': 1, 'columnas': COLUMNAS, 'particiones': particiones}, f, indent=2)
+            f.write('\n')
+
+    def recalcular_manifiesto(self):
+        """Recalcula los montos acumulados de cada entrada leyendo su mes (tras reescribir las particiones)"""
+        particiones, usd, comision = [], 0.0, 0.0
+        for p in self.particiones():
+            columnas = leer_columnas_csv(self.directorio / p['archivo'], ['usd_invertidos', 'comision_usd'])
+            usd += sum(columnas['usd_invertidos'])
+            comision += sum(columnas['comision_usd'])
+            particiones.append({**p, 'usd_invertidos_acumulado': usd, 'comision_acumulada': comision})
+        self._escribir_manifiesto(particiones)
+
+    def _archivo(self, mes):
+        anio, numero = mes.split('-')
+        return self.directorio / anio / f"{numero}.csv"
+
+    def _nueva_particion(self, mes, previa):
+        """Entrada vacía de un mes; los acumulados arrancan desde el cierre de la partición anterior"""
+        return {
+            'mes': mes,
+            'archivo': self._archivo(mes).relative_to(self.directorio).as_posix(),
+            'filas': 0,
+            'desde': None,
+            'hasta': None,
+            'btc_acumulado': previa['btc_acumulado'] if previa else 0.0,
+            'valor_actual_usd': previa['valor_actual_usd'] if previa else 0.0,
+            'usd_invertidos_acumulado': previa['usd_invertidos_acumulado'] if previa else 0.0,
+            'comision_acumulada': previa['comision_acumulada'] if previa else 0.0,
+        }
+
+    def _elegir(self, desde=None, hasta=None):
+        """Particiones que se solapan con el rango (el resto ni se abre)
+
+        Se compara por día (los primeros 10 caracteres): rango() filtra después las horas exactas.
+        """
+        desde = desde and intervalos.dia(desde).isoformat()
+        hasta = hasta and intervalos.dia(hasta).isoformat()
+        return [
+            p for p in self.particiones()
+            if (desde is None or p['hasta'][:10] >= desde) and (hasta is None or p['desde'][:10] <= hasta)
+        ]
+
+    def _concatenar(self, particiones):
+        import pandas as pd
+
+        if not particiones:
+            return pd.DataFrame(columns=COLUMNAS)
+        return pd.concat([cargar_csv(self.directorio / p['archivo']) for p in particiones], ignore_index=True)
+
+    def cargar(self):
+        return self._concatenar(self.particiones())
+
+    def leer_columnas(self, columnas=COLUMNAS):
+        resultado = {c: [] for c in columnas}
+        for p in self.particiones():
+            for c, valores in leer_columnas_csv(self.directorio / p['archivo'], columnas).items():
+                resultado[c].extend(valores)
+        return resultado
+
+    def lotes(self, tamano=TAMANO_LOTE, columnas=COLUMNAS):
+        """Junta meses consecutivos hasta completar un lote (un mes suelto sería un lote demasiado chico)"""
+        import numpy as np
+
+        pendientes, filas = [], 0
+        for p in self.particiones():
+            for lote in CSVStorage(self.directorio / p['archivo']).lotes(tamano, columnas):
+                pendientes.append(lote)
+                filas += len(lote['fecha'])
+                if filas >= tamano:
+                    yield {c: np.concatenate([l[c] for l in pendientes]) for c in columnas}
+                    pendientes, filas = [], 0
+        if pendientes:
+            yield {c: np.concatenate([l[c] for l in pendientes]) for c in columnas}
+
+    def ultimo_registro(self):
+        particiones = self.particiones()
+        return leer_ultimo_registro(self.directorio / particiones[-1]['archivo']) if particiones else None
+
+    def agregar(self, registro):
+        """Agrega la fila al CSV de su mes y actualiza solo la entrada de ese mes en el manifiesto"""
+        self.validar_insercion(registro['fecha'])
+        particiones = self.particiones()
+        mes = registro['fecha'].strftime('%Y-%m')
+        archivo = self._archivo(mes)
+        archivo.parent.mkdir(parents=True, exist_ok=True)
+        agregar_registro(archivo, registro)
+
+        if not particiones or particiones[-1]['mes'] != mes:
+            particiones.append(self._nueva_particion(mes, particiones[-1] if particiones else None))
+        entrada = particiones[-1]
+        fecha = intervalos.formatear(registro['fecha'])
+        entrada['filas'] += 1
+        entrada['desde'] = entrada['desde'] or fecha
+        entrada['hasta'] = fecha
+        entrada['btc_acumulado'] = float(registro['btc_acumulado'])
+        entrada['valor_actual_usd'] = float(registro['valor_actual_usd'])
+        entrada['usd_invertidos_acumulado'] += float(registro['usd_invertidos'])
+        entrada['comision_acumulada'] += float(registro.get('comision_usd') or 0.0)
+        self._escribir_manifiesto(particiones)
+
+    def guardar(self, df):
+        """Reescribe todas las particiones y el manifiesto (importación, backfill)"""
+        import pandas as pd
+
+        fechas = pd.to_datetime(df['fecha'])
+        claves = claves_texto(fechas)
+        if es_intradia(fechas):
+            df = df.assign(fecha=claves)  # sufijo Z en todos los meses, también en los que caen a medianoche
+        particiones, vigentes = [], set()
+        for mes, parte in df.groupby(fechas.dt.strftime('%Y-%m'), sort=True):
+            archivo = self._archivo(mes)
+            with escritura.reemplazar(archivo) as f:
+                parte.to_csv(f, index=False)
+            vigentes.add(archivo)
+
+            entrada = self._nueva_particion(mes, particiones[-1] if particiones else None)
+            ultima = parte.iloc[-1]
+            entrada.update({
+                'filas': len(parte),
+                'desde': claves[parte.index[0]],
+                'hasta': claves[parte.index[-1]],
+                'btc_acumulado': float(ultima['btc_acumulado']),
+                'valor_actual_usd': float(ultima['valor_actual_usd']),
+            })
+            entrada['usd_invertidos_acumulado'] += float(parte['usd_invertidos'].sum())
+            entrada['comision_acumulada'] += float(parte['comision_usd'].sum()) if 'comision_usd' in parte else 0.0
+            particiones.append(entrada)
+
+        # Meses que ya no tienen registros
+        for viejo in self.directorio.glob('[0-9]*/[0-9]*.csv'):
+            if viejo not in vigentes:
+                viejo.unlink()
+        self._escribir_manifiesto(particiones)
+
+    def rango(self, desde=None, hasta=None):
+        """Registros entre desde y hasta leyendo solo las particiones del rango"""
+        return filtrar_rango(self._concatenar(self._elegir(desde, hasta)), desde, hasta)
+
+
+class SQLiteStorage(Storage):
+    """Ledger en SQLite (modo WAL) con índice único por fecha"""
+
+    nombre = 'sqlite'
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._conexion = None
+
+    def existe(self):
+        return self.path.exists()
+
+    def conexion(self):
+        """Abre (una sola vez) la conexión y crea tabla e índice si no existen"""
+        if self._conexion is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conexion = sqlite3.connect(self.path)
+            self._conexion.row_factory = sqlite3.Row
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+            columnas = ', '.join(f"{c} REAL" for c in COLUMNAS[1:])
+            self._conexion.execute(f"CREATE TABLE IF NOT EXISTS compras (fecha TEXT NOT NULL, {columnas})")
+            self._conexion.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_compras_fecha ON compras (fecha)")
+            self._conexion.commit()
+        return self._conexion
+
+    def cerrar(self):
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+
+    @staticmethod
+    def _a_registro(fila):
+        registro = dict(fila)
+        registro['fecha'] = intervalos.parsear(registro['fecha'])
+        return registro
+
+    def existe_fecha(self, fecha):
+        fila = self.conexion().execute(
+            "SELECT 1 FROM compras WHERE fecha = ? LIMIT 1", (intervalos.formatear(fecha),)
+        ).fetchone()
+        return fila is not None
+
+    def ultimo_registro(self):
+        if not self.existe():
+            return None
+        fila = self.conexion().execute("SELECT * FROM compras ORDER BY fecha DESC LIMIT 1").fetchone()
+        return self._a_registro(fila) if fila is not None else None
+
+    def agregar(self, registro):
+        # El índice único solo frena repetidas; validar_insercion también rechaza fechas fuera de orden
+        self.validar_insercion(registro['fecha'])
+        valores = [intervalos.formatear(registro['fecha'])] + [registro.get(c) for c in COLUMNAS[1:]]
+        marcadores = ', '.join('?' * len(COLUMNAS))
+        try:
+            with self.conexion() as conexion:
+                conexion.execute(f"INSERT INTO compras ({', '.join(COLUMNAS)}) VALUES ({marcadores})", valores)
+        except sqlite3.IntegrityError:
+            raise RegistroDuplicado(f"Ya existe un registro para {registro['fecha']}")
+
+    def guardar(self, df):
+        # Reemplaza todo el ledger; el índice único descarta fechas repetidas (se conserva la primera)
+        filas = [
+            [fecha] + [float(v) for v in valores]
+            for fecha, *valores in df[COLUMNAS].assign(fecha=claves_texto(df['fecha'])).itertuples(index=False, name=None)
+        ]
+        marcadores = ', '.join('?' * len(COLUMNAS))
+        with self.conexion() as conexion:
+            conexion.execute("DELETE FROM compras")
+            conexion.executemany(
+                f"INSERT OR IGNORE INTO compras ({', '.join(COLUMNAS)}) VALUES ({marcadores})", filas
+            )
+
+    def rango(self, desde=None, hasta=None):
+        """Devuelve los registros entre desde y hasta usando el índice de fecha"""
+        import pandas as pd
+
+        condiciones, parametros = self._filtro(desde, hasta)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(COLUMNAS)} FROM compras {condiciones} ORDER BY fecha",
+            self.conexion(),
+            params=parametros,
+        )
+        df['fecha'] = normalizar_fechas(df['fecha'])
+        return df
+
+    def cargar(self):
+        return self.rango()
+
+    def leer_columnas(self, columnas=COLUMNAS):
+        filas = self.conexion().execute(f"SELECT {', '.join(columnas)} FROM compras ORDER BY fecha").fetchall()
+        resultado = {c: [fila[c] for fila in filas] for c in columnas}
+        if 'fecha' in resultado:
+            resultado['fecha'] = [intervalos.parsear(f) for f in resultado['fecha']]
+        return resultado
+
+    def lotes(self, tamano=TAMANO_LOTE, columnas=COLUMNAS):
+        """Cursor con fetchmany: SQLite entrega las filas de a un lote
+
+        La unidad de las fechas se decide una vez para todo el ledger: con alguna clave instante, todos
+        los lotes van en datetime64[s] (las claves diarias quedan en su medianoche).
+        """
+        import numpy as np
+
+        instantes = self.conexion().execute("SELECT 1 FROM compras WHERE fecha LIKE '%Z' LIMIT 1").fetchone()
+        unidad = 's' if instantes is not None else 'D'
+        cursor = self.conexion().execute(f"SELECT {', '.join(columnas)} FROM compras ORDER BY fecha")
+        while True:
+            filas = cursor.fetchmany(tamano)
+            if not filas:
+                return
+            lote = {c: np.array([fila[c] for fila in filas], dtype='float64') for c in columnas if c != 'fecha'}
+            if 'fecha' in columnas:
+                lote['fecha'] = np.array([fila['fecha'].rstrip('Z') for fila in filas], dtype=f'datetime64[{unidad}]')
+            yield {c: lote[c] for c in columnas}
+
+    def agregados(self, desde=None, hasta=None):
+        """Calcula totales del rango en SQLite sin cargar las filas en memoria"""
+        condiciones, parametros = self._filtro(desde, hasta)
+        fila = self.conexion().execute(
+            f"""SELECT COUNT(*) AS dias,
+                       MIN(fecha) AS primera_fecha,
+                       MAX(fecha) AS ultima_fecha,
+                       COALESCE(SUM(usd_invertidos), 0) AS usd_invertidos,
+                       COALESCE(SUM(comision_usd), 0) AS comision_usd,
+                       COALESCE(SUM(btc_comprados), 0) AS btc_comprados,
+                       MIN(precio_btc_usd) AS precio_min,
+                       MAX(precio_btc_usd) AS precio_max,
+                       AVG(precio_btc_usd) AS precio_promedio
+                FROM compras {condiciones}""",
+            parametros,
+        ).fetchone()
+        return dict(fila)
+
+    @staticmethod
+    def _filtro(desde, hasta):
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("fecha >= ?")
+            parametros.append(intervalos.formatear(desde))
+        if isinstance(hasta, datetime):
+            condiciones.append("fecha <= ?")
+            parametros.append(intervalos.formatear(hasta))
+        elif hasta is not None:
+            # Texto ISO: 'YYYY-MM-DD' < 'YYYY-MM-DDTHH:MM:SSZ' < día siguiente, así entra el día entero
+            condiciones.append("fecha < ?")
+            parametros.append(intervalos.formatear(intervalos.fin_del_dia(hasta).date()))
+        return ("WHERE " + " AND ".join(condiciones) if condiciones else ""), parametros
+
+
+# Registro de backends disponibles
+BACKENDS = {
+    CSVStorage.nombre: CSVStorage,
+    ColumnarStorage.nombre: ColumnarStorage,
+    SatoshiStorage.nombre: SatoshiStorage,
+    PartitionedStorage.nombre: PartitionedStorage,
+    SQLiteStorage.nombre: SQLiteStorage,
+}
+
+
+def crear_storage(nombre, path):
+    """Instancia el backend de almacenamiento por nombre"""
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend de almacenamiento desconocido: {nombre} (opciones: {', '.join(BACKENDS)})")
+    return BACKENDS[nombre](path)
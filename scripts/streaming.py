@@ -0,0 +1,143 @@
+"""
+Analítica por lotes del tracker de BTC DCA
+Recorre ledgers que no conviene cargar enteros (muchos portafolios, compras por minuto) en una
+sola pasada y con memoria acotada: cada reducción es un generador que recibe los lotes con send()
+"""
+
+import numpy as np
+
+import metrics
+
+# Tope de filas de las series del dashboard; por debajo se conservan todas (mismo resultado que sin lotes)
+MAX_FILAS_SERIES = 20_000
+
+COLUMNAS_SERIES = ('fecha', 'usd_invertidos', 'valor_actual_usd', 'precio_btc_usd')
+
+
+def recorrer(lotes, reductores):
+    """Envía cada lote a todos los reductores en una sola pasada y devuelve sus resultados
+
+    lotes: iterable de dict columna -> array (Storage.lotes).
+    reductores: dict nombre -> generador ya creado. Un reductor es un generador que toma cada lote
+    con `lote = yield` y, cuando recibe None, termina con `return resultado`:
+
+        def total_comprado():
+            total = 0.0
+            while True:
+                lote = yield
+                if lote is None:
+                    return total
+                total += float(lote['btc_comprados'].sum())
+    """
+    for reductor in reductores.values():
+        next(reductor)
+    for lote in lotes:
+        for reductor in reductores.values():
+            reductor.send(lote)
+
+    resultados = {}
+    for nombre, reductor in reductores.items():
+        try:
+            reductor.send(None)
+        except StopIteration as fin:
+            resultados[nombre] = fin.value
+        else:
+            raise RuntimeError(f"El reductor '{nombre}' no terminó al recibir el fin de los lotes")
+    return resultados
+
+
+def estado_columnas(columnas, comision_porcentaje):
+    """Estado de métricas de columnas en memoria (listas de leer_columnas) recorridas como un único lote"""
+    lote = {c: np.asarray(valores) for c, valores in columnas.items()}
+    return recorrer([lote], {'estado': metrics.reductor(comision_porcentaje)})['estado']
+
+
+def filas(lotes):
+    """Aplana los lotes en registros dict (para reducciones fila a fila; más lento que operar por lote)"""
+    for lote in lotes:
+        columnas = {c: valores.tolist() for c, valores in lote.items()}
+        for i in range(len(columnas['fecha'])):
+            yield {c: valores[i] for c, valores in columnas.items()}
+
+
+def _seleccion_m4(candidatas, ancho):
+    """Posiciones a conservar agrupando las filas en buckets de `ancho` filas consecutivas del ledger
+
+    Por bucket quedan la primera y la última fila y el mínimo y el máximo de cada curva (M4):
+    los picos y los extremos del gráfico sobreviven aunque se descarten las filas intermedias.
+    """
+    bucket = candidatas['posicion'] // ancho
+    n = len(bucket)
+    inicios = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    finales = np.r_[inicios[1:], n] - 1
+    elegidas = [inicios, finales]
+    for curva in ('valor', 'precio'):
+        # lexsort es estable: ante empate queda la primera aparición del bucket
+        elegidas.append(np.lexsort((candidatas[curva], bucket))[inicios])
+        elegidas.append(np.lexsort((-candidatas[curva], bucket))[inicios])
+    return np.unique(np.concatenate(elegidas))
+
+
+def series(max_filas=MAX_FILAS_SERIES):
+    """Reductor de las series del dashboard (segundos UTC, invertido acumulado, valor y precio)
+
+    Con más de max_filas filas agrupa en buckets cada vez más anchos (M4) y se queda con a lo
+    sumo max_filas; los niveles LTTB del dashboard se calculan después sobre ese resultado.
+    """
+    candidatas = None
+    ancho = 1
+    procesadas = 0
+    invertido = 0
+    while True:
+        lote = yield
+        if lote is None:
+            break
+        n = len(lote['fecha'])
+        if n == 0:
+            continue
+        # cumsum secuencial con el arrastre adelante: mismos floats que accumulate() sobre todo el ledger
+        acumulado = np.cumsum(np.concatenate(([invertido], lote['usd_invertidos'])))[1:]
+        invertido = acumulado[-1]
+        nuevas = {
+            'posicion': np.arange(procesadas, procesadas + n),
+            'fecha': np.asarray(lote['fecha'], dtype='datetime64[s]'),
+            'invertido': acumulado,
+            'valor': np.asarray(lote['valor_actual_usd']),
+            'precio': np.asarray(lote['precio_btc_usd']),
+        }
+        procesadas += n
+        if candidatas is None:
+            candidatas = nuevas
+        else:
+            candidatas = {c: np.concatenate((candidatas[c], nuevas[c])) for c in candidatas}
+
+        if ancho > 1:
+            conservar = _seleccion_m4(candidatas, ancho)
+            candidatas = {c: valores[conservar] for c, valores in candidatas.items()}
+        while len(candidatas['posicion']) > max_filas:
+            ancho *= 2
+            conservar = _seleccion_m4(candidatas, ancho)
+            candidatas = {c: valores[conservar] for c, valores in candidatas.items()}
+
+    if candidatas is None:
+        return {'ts': [], 'invertido': [], 'valor': [], 'precio': []}
+    return {
+        'ts': candidatas['fecha'].astype('int64').tolist(),
+        'invertido': candidatas['invertido'].tolist(),
+        'valor': candidatas['valor'].tolist(),
+        'precio': candidatas['precio'].tolist(),
+    }
+
+
+def analizar(lotes, comision_porcentaje, max_filas=MAX_FILAS_SERIES, extra=None):
+    """Estado de métricas y series del dashboard en una sola pasada por los lotes
+
+    extra: reductores adicionales {nombre: generador} que se alimentan en la misma pasada.
+    Devuelve {'estado', 'series', **extra}.
+    """
+    reductores = {
+        'estado': metrics.reductor(comision_porcentaje),
+        'series': series(max_filas),
+        **(extra or {}),
+    }
+    return recorrer(lotes, reductores)
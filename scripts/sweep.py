@@ -0,0 +1,153 @@
+"""
+Simulador de estrategias DCA del tracker de BTC DCA
+Evalúa una grilla completa de parámetros (monto, frecuencia, comisión, día de semana) con NumPy
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+NOMBRES_DIAS = ['lun', 'mar', 'mié', 'jue', 'vie', 'sáb', 'dom']
+
+# A partir de este tamaño (patrones × días) se reparte el cálculo en un pool de procesos
+CELDAS_POR_PROCESO = 2_000_000
+
+COLUMNAS_RESULTADO = [
+    'monto_usd',
+    'frecuencia_dias',
+    'dia_semana',
+    'comision_pct',
+    'compras',
+    'usd_invertidos',
+    'comisiones_usd',
+    'btc_total',
+    'valor_final_usd',
+    'ganancia_usd',
+    'roi_pct',
+    'precio_promedio',
+    'peor_roi_pct',
+]
+
+
+def construir_patrones(fechas, frecuencias):
+    """Arma la matriz booleana de días de compra (patrones × días) para cada frecuencia
+
+    Las frecuencias múltiplos de 7 generan un patrón por día de la semana; el resto
+    compra cada N días desde el primer día de la serie. Los días se cuentan en el calendario:
+    si a la serie le faltan días, los días de compra que caen en el hueco no compran.
+    """
+    fechas = pd.DatetimeIndex(fechas).normalize()
+    # Días de calendario desde el primero (no posiciones: la serie puede tener huecos)
+    dias = (fechas - fechas[0]).days.to_numpy() if len(fechas) else np.arange(0)
+    dia_semana = fechas.dayofweek.to_numpy()
+    # Semanas transcurridas desde el lunes de la primera semana
+    semana = (dias + dia_semana[0]) // 7 if len(fechas) else dias
+
+    patrones, descripcion = [], []
+    for frecuencia in frecuencias:
+        if frecuencia % 7 == 0:
+            cada_semanas = frecuencia // 7
+            for dia in range(7):
+                patrones.append((dia_semana == dia) & (semana % cada_semanas == 0))
+                descripcion.append((frecuencia, NOMBRES_DIAS[dia]))
+        else:
+            patrones.append(dias % frecuencia == 0)
+            descripcion.append((frecuencia, '-'))
+    return np.array(patrones, dtype=bool).reshape(len(patrones), len(fechas)), descripcion
+
+
+def serie_diaria(precios):
+    """Un precio por día (el último del día): los ledgers intradiarios tienen 24-96 filas por día"""
+    return precios.groupby(precios.index.normalize(), sort=True).last()
+
+
+def evaluar_patrones(patrones, precios):
+    """Calcula por patrón: compras, BTC por USD neto invertido y peor ratio valor/invertido
+
+    Todo se resuelve como operaciones matriciales sobre (patrones × días).
+    """
+    inverso = 1.0 / precios
+    compras_acumuladas = np.cumsum(patrones, axis=1)
+    btc_por_usd = np.cumsum(patrones * inverso, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(compras_acumuladas > 0, btc_por_usd * precios / compras_acumuladas, np.nan)
+    peor_ratio = np.nanmin(np.where(np.isnan(ratio), np.inf, ratio), axis=1)
+    peor_ratio[np.isinf(peor_ratio)] = np.nan
+    return compras_acumuladas[:, -1], btc_por_usd[:, -1], peor_ratio
+
+
+def _evaluar_en_pool(patrones, precios, procesos):
+    """Reparte los patrones en bloques y los evalúa en un pool de procesos"""
+    bloques = np.array_split(np.arange(len(patrones)), procesos)
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(evaluar_patrones, patrones[b], precios) for b in bloques if len(b)]
+        resultados = [f.result() for f in futuros]
+    return tuple(np.concatenate(partes) for partes in zip(*resultados))
+
+
+def evaluar_grilla(precios, montos, frecuencias, comisiones, procesos=None, orden='roi_pct'):
+    """Evalúa todas las combinaciones de la grilla y devuelve la tabla ordenada
+
+    precios: Serie de precios diarios indexada por fecha.
+    procesos: None decide según el tamaño de la grilla; 1 fuerza ejecución en serie.
+    """
+    fechas = precios.index
+    valores = precios.to_numpy(dtype='float64')
+    patrones, descripcion = construir_patrones(fechas, frecuencias)
+
+    if procesos is None:
+        procesos = min(os.cpu_count() or 1, max(1, patrones.size // CELDAS_POR_PROCESO))
+    if procesos > 1:
+        compras, btc_por_usd, peor_ratio = _evaluar_en_pool(patrones, valores, procesos)
+    else:
+        compras, btc_por_usd, peor_ratio = evaluar_patrones(patrones, valores)
+
+    # Broadcast (patrón × monto × comisión): el BTC escala linealmente con el monto neto
+    montos = np.asarray(montos, dtype='float64')[None, :, None]
+    comisiones = np.asarray(comisiones, dtype='float64')[None, None, :]
+    compras_3d = compras[:, None, None].astype('float64')
+    usd_invertidos = montos * compras_3d
+    comisiones_usd = usd_invertidos * comisiones
+    btc_total = montos * (1 - comisiones) * btc_por_usd[:, None, None]
+    valor_final = btc_total * valores[-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        roi = np.where(usd_invertidos > 0, (valor_final / usd_invertidos - 1) * 100, 0.0)
+        precio_promedio = np.where(btc_total > 0, usd_invertidos / btc_total, 0.0)
+    peor_roi = ((1 - comisiones) * peor_ratio[:, None, None] - 1) * 100
+
+    forma = (len(patrones), montos.size, comisiones.size)
+    indice_patron, indice_monto, indice_comision = np.indices(forma).reshape(3, -1)
+    frecuencia = np.array([d[0] for d in descripcion])
+    dia_semana = np.array([d[1] for d in descripcion])
+
+    def plano(array):
+        return np.broadcast_to(array, forma).ravel()
+
+    tabla = pd.DataFrame({
+        'monto_usd': montos.ravel()[indice_monto],
+        'frecuencia_dias': frecuencia[indice_patron],
+        'dia_semana': dia_semana[indice_patron],
+        'comision_pct': comisiones.ravel()[indice_comision] * 100,
+        'compras': plano(compras_3d).astype('int64'),
+        'usd_invertidos': plano(usd_invertidos),
+        'comisiones_usd': plano(comisiones_usd),
+        'btc_total': plano(btc_total),
+        'valor_final_usd': plano(valor_final),
+        'ganancia_usd': plano(valor_final - usd_invertidos),
+        'roi_pct': plano(roi),
+        'precio_promedio': plano(precio_promedio),
+        'peor_roi_pct': plano(peor_roi),
+    }, columns=COLUMNAS_RESULTADO)
+
+    tabla = tabla.sort_values(orden, ascending=False, kind='stable').reset_index(drop=True)
+    tabla.index = tabla.index + 1
+    tabla.index.name = 'ranking'
+    return tabla
+
+
+def combinaciones(montos, frecuencias, comisiones):
+    """Cantidad de combinaciones que genera la grilla"""
+    patrones = sum(7 if f % 7 == 0 else 1 for f in frecuencias)
+    return patrones * len(montos) * len(comisiones)
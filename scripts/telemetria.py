@@ -0,0 +1,114 @@
+"""
+Telemetría de ejecución del tracker de BTC DCA
+Spans de tiempo por etapa, archivo JSON-lines de métricas por corrida y perfilado opcional con cProfile
+"""
+
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+_corrida = None
+
+
+def iniciar(path_metricas, comando, perfilar=(), directorio_perfiles=None):
+    """Abre una corrida: a partir de acá las etapas se registran y se persisten en finalizar()
+
+    perfilar: nombres de etapas a ejecutar bajo cProfile (un .prof por etapa en directorio_perfiles).
+    """
+    global _corrida
+    _corrida = {
+        'id': uuid.uuid4().hex[:12],
+        'comando': comando,
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        't0': time.perf_counter(),
+        'path': Path(path_metricas),
+        'perfilar': set(perfilar or ()),
+        'directorio_perfiles': Path(directorio_perfiles or Path(path_metricas).parent),
+        'etapas': [],
+        'pila': [],
+    }
+    return _corrida['id']
+
+
+@contextmanager
+def etapa(nombre, **atributos):
+    """Mide un bloque; el dict que devuelve admite contadores (filas, bytes) que se guardan con el span
+
+    Sin corrida abierta solo devuelve el dict (las funciones se pueden usar sin instrumentar).
+    """
+    span = {'etapa': nombre, **atributos}
+    if _corrida is None:
+        yield span
+        return
+
+    pila = _corrida['pila']
+    if pila:
+        span['padre'] = pila[-1]
+    pila.append(nombre)
+
+    perfil = None
+    if nombre in _corrida['perfilar']:
+        import cProfile
+        perfil = cProfile.Profile()
+
+    inicio = time.perf_counter()
+    span['inicio_s'] = round(inicio - _corrida['t0'], 6)
+    if perfil is not None:
+        perfil.enable()
+    try:
+        yield span
+    except BaseException as e:
+        span['error'] = type(e).__name__
+        raise
+    finally:
+        if perfil is not None:
+            perfil.disable()
+            destino = _corrida['directorio_perfiles'] / f"perfil-{nombre}-{_corrida['id']}.prof"
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            perfil.dump_stats(destino)
+            span['perfil'] = str(destino)
+        span['segundos'] = round(time.perf_counter() - inicio, 6)
+        pila.pop()
+        _corrida['etapas'].append(span)
+
+
+def bytes_archivo(path):
+    """Tamaño de un archivo recién escrito (0 si no existe)"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def finalizar(estado='ok'):
+    """Cierra la corrida y agrega sus spans y un resumen al archivo JSON-lines
+
+    Devuelve el resumen de la corrida (None si no había una abierta).
+    """
+    global _corrida
+    if _corrida is None:
+        return None
+    corrida, _corrida = _corrida, None
+
+    resumen = {
+        'tipo': 'corrida',
+        'corrida': corrida['id'],
+        'comando': corrida['comando'],
+        'inicio': corrida['inicio'],
+        'estado': estado,
+        'segundos': round(time.perf_counter() - corrida['t0'], 6),
+        'etapas': len(corrida['etapas']),
+        'pid': os.getpid(),
+    }
+    lineas = [{'tipo': 'etapa', 'corrida': corrida['id'], **span} for span in corrida['etapas']]
+    lineas.append(resumen)
+
+    corrida['path'].parent.mkdir(parents=True, exist_ok=True)
+    with open(corrida['path'], 'a', encoding='utf-8') as f:
+        for linea in lineas:
+            f.write(json.dumps(linea, ensure_ascii=False, default=str) + '\n')
+    return resumen
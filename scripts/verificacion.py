@@ -0,0 +1,133 @@
+"""
+Verificación de consistencia del ledger del tracker de BTC DCA
+Cada corrida deriva btc_acumulado y valor_actual_usd de la fila anterior y nunca los vuelve a mirar.
+Acá se recalculan con cumsum vectorizado (y la compra y la comisión de cada fila) para encontrar la
+primera fila que no cierra. Es un reductor por lotes (streaming.recorrer): una pasada, memoria acotada
+"""
+
+import numpy as np
+
+import indice
+import storage
+
+# Tolerancias: relativa para los floats y absoluta de un satoshi / un micro-dólar, lo que el backend
+# entero puede mover al redondear cada compra (medio, más el error de los floats) sin que sea un error
+RTOL = 1e-9
+ATOL_BTC = 1 / storage.SATOSHIS_POR_BTC
+ATOL_USD = 1 / storage.MICRO_USD
+
+# Chequeo -> qué se espera de cada fila
+CHEQUEOS = {
+    'orden': 'fecha posterior a la de la fila anterior',
+    'comision_usd': 'usd_invertidos × comisión',
+    'btc_comprados': '(usd_invertidos - comision_usd) / precio_btc_usd',
+    'btc_acumulado': 'btc_acumulado anterior + btc_comprados',
+    'valor_actual_usd': 'btc_acumulado × precio_btc_usd',
+}
+
+# Columnas derivadas que corregir() recalcula; la compra y la comisión registran lo que se
+# pagó y solo se informan
+CORREGIBLES = ('orden', 'btc_acumulado', 'valor_actual_usd')
+
+
+def _registrar(chequeo, malas, desplazamiento, fechas, guardado=None, esperado=None):
+    """Suma las filas fuera de tolerancia del lote y guarda la primera del ledger"""
+    cantidad = int(np.count_nonzero(malas))
+    if cantidad == 0:
+        return
+    chequeo['divergentes'] += cantidad
+    if chequeo['primera'] is None:
+        i = int(malas.argmax())
+        chequeo['primera'] = {
+            'fila': desplazamiento + i,
+            'fecha': str(fechas[i]),
+            'guardado': None if guardado is None else float(guardado[i]),
+            'esperado': None if esperado is None else float(esperado[i]),
+        }
+
+
+def reductor(comision_porcentaje, rtol=RTOL):
+    """Reductor de la verificación (generador: ver streaming.recorrer)
+
+    Devuelve {'filas', 'chequeos': {nombre: {'divergentes', 'primera'}}, 'totales'}. 'primera' es
+    None o la primera fila fuera de tolerancia: posición (desde 0), fecha, valor guardado y esperado.
+    El acumulado se recalcula desde el de la primera fila (admite un saldo inicial) sumando en el
+    mismo orden que el append, así un ledger sano da exactamente los mismos floats.
+    """
+    chequeos = {nombre: {'divergentes': 0, 'primera': None} for nombre in CHEQUEOS}
+    filas = 0
+    acumulado = None  # acumulado recalculado al cierre del lote anterior
+    fecha_previa = None
+    invertido = comisiones = 0.0
+    while True:
+        lote = yield
+        if lote is None:
+            break
+        n = len(lote['fecha'])
+        if n == 0:
+            continue
+        fechas = lote['fecha']
+        precio = np.asarray(lote['precio_btc_usd'], dtype='float64')
+        usd = np.asarray(lote['usd_invertidos'], dtype='float64')
+        comprados = np.asarray(lote['btc_comprados'], dtype='float64')
+        guardado = np.asarray(lote['btc_acumulado'], dtype='float64')
+        valor = np.asarray(lote['valor_actual_usd'], dtype='float64')
+        comision = np.asarray(lote['comision_usd'], dtype='float64')
+
+        if acumulado is None:
+            esperado = np.cumsum(np.concatenate((guardado[:1], comprados[1:])))
+        else:
+            esperado = np.cumsum(np.concatenate(([acumulado], comprados)))[1:]
+        acumulado = esperado[-1]
+
+        orden = np.empty(n, dtype=bool)
+        orden[0] = fecha_previa is not None and not fechas[0] > fecha_previa
+        orden[1:] = ~(fechas[1:] > fechas[:-1])
+        fecha_previa = fechas[-1]
+        _registrar(chequeos['orden'], orden, filas, fechas)
+
+        comparaciones = {
+            'comision_usd': (comision, usd * comision_porcentaje, ATOL_USD),
+            'btc_comprados': (comprados, (usd - comision) / precio, ATOL_BTC),
+            'btc_acumulado': (guardado, esperado, ATOL_BTC),
+            'valor_actual_usd': (valor, guardado * precio, ATOL_USD),
+        }
+        for nombre, (actual, calculado, atol) in comparaciones.items():
+            malas = ~np.isclose(actual, calculado, rtol=rtol, atol=atol)
+            _registrar(chequeos[nombre], malas, filas, fechas, actual, calculado)
+
+        invertido += float(usd.sum())
+        comisiones += float(comision.sum())
+        filas += n
+
+    return {
+        'filas': filas,
+        'chequeos': chequeos,
+        'totales': {
+            'btc_acumulado': None if acumulado is None else float(acumulado),
+            'usd_invertidos': invertido,
+            'comision_usd': comisiones,
+        },
+    }
+
+
+def corregir(df):
+    """Reescribe las columnas derivadas del ledger (DataFrame) con los valores recalculados
+
+    Ordena por fecha y descarta fechas repetidas (queda la primera, como el camino clásico) y
+    recalcula btc_acumulado y valor_actual_usd desde btc_comprados y el precio de cada fila.
+    Devuelve (df corregido, filas descartadas).
+    """
+    import pandas as pd
+
+    conservar = indice.reparar(pd.to_datetime(df['fecha']).to_numpy())
+    descartadas = len(df) - len(conservar)
+    df = df.iloc[conservar].reset_index(drop=True)
+    if df.empty:
+        return df, descartadas
+
+    comprados = df['btc_comprados'].to_numpy(dtype='float64')
+    acumulado = np.cumsum(np.concatenate((df['btc_acumulado'].to_numpy(dtype='float64')[:1], comprados[1:])))
+    df['btc_acumulado'] = acumulado
+    df['valor_actual_usd'] = acumulado * df['precio_btc_usd'].to_numpy(dtype='float64')
+    return df, descartadas
@@ -0,0 +1,59 @@
+"""
+Fixtures de las pruebas del tracker de BTC DCA
+Los scripts se importan como módulos sueltos (igual que al correrlos desde scripts/)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+@pytest.fixture
+def daily_update(tmp_path, monkeypatch):
+    """daily_update con todas sus rutas (ledger, dashboard, logs, caché) dentro de tmp_path"""
+    import daily_update as modulo
+    import registro
+
+    base = modulo.BASE_DIR
+    for nombre, valor in vars(modulo).copy().items():
+        if nombre.isupper() and isinstance(valor, Path) and base in valor.parents:
+            monkeypatch.setattr(modulo, nombre, tmp_path / valor.relative_to(base))
+    monkeypatch.setattr(modulo, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(modulo, '_logger', None)
+    yield modulo
+    registro.detener()
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj manual: time.time() devuelve reloj.ahora (períodos, caché de precios)"""
+    import time
+
+    class Reloj:
+        ahora = 1_800_000_000.0  # múltiplo de 1m, 15m y 1h
+
+        def avanzar(self, segundos):
+            self.ahora += segundos
+
+    actual = Reloj()
+    monkeypatch.setattr(time, 'time', lambda: actual.ahora)
+    return actual
+
+
+@pytest.fixture
+def cotizaciones(monkeypatch):
+    """Proveedores de precio falsos: cada consulta devuelve el próximo precio de la lista"""
+    import price_providers
+
+    precios = []
+
+    def obtener_precio(proveedores, quorum=1, presupuesto=None):
+        precio = precios.pop(0)
+        return {'precio': precio, 'cotizaciones': {'falso': precio}, 'errores': {}, 'parcial': False, 'segundos': 0.0}
+
+    monkeypatch.setattr(price_providers, 'obtener_precio', obtener_precio)
+    return precios
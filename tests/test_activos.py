@@ -0,0 +1,17 @@
+"""Varios activos: un activo sin precio se saltea aunque sea el principal con el ledger vacío"""
+
+import price_providers
+import storage
+
+
+def test_principal_vacio_sin_precio_no_corta_la_corrida(daily_update, monkeypatch):
+    def obtener_precios(activos, presupuesto=None):
+        return {'precios': {'ethereum': 3000.0}, 'errores': {'bitcoin': 'sin datos'}, 'segundos': 0.0}
+
+    monkeypatch.setattr(price_providers, 'obtener_precios', obtener_precios)
+
+    daily_update.update_activos(['bitcoin', 'ethereum'])
+
+    assert not daily_update.CSV_FILE.exists()
+    ethereum = storage.CSVStorage(daily_update.rutas_ledger('ethereum')['csv'])
+    assert ethereum.leer_columnas()['precio_btc_usd'] == [3000.0]
@@ -0,0 +1,50 @@
+"""Backfill: acumulados recalculados con saldo inicial y sin contar fechas repetidas"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import backfill
+import storage
+
+SALDO = 0.5
+
+
+def _ledger(fechas, precio=80000.0, usd=2.0):
+    comprados = usd * (1 - 0.003) / precio
+    acumulado = [SALDO + comprados]
+    for _ in fechas[1:]:
+        acumulado.append(acumulado[-1] + comprados)  # mismo orden de suma que el append diario
+    acumulado = pd.Series(acumulado)
+    return pd.DataFrame({
+        'fecha': [date.fromisoformat(f) for f in fechas],
+        'precio_btc_usd': precio,
+        'usd_invertidos': usd,
+        'btc_comprados': comprados,
+        'btc_acumulado': acumulado,
+        'valor_actual_usd': acumulado * precio,
+        'comision_usd': usd * 0.003,
+    })
+
+
+def test_backfill_conserva_el_saldo_inicial_y_descarta_repetidas():
+    df = _ledger(['2026-01-02', '2026-01-04', '2026-01-04'])
+    precios = pd.Series(80000.0, index=pd.date_range('2026-01-01', '2026-01-04', freq='D'))
+
+    resultado, agregados, sin_precio = backfill.backfill(
+        df, precios, date(2026, 1, 1), date(2026, 1, 4), 2.0, 0.003, storage.COLUMNAS
+    )
+
+    comprados = 2.0 * (1 - 0.003) / 80000.0
+    assert agregados == 2 and sin_precio == []
+    assert resultado['fecha'].tolist() == [date(2026, 1, d) for d in (1, 2, 3, 4)]
+    assert resultado['btc_acumulado'].tolist() == pytest.approx([SALDO + comprados * n for n in (1, 2, 3, 4)])
+
+
+def test_recalcular_acumulados_de_un_ledger_sano_no_cambia_los_floats():
+    df = _ledger(['2026-01-01', '2026-01-02', '2026-01-03'])
+
+    resultado = backfill.recalcular_acumulados(df.copy())
+
+    assert resultado['btc_acumulado'].tolist() == df['btc_acumulado'].tolist()
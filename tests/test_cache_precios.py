@@ -0,0 +1,36 @@
+"""Caché de cotizaciones y compras intradiarias: una compra nunca usa el precio de otro período"""
+
+import price_cache
+import storage
+
+
+def test_compras_intradiarias_consecutivas_usan_su_propio_precio(daily_update, reloj, cotizaciones, monkeypatch):
+    monkeypatch.setattr(daily_update, 'INTERVALO_COMPRA', 60)
+    cotizaciones.extend([80000.0, 50000.0])
+
+    daily_update.update_btc_data()
+    reloj.avanzar(62)  # período siguiente, caché de 900 s todavía vigente
+    daily_update.update_btc_data()
+
+    precios = storage.CSVStorage(daily_update.CSV_FILE).leer_columnas()['precio_btc_usd']
+    assert precios == [80000.0, 50000.0]
+
+
+def test_corrida_repetida_en_el_periodo_no_vuelve_a_comprar(daily_update, reloj, cotizaciones, monkeypatch):
+    monkeypatch.setattr(daily_update, 'INTERVALO_COMPRA', 900)
+    cotizaciones.extend([80000.0])
+
+    daily_update.update_btc_data()
+    reloj.avanzar(30)
+    daily_update.update_btc_data()
+
+    assert storage.CSVStorage(daily_update.CSV_FILE).leer_columnas()['precio_btc_usd'] == [80000.0]
+
+
+def test_cache_descarta_cotizaciones_anteriores_al_periodo(tmp_path):
+    path = tmp_path / 'cache.json'
+    price_cache.guardar(path, 'bitcoin-usd', 80000.0, ahora=1000.0)
+
+    assert price_cache.obtener(path, 'bitcoin-usd', ahora=1100.0)['precio'] == 80000.0
+    assert price_cache.obtener(path, 'bitcoin-usd', ahora=1100.0, desde=1000.0)['precio'] == 80000.0
+    assert price_cache.obtener(path, 'bitcoin-usd', ahora=1100.0, desde=1060.0) is None
@@ -0,0 +1,69 @@
+"""Backend columnar: import/export de CSV sin pérdidas (ledger diario e intradiario)"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+
+def _historial(fechas):
+    rng = np.random.default_rng(3)
+    precio = np.round(30000 * np.exp(np.cumsum(rng.normal(0, 0.03, len(fechas)))), 2)
+    usd = np.full(len(fechas), 2.0)
+    comision = usd * 0.003
+    comprados = (usd - comision) / precio
+    acumulado = np.cumsum(comprados)
+    return pd.DataFrame({
+        'fecha': fechas,
+        'precio_btc_usd': precio,
+        'usd_invertidos': usd,
+        'btc_comprados': comprados,
+        'btc_acumulado': acumulado,
+        'valor_actual_usd': acumulado * precio,
+        'comision_usd': comision,
+    }, columns=storage.COLUMNAS)
+
+
+def _ida_y_vuelta(daily_update, tmp_path, df):
+    origen, destino = tmp_path / "origen.csv", tmp_path / "destino.csv"
+    storage.CSVStorage(origen).guardar(df)
+
+    daily_update.import_csv(origen, 'columnar')
+    daily_update.export_csv(destino, 'columnar')
+
+    return origen.read_bytes(), destino.read_bytes()
+
+
+def test_import_export_diario(daily_update, tmp_path):
+    df = _historial([date(2025, 1, 1) + timedelta(days=i) for i in range(400)])
+
+    origen, destino = _ida_y_vuelta(daily_update, tmp_path, df)
+
+    assert destino == origen
+    columnas = storage.ColumnarStorage(daily_update.COLUMNAR_DIR).columnas()
+    assert columnas['fecha'].dtype == np.dtype('datetime64[D]')
+    assert np.array_equal(columnas['btc_acumulado'], df['btc_acumulado'].to_numpy())
+
+
+def test_import_export_intradiario_conserva_las_claves(daily_update, tmp_path):
+    df = _historial([datetime(2025, 1, 1) + timedelta(minutes=15 * i) for i in range(500)])
+
+    origen, destino = _ida_y_vuelta(daily_update, tmp_path, df)
+
+    assert destino == origen
+    claves = pd.read_csv(tmp_path / "destino.csv", dtype=str)['fecha']
+    assert claves.iloc[0] == '2025-01-01T00:00:00Z' and claves.str.endswith('Z').all()
+
+
+def test_export_de_un_rango(daily_update, tmp_path):
+    df = _historial([date(2025, 1, 1) + timedelta(days=i) for i in range(90)])
+    _ida_y_vuelta(daily_update, tmp_path, df)
+
+    daily_update.export_csv(tmp_path / "febrero.csv", 'columnar', desde=date(2025, 2, 1), hasta=date(2025, 2, 28))
+
+    febrero = storage.cargar_csv(tmp_path / "febrero.csv")
+    esperado = df.iloc[31:59].reset_index(drop=True)
+    assert len(febrero) == 28
+    pd.testing.assert_frame_equal(febrero.drop(columns='fecha'), esperado.drop(columns='fecha'), check_exact=True)
@@ -0,0 +1,47 @@
+"""Modo daemon: ticks de compra intradiaria, render bajo el bloqueo y telemetría por tick"""
+
+import json
+
+import daemon
+import escritura
+import telemetria
+
+TICKS = 3
+
+
+def test_ticks_intradiarios(daily_update, reloj, cotizaciones, monkeypatch, capsys):
+    monkeypatch.setattr(daily_update, 'INTERVALO_COMPRA', 60)
+    cotizaciones.extend([64000.0 + i for i in range(TICKS)])
+
+    async def correr(tick, intervalo, desfase=0.0, log=print):
+        for _ in range(TICKS):
+            await tick()
+            reloj.avanzar(intervalo)
+
+    bloqueado = []
+    generar = daily_update.generate_dashboard
+
+    def generate_dashboard(*args, **kwargs):
+        bloqueado.append(str(daily_update.LOCK_FILE) in escritura._bloqueos)
+        return generar(*args, **kwargs)
+
+    monkeypatch.setattr(daemon, 'correr', correr)
+    monkeypatch.setattr(daily_update, 'generate_dashboard', generate_dashboard)
+    telemetria.iniciar(daily_update.RUN_METRICS_FILE, 'daemon', ['precio'], daily_update.LOG_DIR)
+    try:
+        daily_update.ejecutar_daemon('csv', cadencia='1m', desfase='0', debounce=0, perfilar=['precio'])
+    finally:
+        telemetria.finalizar('ok')
+
+    salida = capsys.readouterr().out
+    # $2 repartidos en 1440 compras: con dos decimales el log mostraba $0.00
+    assert f"Compra del día: ${daily_update.USD_POR_COMPRA / 1440:.6f} = " in salida
+    for compras in range(1, TICKS + 1):
+        assert f"({compras} compras en 1 días)" in salida
+    assert bloqueado and all(bloqueado)
+
+    # --perfilar sigue activo después del primer tick: un perfil del precio por cada compra
+    corridas = [json.loads(linea) for linea in daily_update.RUN_METRICS_FILE.read_text().splitlines()]
+    ids = {c['corrida'] for c in corridas if c['tipo'] == 'etapa' and c['etapa'] == 'precio'}
+    assert len(ids) == TICKS
+    assert all((daily_update.LOG_DIR / f"perfil-precio-{corrida}.prof").exists() for corrida in ids)
@@ -0,0 +1,57 @@
+"""generate_dashboard: mismo resultado con el DataFrame o con las columnas, y niveles del zoom aparte"""
+
+import json
+from datetime import date, timedelta
+
+import pandas as pd
+
+import downsample
+import storage
+
+
+def _ledger(dias=40):
+    fechas = [date(2026, 1, 1) + timedelta(days=i) for i in range(dias)]
+    precios = [60000.0 + 500.0 * (i % 7) for i in range(dias)]
+    comprados = [2.0 * 0.997 / p for p in precios]
+    acumulado = pd.Series(comprados).cumsum()
+    return pd.DataFrame({
+        'fecha': fechas,
+        'precio_btc_usd': precios,
+        'usd_invertidos': 2.0,
+        'btc_comprados': comprados,
+        'btc_acumulado': acumulado,
+        'valor_actual_usd': acumulado * pd.Series(precios),
+        'comision_usd': 0.006,
+    })
+
+
+def _contenido(path):
+    # La línea con la hora de generación cambia entre renders
+    return [l for l in path.read_text(encoding='utf-8').splitlines() if 'Generado automáticamente' not in l]
+
+
+def test_generate_dashboard_con_columnas_y_sin_estado(daily_update, monkeypatch):
+    monkeypatch.setattr(daily_update, 'DASHBOARD_MODE', 'inline')
+    storage.CSVStorage(daily_update.CSV_FILE).guardar(_ledger())
+    ledger = storage.CSVStorage(daily_update.CSV_FILE)
+
+    daily_update.generate_dashboard(ledger.cargar())
+    desde_df = _contenido(daily_update.DASHBOARD_FILE)
+    daily_update.generate_dashboard(ledger.leer_columnas())
+    desde_columnas = _contenido(daily_update.DASHBOARD_FILE)
+
+    assert desde_columnas == desde_df
+
+
+def test_historial_largo_embebe_un_nivel_y_escribe_los_del_zoom(daily_update, monkeypatch):
+    monkeypatch.setattr(daily_update, 'DASHBOARD_MODE', 'inline')
+    storage.CSVStorage(daily_update.CSV_FILE).guardar(_ledger(1000))
+
+    daily_update.generate_dashboard(storage.CSVStorage(daily_update.CSV_FILE).leer_columnas())
+
+    linea = next(l for l in _contenido(daily_update.DASHBOARD_FILE) if 'const datosGraficos' in l)
+    datos = json.loads(linea.split('=', 1)[1].strip().rstrip(';'))
+    assert len(datos['inicial']['dca']['ts']) <= downsample.MAX_PUNTOS_VISIBLES
+    assert datos['niveles'] == daily_update.NIVELES_FILE.name
+    niveles = json.loads(daily_update.NIVELES_FILE.read_text(encoding='utf-8'))
+    assert niveles[0]['nombre'] == 'completo' and len(niveles[0]['dca']['ts']) == 1000
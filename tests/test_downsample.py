@@ -0,0 +1,71 @@
+"""Niveles LTTB de los gráficos: extremos, tamaño, serie corta sin reducir y eje de tiempo"""
+
+import numpy as np
+
+import dashboard
+import downsample
+
+
+def _series(n, paso=86400):
+    rng = np.random.default_rng(7)
+    precio = (30000 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))).tolist()
+    return {
+        'ts': list(range(1_420_070_400, 1_420_070_400 + n * paso, paso)),
+        'invertido': [2.0 * (i + 1) for i in range(n)],
+        'valor': [p / 1000 for p in precio],
+        'precio': precio,
+    }
+
+
+def test_lttb_conserva_los_extremos_y_devuelve_umbral_puntos():
+    valores = np.cumsum(np.random.default_rng(1).normal(size=5000))
+
+    indices = downsample.lttb_indices(valores, 300)
+
+    assert len(indices) == 300
+    assert indices[0] == 0 and indices[-1] == 4999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_sin_reducir_si_la_serie_entra_en_el_umbral():
+    assert downsample.lttb_indices([3.0, 1.0, 2.0], 3).tolist() == [0, 1, 2]
+    assert downsample.lttb_indices(list(range(10)), 50).tolist() == list(range(10))
+
+
+def test_lttb_usa_el_eje_x_dado():
+    # Un hueco de tiempo entre los puntos 0 y 1 cambia qué punto forma el triángulo más grande
+    y = [0.0, 5.0, 9.0, 6.0, 10.0]
+    assert downsample.lttb_indices(y, 3).tolist() == [0, 2, 4]
+    assert downsample.lttb_indices(y, 3, x=[0, 90, 91, 92, 100]).tolist() == [0, 1, 4]
+
+
+def test_niveles_reducidos():
+    assert downsample.niveles_reducidos(_series(downsample.MAX_PUNTOS_VISIBLES)) == []
+
+    series = _series(3650)
+    niveles = downsample.niveles_reducidos(series)
+
+    assert [n['nombre'] for n in niveles] == ['semanal', 'mensual']
+    for nivel, factor in zip(niveles, (7, 30)):
+        for grafico, curva in (('dca', 'valor'), ('precio', 'precio')):
+            puntos = nivel[grafico]
+            assert len(puntos['ts']) == len(puntos[curva]) == 3650 // factor
+            assert puntos['ts'][0] == series['ts'][0] and puntos['ts'][-1] == series['ts'][-1]
+    assert len(niveles[-1]['dca']['ts']) <= downsample.MAX_PUNTOS_VISIBLES
+
+
+def test_la_pagina_trae_solo_el_nivel_del_primer_render():
+    series = _series(3650)
+    series['niveles'] = downsample.niveles_reducidos(series)
+
+    datos = dashboard.datos_graficos(series)
+
+    assert datos['inicial']['nombre'] == 'mensual'
+    assert datos['niveles'] == dashboard.NIVELES_ARCHIVO
+    assert datos['rangos']['precio'] == [min(series['precio']), max(series['precio'])]
+    assert [n['nombre'] for n in dashboard.niveles_zoom(series)] == ['completo', 'semanal', 'mensual']
+
+    corta = _series(100)
+    corta['niveles'] = downsample.niveles_reducidos(corta)
+    datos = dashboard.datos_graficos(corta)
+    assert datos['inicial']['nombre'] == 'completo' and datos['niveles'] is None
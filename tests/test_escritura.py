@@ -0,0 +1,69 @@
+"""Escritura segura: bloqueo entre corridas superpuestas y reemplazo atómico que no deja archivos a medias"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import escritura
+
+# Otra corrida: toma el bloqueo, avisa, lo retiene un rato y deja constancia de que terminó
+CORRIDA = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+import escritura
+with escritura.bloqueo(sys.argv[2]):
+    print('tomado', flush=True)
+    time.sleep(float(sys.argv[4]))
+    open(sys.argv[3], 'w').write('terminada')
+"""
+RETENCION = 0.5
+
+
+@pytest.mark.skipif(escritura.fcntl is None, reason="sin flock (Windows)")
+def test_bloqueo_espera_a_la_otra_corrida(tmp_path):
+    lock, marca = tmp_path / "daily_update.lock", tmp_path / "marca"
+    otra = subprocess.Popen(
+        [sys.executable, '-c', CORRIDA, str(Path(escritura.__file__).parent), str(lock), str(marca), str(RETENCION)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert otra.stdout.readline().strip() == 'tomado'
+        inicio = time.perf_counter()
+        with escritura.bloqueo(lock):
+            espera = time.perf_counter() - inicio
+            assert marca.read_text() == 'terminada'
+    finally:
+        otra.wait(timeout=10)
+    assert espera >= RETENCION / 2
+    assert otra.returncode == 0
+
+
+def test_bloqueo_es_reentrante_en_el_proceso(tmp_path):
+    lock = tmp_path / "daily_update.lock"
+    with escritura.bloqueo(lock):
+        with escritura.bloqueo(lock):
+            assert escritura._bloqueos[str(lock)][1] == 2
+        assert escritura._bloqueos[str(lock)][1] == 1
+    assert str(lock) not in escritura._bloqueos
+
+
+def test_reemplazar_conserva_el_original_si_falla(tmp_path):
+    path = tmp_path / "btc_purchases.csv"
+    path.write_text("fecha,precio_btc_usd\n2026-10-16,64000.0\n", encoding='utf-8')
+    os.chmod(path, 0o640)
+
+    with pytest.raises(RuntimeError):
+        with escritura.reemplazar(path) as f:
+            f.write("fecha,precio_btc_usd\n2026-10-")
+            raise RuntimeError("falla a mitad de la escritura")
+
+    assert path.read_text(encoding='utf-8') == "fecha,precio_btc_usd\n2026-10-16,64000.0\n"
+    assert list(tmp_path.iterdir()) == [path]
+
+    escritura.escribir(path, "fecha,precio_btc_usd\n")
+    assert path.read_text(encoding='utf-8') == "fecha,precio_btc_usd\n"
+    assert os.stat(path).st_mode & 0o777 == 0o640
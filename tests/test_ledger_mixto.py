@@ -0,0 +1,42 @@
+"""Ledger con claves diarias e intradiarias (el intervalo de compra cambió entre corridas)"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+
+import storage
+
+FILA = '64000.0,2.0,3.1e-05,{acumulado},{valor},0.006'
+
+
+def _escribir_ledger(path, claves):
+    lineas = [','.join(storage.COLUMNAS)]
+    for i, clave in enumerate(claves, start=1):
+        lineas.append(f"{clave}," + FILA.format(acumulado=3.1e-05 * i, valor=3.1e-05 * i * 64000))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('\n'.join(lineas) + '\n', encoding='utf-8')
+
+
+def test_camino_clasico_conserva_las_claves_intradiarias(daily_update, cotizaciones):
+    ayer = date.today() - timedelta(days=1)
+    claves = [
+        (ayer - timedelta(days=1)).isoformat(),
+        f"{ayer.isoformat()}T10:00:00Z",
+        f"{ayer.isoformat()}T11:00:00Z",
+    ]
+    _escribir_ledger(daily_update.CSV_FILE, claves)
+    cotizaciones.append(80000.0)
+
+    daily_update.update_btc_data()
+
+    fechas = pd.read_csv(daily_update.CSV_FILE, dtype=str)['fecha'].tolist()
+    assert fechas[:3] == claves
+    assert len(fechas) == 4
+
+
+def test_normalizar_fechas_con_fechas_despues_de_instantes():
+    columna = pd.Series(['2026-10-14', '2026-10-15T10:00:00Z', '2026-10-16'])
+
+    fechas = storage.normalizar_fechas(columna)
+
+    assert list(fechas) == [pd.Timestamp('2026-10-14'), pd.Timestamp('2026-10-15 10:00'), pd.Timestamp('2026-10-16')]
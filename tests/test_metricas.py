@@ -0,0 +1,74 @@
+"""Métricas incrementales: el estado persistido tras cada compra es el que da recalcular"""
+
+import json
+
+import metrics
+import storage
+import streaming
+
+PRECIOS = [64000.0, 61000.0, 61000.0, 67500.0, 58000.0, 58000.0, 70250.0, 66000.0]
+RECALCULO = "⚠ Estado de métricas ausente o desactualizado"
+
+
+def _comprar(daily_update, reloj, cotizaciones, precios):
+    cotizaciones.extend(precios)
+    for _ in precios:
+        daily_update.update_btc_data(append=True)
+        reloj.avanzar(86400)
+
+
+def _referencia(daily_update):
+    return metrics.recalcular(storage.cargar_csv(daily_update.CSV_FILE), daily_update.COMISION_PORCENTAJE)
+
+
+def test_actualizar_en_cada_append_coincide_con_recalcular(daily_update, reloj, cotizaciones, capsys):
+    for precio in PRECIOS:
+        _comprar(daily_update, reloj, cotizaciones, [precio])
+        assert metrics.diferencias(metrics.cargar_estado(daily_update.METRICS_FILE), _referencia(daily_update)) == []
+
+    estado = metrics.cargar_estado(daily_update.METRICS_FILE)
+    assert estado['dias'] == len(PRECIOS)
+    # Empates de btc_comprados: mejor y peor día son la primera aparición, como idxmax / idxmin
+    fechas = [str(f) for f in storage.cargar_csv(daily_update.CSV_FILE)['fecha']]
+    assert estado['mejor_dia'] == {**estado['mejor_dia'], 'fecha': fechas[PRECIOS.index(58000.0)], 'precio': 58000.0}
+    assert estado['peor_dia']['fecha'] == fechas[PRECIOS.index(70250.0)]
+    # Solo la primera compra (sin estado previo) recalcula; las siguientes suman el registro nuevo
+    assert capsys.readouterr().out.count(RECALCULO) == 1
+
+    lotes = storage.CSVStorage(daily_update.CSV_FILE).lotes(3)
+    por_lotes = streaming.recorrer(lotes, {'m': metrics.reductor(daily_update.COMISION_PORCENTAJE)})['m']
+    assert metrics.diferencias(por_lotes, estado) == []
+
+
+def test_estado_desactualizado_se_recalcula(daily_update, reloj, cotizaciones, capsys):
+    _comprar(daily_update, reloj, cotizaciones, PRECIOS[:3])
+    viejo = metrics.cargar_estado(daily_update.METRICS_FILE)
+    _comprar(daily_update, reloj, cotizaciones, PRECIOS[3:5])
+    ultimo = storage.CSVStorage(daily_update.CSV_FILE).ultimo_registro()
+    assert metrics.sigue_al_ledger(metrics.cargar_estado(daily_update.METRICS_FILE), ultimo)
+    assert not metrics.sigue_al_ledger(viejo, ultimo)
+
+    # El commit de métricas quedó atrás del ledger: la próxima compra no puede sumarse encima
+    metrics.guardar_estado(daily_update.METRICS_FILE, viejo)
+    capsys.readouterr()
+    _comprar(daily_update, reloj, cotizaciones, PRECIOS[5:6])
+
+    assert RECALCULO in capsys.readouterr().out
+    estado = metrics.cargar_estado(daily_update.METRICS_FILE)
+    assert estado['dias'] == 6
+    assert metrics.diferencias(estado, _referencia(daily_update)) == []
+
+
+def test_estado_corrupto_o_de_otra_version_se_recalcula(daily_update, reloj, cotizaciones, capsys):
+    _comprar(daily_update, reloj, cotizaciones, PRECIOS[:2])
+    estado = metrics.cargar_estado(daily_update.METRICS_FILE)
+
+    daily_update.METRICS_FILE.write_text(json.dumps({**estado, 'version': metrics.VERSION_ESTADO + 1}))
+    capsys.readouterr()
+    _comprar(daily_update, reloj, cotizaciones, PRECIOS[2:3])
+    assert RECALCULO in capsys.readouterr().out
+
+    daily_update.METRICS_FILE.write_text('{"dias": 3,')
+    _comprar(daily_update, reloj, cotizaciones, PRECIOS[3:4])
+    assert RECALCULO in capsys.readouterr().out
+    assert metrics.diferencias(metrics.cargar_estado(daily_update.METRICS_FILE), _referencia(daily_update)) == []
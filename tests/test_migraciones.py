@@ -0,0 +1,62 @@
+"""Migraciones de esquema: versión por cabecera y migración por lotes de CSV y particiones"""
+
+import json
+
+import pandas as pd
+import pytest
+
+import migraciones
+import storage
+
+CONTEXTO = {'comision_porcentaje': 0.003}
+
+
+def _ledger_v1(filas=70):
+    fechas = pd.date_range('2026-01-01', periods=filas, freq='D')
+    usd = pd.Series(2.0, index=range(filas))
+    comprados = usd / 80000.0
+    return pd.DataFrame({
+        'fecha': fechas.date,
+        'precio_btc_usd': 80000.0,
+        'usd_invertidos': usd,
+        'btc_comprados': comprados,
+        'btc_acumulado': comprados.cumsum(),
+        'valor_actual_usd': comprados.cumsum() * 80000.0,
+    })
+
+
+def test_version_se_detecta_por_las_columnas():
+    assert migraciones.version(migraciones.COLUMNAS_V1) == 1
+    assert migraciones.version(storage.COLUMNAS) == migraciones.VERSION_ACTUAL
+    assert migraciones.version(['']) == migraciones.VERSION_ACTUAL  # CSV vacío
+    with pytest.raises(ValueError):
+        migraciones.version(['fecha', 'precio'])
+
+
+def test_migrar_csv_por_lotes_conserva_el_texto(tmp_path):
+    path = tmp_path / 'ledger.csv'
+    _ledger_v1().to_csv(path, index=False)
+    original = pd.read_csv(path, dtype=str)
+
+    assert migraciones.migrar_csv(path, CONTEXTO, tamano_lote=7)
+    migrado = pd.read_csv(path, dtype=str)
+
+    assert list(migrado.columns) == storage.COLUMNAS
+    assert migrado[migraciones.COLUMNAS_V1].equals(original)
+    assert migrado['comision_usd'].astype(float).eq(2.0 * 0.003).all()
+    assert migraciones.migrar_csv(path, CONTEXTO) == []  # una sola vez
+
+
+def test_migrar_particionado_recalcula_el_manifiesto(tmp_path):
+    ledger = storage.PartitionedStorage(tmp_path / 'particiones')
+    ledger.guardar(_ledger_v1())  # tres meses sin comision_usd
+    assert migraciones.version(ledger.cabecera()) == 1
+
+    assert migraciones.migrar(ledger, CONTEXTO)
+
+    assert migraciones.version(ledger.cabecera()) == migraciones.VERSION_ACTUAL
+    manifiesto = json.loads(ledger.manifiesto_file.read_text(encoding='utf-8'))['particiones']
+    df = ledger.cargar()
+    assert manifiesto[-1]['comision_acumulada'] == pytest.approx(df['comision_usd'].sum())
+    assert manifiesto[-1]['usd_invertidos_acumulado'] == pytest.approx(df['usd_invertidos'].sum())
+    assert manifiesto[0]['comision_acumulada'] == pytest.approx(31 * 2.0 * 0.003)
@@ -0,0 +1,54 @@
+"""Backend particionado: manifiesto por mes cuando las compras diarias cruzan el fin de mes"""
+
+from datetime import date, datetime
+
+import pytest
+
+import storage
+
+PRECIOS = [60000.0, 61000.0, 62000.0, 63000.0]
+
+
+def test_append_que_cruza_de_mes(daily_update, reloj, cotizaciones):
+    reloj.ahora = datetime(2027, 1, 30, 12).timestamp()
+    cotizaciones.extend(PRECIOS)
+    enero = None
+    for dia in range(len(PRECIOS)):
+        daily_update.update_btc_data(backend='particionado')
+        reloj.avanzar(86400)
+        if dia == 1:
+            enero = (daily_update.PARTICIONES_DIR / "2027" / "01.csv").read_bytes()
+
+    ledger = storage.PartitionedStorage(daily_update.PARTICIONES_DIR)
+    df = ledger.cargar()
+    usd = daily_update.USD_POR_COMPRA
+    assert [{k: p[k] for k in ('mes', 'archivo', 'filas', 'desde', 'hasta')} for p in ledger.particiones()] == [
+        {'mes': '2027-01', 'archivo': '2027/01.csv', 'filas': 2, 'desde': '2027-01-30', 'hasta': '2027-01-31'},
+        {'mes': '2027-02', 'archivo': '2027/02.csv', 'filas': 2, 'desde': '2027-02-01', 'hasta': '2027-02-02'},
+    ]
+    cierre_enero, cierre_febrero = ledger.particiones()
+    # Los acumulados del manifiesto son los del último registro de cada mes y siguen de un mes al otro
+    assert cierre_enero['btc_acumulado'] == df['btc_acumulado'].iloc[1]
+    assert cierre_febrero['btc_acumulado'] == df['btc_acumulado'].iloc[3]
+    assert cierre_febrero['valor_actual_usd'] == df['valor_actual_usd'].iloc[3]
+    assert cierre_enero['usd_invertidos_acumulado'] == pytest.approx(2 * usd)
+    assert cierre_febrero['usd_invertidos_acumulado'] == pytest.approx(4 * usd)
+    assert cierre_febrero['comision_acumulada'] == pytest.approx(df['comision_usd'].sum())
+    # Las compras de febrero no reescriben el mes cerrado, y un rango de febrero solo abre su mes
+    assert (daily_update.PARTICIONES_DIR / "2027" / "01.csv").read_bytes() == enero
+    assert ledger._elegir(date(2027, 2, 1), date(2027, 2, 28)) == [cierre_febrero]
+    assert daily_update.verificar_ledger('particionado')
+
+
+def test_recalcular_manifiesto_coincide_con_el_append(daily_update, reloj, cotizaciones):
+    reloj.ahora = datetime(2027, 1, 31, 12).timestamp()
+    cotizaciones.extend(PRECIOS[:2])
+    for _ in range(2):
+        daily_update.update_btc_data(backend='particionado')
+        reloj.avanzar(86400)
+
+    ledger = storage.PartitionedStorage(daily_update.PARTICIONES_DIR)
+    incremental = ledger.particiones()
+    ledger.recalcular_manifiesto()
+
+    assert ledger.particiones() == pytest.approx(incremental)
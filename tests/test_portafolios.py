@@ -0,0 +1,24 @@
+"""Portafolios con compras intradiarias: una compra por período, con claves UTC"""
+
+import json
+
+import storage
+
+
+def test_portafolio_compra_una_vez_por_periodo(daily_update, reloj, cotizaciones, monkeypatch, tmp_path):
+    monkeypatch.setattr(daily_update, 'INTERVALO_COMPRA', 3600)
+    config = tmp_path / 'portafolios.json'
+    config.write_text(json.dumps({'portafolios': [{'nombre': 'horario', 'directorio': 'horario', 'usd_por_compra': 24}]}))
+    cotizaciones.extend([80000.0, 81000.0])
+
+    daily_update.update_portafolios(config, procesos=1)
+    reloj.avanzar(600)  # mismo período: no vuelve a comprar
+    daily_update.update_portafolios(config, procesos=1)
+    reloj.avanzar(3600)
+    daily_update.update_portafolios(config, procesos=1)
+
+    ledger = storage.CSVStorage(tmp_path / 'horario' / 'btc_purchases.csv')
+    columnas = ledger.leer_columnas()
+    assert columnas['precio_btc_usd'] == [80000.0, 81000.0]
+    assert columnas['usd_invertidos'] == [1.0, 1.0]
+    assert (columnas['fecha'][1] - columnas['fecha'][0]).total_seconds() == 3600
@@ -0,0 +1,92 @@
+"""Proveedores de precio contra scripts/fake_price_server.py en un puerto libre: quórum, mediana,
+fallas de un proveedor y presupuesto de latencia (sin red y sin reemplazar obtener_precio)"""
+
+import pytest
+import requests
+
+import fake_price_server
+import price_cache
+import price_providers
+
+
+@pytest.fixture
+def servidor():
+    """Levanta servidores de precios falsos (puerto=0) y devuelve su url base; los cierra al final"""
+    levantados = []
+
+    def levantar(**opciones):
+        instancia, url = fake_price_server.iniciar_en_segundo_plano(puerto=0, **opciones)
+        levantados.append(instancia)
+        return url
+
+    yield levantar
+    for instancia in levantados:
+        instancia.shutdown()
+        instancia.server_close()
+
+
+def _obtener(url, **opciones):
+    with requests.Session() as sesion:
+        return price_providers.obtener_precio(sesion=sesion, url_base=url, **opciones)
+
+
+def test_quorum_devuelve_la_mediana(servidor):
+    url = servidor(precio=80000.0, desvios={'coinbase': 81000.0, 'kraken': 82000.0})
+
+    resultado = _obtener(url, proveedores=['coingecko', 'coinbase', 'kraken'], quorum=3)
+
+    assert resultado['cotizaciones'] == {'coingecko': 80000.0, 'coinbase': 81000.0, 'kraken': 82000.0}
+    assert resultado['precio'] == 81000.0
+    assert not resultado['parcial'] and resultado['errores'] == {}
+
+
+def test_un_proveedor_con_error_500(servidor):
+    url = servidor(precio=80000.0, fallas={'bitstamp': 500}, desvios={'kraken': 79000.0})
+
+    resultado = _obtener(url, quorum=4)
+
+    assert set(resultado['cotizaciones']) == {'coingecko', 'coinbase', 'kraken'}
+    assert isinstance(resultado['errores']['bitstamp'], requests.HTTPError)
+    assert resultado['errores']['bitstamp'].response.status_code == 500
+    assert resultado['parcial']
+    assert resultado['precio'] == 80000.0  # mediana de 80000, 80000 y 79000
+
+
+def test_proveedor_lento_queda_fuera_del_presupuesto(servidor):
+    url = servidor(precio=80000.0, retrasos={'kraken': 3.0})
+
+    resultado = _obtener(url, quorum=4, presupuesto=0.5)
+
+    assert resultado['segundos'] < 1.5
+    assert set(resultado['cotizaciones']) == {'coingecko', 'coinbase', 'bitstamp'}
+    assert 'kraken' in resultado['errores'] and resultado['parcial']
+    assert resultado['precio'] == 80000.0
+
+
+def test_sin_ninguna_cotizacion(servidor):
+    url = servidor(fallas=list(price_providers.PROVEEDORES))
+
+    with pytest.raises(price_providers.SinCotizacion) as error:
+        _obtener(url, quorum=2)
+
+    assert set(error.value.errores) == set(price_providers.PROVEEDORES)
+
+
+def test_consulta_agrupada_de_varios_activos(servidor):
+    url = servidor(precio=80000.0, activos={'ethereum': 3000.0})
+
+    with requests.Session() as sesion:
+        resultado = price_providers.obtener_precios(['bitcoin', 'ethereum', 'dogecoin'], sesion=sesion, url_base=url)
+
+    assert resultado['precios'] == {'bitcoin': 80000.0, 'ethereum': 3000.0}
+    assert list(resultado['errores']) == ['dogecoin']
+
+
+def test_get_btc_price_usa_la_mediana_del_quorum(servidor, daily_update, monkeypatch):
+    url = servidor(precio=80000.0, fallas={'coinbase': 500}, desvios={'kraken': 84000.0, 'bitstamp': 81000.0})
+    monkeypatch.setattr(price_providers, 'URL_BASE_OVERRIDE', url)
+    monkeypatch.setattr(daily_update, 'QUORUM_PRECIO', 3)
+
+    assert daily_update.get_btc_price() == 81000.0
+    assert daily_update.get_btc_price() == 81000.0  # de la caché: sin otra consulta
+    assert price_cache.obtener(daily_update.PRICE_CACHE_FILE, daily_update.CLAVE_PRECIO, 60)['precio'] == 81000.0
@@ -0,0 +1,26 @@
+"""Log mensual con buffer: vaciar() lo deja en disco sin esperar al cierre (modo daemon)"""
+
+import logging
+import time
+
+import registro
+
+
+def _tamano(directorio):
+    return sum(path.stat().st_size for path in directorio.glob('*.log'))
+
+
+def test_vaciar_vuelca_el_buffer_sin_cerrar(tmp_path):
+    logger = registro.configurar(tmp_path)
+    try:
+        registro.registrar(logger, logging.INFO, "compra del tick")
+        time.sleep(0.1)
+        assert _tamano(tmp_path) == 0  # INFO queda en el buffer
+
+        registro.vaciar()
+        limite = time.monotonic() + 2
+        while _tamano(tmp_path) == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert "compra del tick" in next(tmp_path.glob('*.log')).read_text(encoding='utf-8')
+    finally:
+        registro.detener()
@@ -0,0 +1,53 @@
+"""Backend satoshis: acumulado entero frente al ledger float e import/export sin pérdidas"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+import storage
+
+COMPRAS = 365
+SAT = 1 / storage.SATOSHIS_POR_BTC
+
+
+def _comprar(daily_update, ledgers):
+    """Registra las mismas compras (precio con random walk) en cada ledger, como el append diario"""
+    rng = np.random.default_rng(7)
+    precios = np.round(30000 * np.exp(np.cumsum(rng.normal(0, 0.03, COMPRAS))), 2)
+    for i, precio in enumerate(precios):
+        fecha = date(2024, 1, 1) + timedelta(days=i)
+        for ledger in ledgers:
+            ultimo = ledger.ultimo_registro()
+            ledger.agregar(daily_update.calcular_compra(fecha, float(precio), ultimo['btc_acumulado'] if ultimo else 0.0))
+
+
+def test_acumulado_entero_coincide_con_el_ledger_float(daily_update):
+    daily_update.CSV_FILE.parent.mkdir(parents=True)
+    flotante = storage.CSVStorage(daily_update.CSV_FILE)
+    enteros = storage.SatoshiStorage(daily_update.SATOSHIS_DIR)
+
+    _comprar(daily_update, [flotante, enteros])
+
+    esperado, guardado = flotante.cargar(), enteros.cargar()
+    # Cada compra queda redondeada al satoshi más cercano de la compra en float
+    assert np.abs(guardado['btc_comprados'] - esperado['btc_comprados']).max() <= SAT / 2
+    # El acumulado entero es la suma exacta de esas compras: la suma en float no se aleja ni 1 sat
+    suma_float = np.cumsum(guardado['btc_comprados'].to_numpy())
+    assert np.abs(guardado['btc_acumulado'].to_numpy() - suma_float).max() < SAT
+    assert daily_update.verificar_ledger('satoshis')
+
+
+def test_import_export_ida_y_vuelta_exacto(daily_update, tmp_path):
+    _comprar(daily_update, [storage.SatoshiStorage(daily_update.SATOSHIS_DIR)])
+    primera, segunda = tmp_path / "primera.csv", tmp_path / "segunda.csv"
+
+    daily_update.export_csv(primera, 'satoshis')
+    daily_update.import_csv(primera, 'satoshis')
+    daily_update.export_csv(segunda, 'satoshis')
+
+    assert segunda.read_bytes() == primera.read_bytes()
+    df = storage.cargar_csv(primera)
+    assert len(df) == COMPRAS
+    enteras = storage.SatoshiStorage(daily_update.SATOSHIS_DIR).columnas_enteras()
+    for publica, (guardada, escala) in storage.ESCALAS_ENTERAS.items():
+        assert (np.rint(df[publica].to_numpy() * escala).astype('int64') == enteras[guardada]).all()
@@ -0,0 +1,63 @@
+"""Ledger en SQLite: compras incrementales, consultas por rango, verificación y lectura por lotes"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+import storage
+
+PRECIOS = [60000.0, 62000.0, 64000.0]
+
+
+def _registro(fecha, acumulado):
+    return {
+        'fecha': fecha, 'precio_btc_usd': 64000.0, 'usd_invertidos': 2.0, 'btc_comprados': 3.1e-05,
+        'btc_acumulado': acumulado, 'valor_actual_usd': acumulado * 64000.0, 'comision_usd': 0.006,
+    }
+
+
+def test_compras_consulta_y_verificacion(daily_update, reloj, cotizaciones):
+    cotizaciones.extend(PRECIOS)
+    for _ in PRECIOS:
+        daily_update.update_btc_data(backend='sqlite')
+        reloj.avanzar(86400)
+
+    ledger = daily_update.abrir_storage('sqlite')
+    df = ledger.cargar()
+    assert df['precio_btc_usd'].tolist() == PRECIOS
+    assert df['btc_acumulado'].iloc[-1] == pytest.approx(df['btc_comprados'].sum())
+
+    agregados = daily_update.query_ledger('sqlite')
+    assert agregados['dias'] == 3
+    assert agregados['usd_invertidos'] == pytest.approx(3 * daily_update.USD_POR_COMPRA)
+    assert agregados['precio_max'] == 64000.0
+    assert len(ledger.rango(desde=df['fecha'].iloc[1])) == 2
+
+    assert daily_update.verificar_ledger('sqlite', tamano_lote=2)
+
+
+def test_agregar_rechaza_fechas_repetidas_o_anteriores(tmp_path):
+    ledger = storage.SQLiteStorage(tmp_path / "compras.db")
+    ledger.agregar(_registro(date(2026, 10, 14), 3.1e-05))
+    ledger.agregar(_registro(date(2026, 10, 15), 6.2e-05))
+
+    with pytest.raises(storage.RegistroDuplicado, match="Ya existe"):
+        ledger.agregar(_registro(date(2026, 10, 15), 9.3e-05))
+    with pytest.raises(storage.RegistroDuplicado, match="anterior"):
+        ledger.agregar(_registro(date(2026, 10, 13), 9.3e-05))
+    assert ledger.agregados()['dias'] == 2
+
+
+def test_lotes_de_un_ledger_mixto_usan_una_sola_unidad(tmp_path):
+    ledger = storage.SQLiteStorage(tmp_path / "compras.db")
+    fechas = [date(2026, 10, 13), date(2026, 10, 14), datetime(2026, 10, 15, 10), datetime(2026, 10, 15, 11)]
+    for i, fecha in enumerate(fechas, start=1):
+        ledger.agregar(_registro(fecha, 3.1e-05 * i))
+
+    lotes = list(ledger.lotes(tamano=2))
+
+    assert [lote['fecha'].dtype for lote in lotes] == [np.dtype('datetime64[s]')] * 2
+    assert np.concatenate([lote['fecha'] for lote in lotes]).tolist() == [
+        datetime(2026, 10, 13), datetime(2026, 10, 14), datetime(2026, 10, 15, 10), datetime(2026, 10, 15, 11),
+    ]
@@ -0,0 +1,27 @@
+"""Patrones del simulador de estrategias sobre series con huecos y ledgers intradiarios"""
+
+import numpy as np
+import pandas as pd
+
+import sweep
+
+
+def test_patrones_cuentan_dias_de_calendario_con_huecos():
+    fechas = pd.to_datetime(['2026-01-05', '2026-01-06', '2026-01-20', '2026-01-21'])  # lun, mar, mar, mié
+
+    patrones, descripcion = sweep.construir_patrones(fechas, [2, 14])
+
+    cada_2 = patrones[descripcion.index((2, '-'))]
+    assert cada_2.tolist() == [True, False, False, True]  # 01-05 y 01-21, no 01-20 (15 días después)
+    martes_cada_2_semanas = patrones[descripcion.index((14, 'mar'))]
+    assert martes_cada_2_semanas.tolist() == [False, True, True, False]
+
+
+def test_serie_diaria_deja_el_ultimo_precio_de_cada_dia():
+    indice = pd.to_datetime(['2026-01-05 10:00', '2026-01-05 11:00', '2026-01-06 00:00'])
+    precios = pd.Series([100.0, 110.0, 120.0], index=indice)
+
+    diaria = sweep.serie_diaria(precios)
+
+    assert diaria.index.tolist() == [pd.Timestamp('2026-01-05'), pd.Timestamp('2026-01-06')]
+    assert np.array_equal(diaria.to_numpy(), [110.0, 120.0])
@@ -0,0 +1,54 @@
+"""verify: primera fila divergente del ledger y reparación de las columnas derivadas"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+FILAS = 10
+DIVERGENTE = 6
+
+
+def _escribir_ledger(daily_update):
+    precio = np.linspace(60000.0, 69000.0, FILAS)
+    usd = np.full(FILAS, daily_update.USD_POR_COMPRA)
+    comision = usd * daily_update.COMISION_PORCENTAJE
+    comprados = (usd - comision) / precio
+    acumulado = np.cumsum(comprados)
+    df = pd.DataFrame({
+        'fecha': [date(2026, 1, 1) + timedelta(days=i) for i in range(FILAS)],
+        'precio_btc_usd': precio,
+        'usd_invertidos': usd,
+        'btc_comprados': comprados,
+        'btc_acumulado': acumulado,
+        'valor_actual_usd': acumulado * precio,
+        'comision_usd': comision,
+    }, columns=storage.COLUMNAS)
+    df.loc[DIVERGENTE, 'btc_acumulado'] += 1e-4
+    storage.CSVStorage(daily_update.CSV_FILE).guardar(df)
+    return df
+
+
+def test_verify_reporta_la_primera_fila_divergente(daily_update, capsys):
+    df = _escribir_ledger(daily_update)
+
+    assert not daily_update.verificar_ledger('csv', tamano_lote=4)
+
+    salida = capsys.readouterr().out
+    assert f"✗ btc_acumulado: 1 fila(s) fuera de tolerancia · primera en fila {DIVERGENTE} ({df['fecha'][DIVERGENTE]})" in salida
+    assert "✓ btc_comprados" in salida
+    assert "verify --reparar" in salida
+
+
+def test_verify_reparar_recalcula_el_acumulado(daily_update):
+    df = _escribir_ledger(daily_update)
+
+    assert daily_update.verificar_ledger('csv', reparar=True, tamano_lote=4)
+
+    reparado = storage.cargar_csv(daily_update.CSV_FILE)
+    esperado = np.cumsum(df['btc_comprados'].to_numpy())
+    assert np.allclose(reparado['btc_acumulado'], esperado, rtol=1e-12, atol=0)
+    assert np.allclose(reparado['valor_actual_usd'], esperado * df['precio_btc_usd'].to_numpy(), rtol=1e-12, atol=0)
+    assert daily_update.verificar_ledger('csv', tamano_lote=4)